@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+
+class RoleTokenUser(TokenUser):
+    """
+    Stateless user built from the access token claims (see CustomTokenObtainPairSerializer).
+    Used with JWTStatelessUserAuthentication, so authenticating a request costs no query.
+    Exposes what the permission classes and views read (id, role, email, role helpers);
+    the full UserAccount row is only loaded if a view asks for `.user`.
+    """
+
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @cached_property
+    def role(self):
+        return self.token.get("role")
+
+    @cached_property
+    def email(self):
+        return self.token.get("email", "")
+
+    @property
+    def is_admin(self):
+        return self.role == User.Roles.ADMIN
+
+    @property
+    def is_hr(self):
+        return self.role == User.Roles.HR
+
+    @cached_property
+    def user(self):
+        """
+        The UserAccount behind the token, fetched on first access.
+        """
+        return User.objects.get(pk=self.id)
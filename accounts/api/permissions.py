@@ -3,20 +3,30 @@ from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+# The role permissions only read request.user.role, so the async views check them
+# on the event loop (companyManagement.async_api.query_free)
 class IsAdmin(BasePermission):
+    query_free = True
+
     def has_permission(self,request,view):
         return request.user.is_authenticated and request.user.role == User.Roles.ADMIN
 
 class IsHR(BasePermission):
+    query_free = True
+
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.role == User.Roles.HR
 
 
 class IsManager(BasePermission):
+    query_free = True
+
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.role == User.Roles.MANAGER
 
 
 class IsEmployee(BasePermission):
+    query_free = True
+
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.role == User.Roles.EMPLOYEE
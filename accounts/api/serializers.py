@@ -29,5 +29,6 @@ class CustomTokenObtainPairSerializer (TokenObtainPairSerializer):
 
         token['role'] = user.role
         token['username'] = user.username
+        token['email'] = user.email
 
         return token
\ No newline at end of file
@@ -4,6 +4,7 @@ from rest_framework import status
 from rest_framework.permissions import AllowAny
 from django.contrib.auth import get_user_model
 from accounts.api.serializers import UserAccountSerializer
+from companyManagement.timing import serializer_data
 
 User = get_user_model()
 
@@ -13,5 +14,5 @@ def register_user (request):
     serializer = UserAccountSerializer (data=request.data)
     serializer.is_valid(raise_exception = True)
     user = serializer.save()
-    return Response(serializer.data , status = status.HTTP_201_CREATED)
+    return Response(serializer_data(request, serializer) , status = status.HTTP_201_CREATED)
     
\ No newline at end of file
@@ -22,3 +22,11 @@ class UserAccount(AbstractUser):
     def __str__(self):
         return f"{self.email} ({self.role})"
 
+    @property
+    def is_admin(self):
+        return self.role == self.Roles.ADMIN
+
+    @property
+    def is_hr(self):
+        return self.role == self.Roles.HR
+
@@ -1,3 +1,5 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
@@ -62,3 +64,45 @@ class AccountsTests(APITestCase):
         decoded = AccessToken(access_token)
 
         self.assertEqual(decoded["role"], user.role)
+
+    def test_token_contains_email_claim(self):
+        """Test JWT token carries the email used by the stateless token user"""
+        user = User.objects.create_user(**self.user_data)
+        login_data = {
+            "email": self.user_data["email"],
+            "password": self.user_data["password"],
+        }
+        response = self.client.post(self.token_url, login_data, format="json")
+        decoded = AccessToken(response.data["access"])
+        self.assertEqual(decoded["email"], user.email)
+
+    def test_authenticated_request_does_not_load_user(self):
+        """Test a request with a bearer token authorizes from the token claims without a user query"""
+        hr_data = dict(self.user_data, email="hr@example.com", username="hr", role=User.Roles.HR)
+        User.objects.create_user(**hr_data)
+        response = self.client.post(
+            self.token_url,
+            {"email": hr_data["email"], "password": hr_data["password"]},
+            format="json",
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("list-all-companies"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user_table = User._meta.db_table
+        self.assertFalse([q["sql"] for q in queries if user_table in q["sql"]])
+
+    def test_token_role_enforces_permissions(self):
+        """Test the role claim drives the role permission classes"""
+        User.objects.create_user(**self.user_data)
+        response = self.client.post(
+            self.token_url,
+            {"email": self.user_data["email"], "password": self.user_data["password"]},
+            format="json",
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+        self.assertEqual(self.client.get(reverse("list-all-companies")).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(reverse("emp-reviews")).status_code, status.HTTP_200_OK)
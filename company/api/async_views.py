@@ -0,0 +1,38 @@
+from rest_framework import status
+from rest_framework.response import Response
+from accounts.api.permissions import IsAdmin, IsHR, IsManager
+from company.models import Employee
+from company.api.serializers import EmployeeSerializer
+from company.api.views import employee_list_source, filter_employees, order_employees
+from companyManagement.async_api import async_api_view
+from companyManagement.fieldsets import requested_fields, sparse_queryset
+from companyManagement.pagination import apaginated_data
+from companyManagement.query_budget import query_budget
+from companyManagement.timing import serializer_data
+
+
+#ASYNC EMPLOYEE ENDPOINTS
+#Same payloads as list_employees/employee_by_id (GET), served without a thread per request under ASGI
+@query_budget(1)
+@async_api_view([IsAdmin | IsManager | IsHR])
+async def alist_employees(request):
+    employees = filter_employees(request, Employee.objects.select_related('company', 'department'))
+    employees, ordering = order_employees(request, employees, ('name', 'id'))
+    fields = requested_fields(request, EmployeeSerializer)
+    employees, serializer_class = employee_list_source(employees, fields, ordering)
+    data = await apaginated_data(request, employees, serializer_class, ordering=ordering,
+                                 context={'fields': fields})
+    return Response(data)
+
+@query_budget(1)
+@async_api_view([IsAdmin | IsManager | IsHR])
+async def aemployee_by_id(request, id):
+    fields = requested_fields(request, EmployeeSerializer)
+    employees = Employee.objects.select_related('company', 'department')
+    if fields is not None:
+        employees = sparse_queryset(employees, EmployeeSerializer, fields)
+    try:
+        employee = await employees.aget(pk=id)
+    except Employee.DoesNotExist as e:
+        return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+    return Response(serializer_data(request, EmployeeSerializer(employee, context={'fields': fields})))
@@ -0,0 +1,65 @@
+import csv
+import json
+from itertools import islice
+from asgiref.sync import sync_to_async
+from company.api.serializers import EmployeeValuesSerializer
+
+# Rows fetched per round-trip by the server-side cursor
+EXPORT_CHUNK_SIZE = 2000
+
+# Lines pulled from the sync generator per worker-thread hop when streaming under ASGI
+ASYNC_EXPORT_BATCH = 500
+
+# Same keys (and order) as EmployeeSerializer output
+EXPORT_FIELDS = EmployeeValuesSerializer.keys()
+
+
+class Echo:
+    """
+    File-like object whose write() hands the line back instead of buffering it,
+    so csv.writer can be used inside a generator.
+    """
+    def write(self, value):
+        return value
+
+
+def iter_employee_rows(employees, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield one dict per employee, shaped like EmployeeSerializer output.
+    Rows come from a values() projection over a chunked server-side iterator,
+    so no model instances are built and memory stays flat.
+    """
+    serializer = EmployeeValuesSerializer()
+    for row in EmployeeValuesSerializer.project(employees).iterator(chunk_size=chunk_size):
+        yield serializer.to_representation(row)
+
+
+def stream_ndjson(employees):
+    """
+    One JSON object per line.
+    """
+    for record in iter_employee_rows(employees):
+        yield json.dumps(record) + '\n'
+
+
+def stream_csv(employees):
+    """
+    Header line followed by one CSV line per employee.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for record in iter_employee_rows(employees):
+        yield writer.writerow(['' if record[field] is None else record[field] for field in EXPORT_FIELDS])
+
+
+async def astream(lines, batch=ASYNC_EXPORT_BATCH):
+    """
+    Async iterator over a sync export generator, for ASGI: Django would otherwise
+    consume a sync streaming body with sync_to_async(list), i.e. all in memory.
+    Each hop to the request's worker thread (where the server-side cursor lives)
+    pulls `batch` lines, sent as one chunk.
+    """
+    lines = iter(lines)
+    pull = sync_to_async(lambda: ''.join(islice(lines, batch)))
+    while chunk := await pull():
+        yield chunk
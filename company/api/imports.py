@@ -0,0 +1,118 @@
+import csv
+import io
+from django.conf import settings
+from django.db import transaction
+from rest_framework import serializers
+from company import counters
+from company.models import Company, Department, Employee
+from company.signals import invalidate_companies, invalidate_departments
+from company.api.serializers import EmployeeImportSerializer
+
+# Rows per INSERT statement, override with EMPLOYEE_IMPORT_BATCH_SIZE in settings
+DEFAULT_IMPORT_BATCH_SIZE = 500
+
+# Optional CSV columns where an empty cell means "not provided"
+_NULLABLE_CSV_COLUMNS = ('department', 'hired_on')
+
+
+class InvalidCSV(Exception):
+    pass
+
+
+def read_csv_rows(uploaded_file):
+    """
+    Parse an uploaded CSV (header row = EmployeeSerializer field names) into row dicts.
+    Raises InvalidCSV when the file isn't UTF-8 or isn't CSV.
+    """
+    text = io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig')
+    rows = []
+    try:
+        for row in csv.DictReader(text):
+            for column in _NULLABLE_CSV_COLUMNS:
+                if row.get(column) == '':
+                    row[column] = None
+            rows.append(row)
+    except UnicodeDecodeError:
+        raise InvalidCSV("The CSV file must be UTF-8 encoded.")
+    except csv.Error as exc:
+        raise InvalidCSV(f"Invalid CSV file: {exc}.")
+    return rows
+
+
+def validate_employee_rows(rows):
+    """
+    Validate every row, resolving companies, departments and existing emails
+    with one query each instead of one per row.
+    Returns (validated rows, errors) where errors is a list of {"row": n, "errors": {...}} (1-based).
+    """
+    # One serializer instance reused for every row, like ListSerializer does internally
+    row_serializer = EmployeeImportSerializer()
+    validated, row_errors = [], []
+    for row in rows:
+        try:
+            validated.append(row_serializer.run_validation(row))
+            row_errors.append({})
+        except serializers.ValidationError as exc:
+            validated.append({})
+            row_errors.append(exc.detail)
+
+    company_ids = {row['company'] for row in validated if row.get('company') is not None}
+    department_ids = {row['department'] for row in validated if row.get('department') is not None}
+    emails = [row['email'] for row in validated if row.get('email')]
+
+    existing_companies = set(Company.objects.filter(id__in=company_ids).values_list('id', flat=True))
+    department_companies = dict(Department.objects.filter(id__in=department_ids).values_list('id', 'company_id'))
+    taken_emails = set(Employee.objects.filter(email__in=emails).values_list('email', flat=True))
+
+    seen_emails = set()
+    for row, errors in zip(validated, row_errors):
+        if errors:
+            continue
+        company_id = row['company']
+        department_id = row.get('department')
+        if company_id not in existing_companies:
+            errors['company'] = [f'Invalid pk "{company_id}" - object does not exist.']
+        if department_id is not None:
+            if department_id not in department_companies:
+                errors['department'] = [f'Invalid pk "{department_id}" - object does not exist.']
+            elif department_companies[department_id] != company_id:
+                errors['department'] = ["Employee department must belong to the same company."]
+        if row['email'] in taken_emails or row['email'] in seen_emails:
+            errors['email'] = ["employee with this email already exists."]
+        seen_emails.add(row['email'])
+
+    errors = [
+        {"row": index, "errors": errors}
+        for index, errors in enumerate(row_errors, start=1) if errors
+    ]
+    return validated, errors
+
+
+def import_batch_size():
+    return getattr(settings, 'EMPLOYEE_IMPORT_BATCH_SIZE', DEFAULT_IMPORT_BATCH_SIZE)
+
+
+def import_employees(validated_rows, batch_size=None):
+    """
+    Insert already-validated rows with bulk_create, all-or-nothing.
+    bulk_create sends no post_save, so the company/department counters (when stored) are bumped
+    in the same transaction and the touched companies/departments invalidated once it commits.
+    Raises IntegrityError when a concurrent request took one of the emails since validation.
+    """
+    batch_size = batch_size or import_batch_size()
+    employees = []
+    for row in validated_rows:
+        row = dict(row)
+        row['company_id'] = row.pop('company')
+        row['department_id'] = row.pop('department', None)
+        employees.append(Employee(**row))
+    members = [(employee.company_id, employee.department_id) for employee in employees]
+
+    with transaction.atomic():
+        created = Employee.objects.bulk_create(employees, batch_size=batch_size)
+        counters.members_added(Employee, members)
+        transaction.on_commit(lambda: (
+            invalidate_companies(company_id for company_id, _ in members),
+            invalidate_departments(department_id for _, department_id in members),
+        ))
+    return created
@@ -1,11 +1,47 @@
+from django.utils import timezone
+from django.utils.functional import cached_property
 from rest_framework import serializers
+from companyManagement.fieldsets import SparseFieldsMixin
+from companyManagement.values_serializers import ValuesSerializer, date_formatter
 from ..models import Company, Department, Employee, Project
 
-class CompanySerializer(serializers.ModelSerializer):
+class CountField(serializers.ReadOnlyField):
+    """
+    Read-only count that prefers an annotation from `with_counts()`
+    and falls back to the model property (one COUNT query) otherwise.
+    """
+    def __init__(self, annotation, **kwargs):
+        self.annotation = annotation
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        value = getattr(instance, self.annotation, None)
+        if value is not None:
+            return value
+        return super().get_attribute(instance)
+
+def with_requested_counts(queryset, serializer_class, fields):
+    """
+    `queryset.with_counts()` limited to the CountFields among `fields` (all of them for None).
+    """
+    if fields is None:
+        return queryset.with_counts()
+    counted = serializer_class().fields
+    annotations = [counted[name].annotation for name in fields if isinstance(counted[name], CountField)]
+    return queryset.with_counts(*annotations) if annotations else queryset
+
+class CompanySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     # Include computed fields as read-only
-    number_of_departments = serializers.ReadOnlyField()
-    number_of_employees = serializers.ReadOnlyField()
-    number_of_projects = serializers.ReadOnlyField()
+    number_of_departments = CountField('departments_count')
+    number_of_employees = CountField('employees_count')
+    number_of_projects = CountField('projects_count')
+
+    # Counts are annotations (with_requested_counts), not columns
+    sparse_columns = {
+        'number_of_departments': (),
+        'number_of_employees': (),
+        'number_of_projects': (),
+    }
 
     class Meta:
         model = Company
@@ -18,10 +54,16 @@ class CompanySerializer(serializers.ModelSerializer):
         ]
 
 
-class DepartmentSerializer(serializers.ModelSerializer):
+class DepartmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     # Include computed fields as read-only
-    number_of_employees = serializers.ReadOnlyField()
-    number_of_projects = serializers.ReadOnlyField()
+    number_of_employees = CountField('employees_count')
+    number_of_projects = CountField('projects_count')
+    company_name = serializers.ReadOnlyField(source='company.name')
+
+    sparse_columns = {
+        'number_of_employees': (),
+        'number_of_projects': (),
+    }
 
     class Meta:
         model = Department
@@ -30,24 +72,18 @@ class DepartmentSerializer(serializers.ModelSerializer):
             'company',
             'name',
             'number_of_employees',
-            'number_of_projects'
+            'number_of_projects',
+            'company_name'
         ]
-        
-    def to_representation(self, instance):
-        """
-        Override to include company name in response
-        """
-        data = super().to_representation(instance)
-        
-        # Add company name
-        if instance.company:
-            data['company_name'] = instance.company.name
-            
-        return data
 
-class EmployeeSerializer(serializers.ModelSerializer):
+class EmployeeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     
-    days_employed = serializers.ReadOnlyField()
+    days_employed = serializers.SerializerMethodField()
+    company_name = serializers.ReadOnlyField(source='company.name')
+    #No department → null
+    department_name = serializers.ReadOnlyField(source='department.name', allow_null=True)
+
+    sparse_columns = {'days_employed': ('hired_on',)}
 
     class Meta:
         model = Employee
@@ -61,7 +97,9 @@ class EmployeeSerializer(serializers.ModelSerializer):
             'address',
             'designation',
             'hired_on',
-            'days_employed'
+            'days_employed',
+            'company_name',
+            'department_name'
         ]
 
     def validate(self, attrs):
@@ -77,23 +115,77 @@ class EmployeeSerializer(serializers.ModelSerializer):
 
         #IF there is a company and department (both not None)
         #Make sure that the dept's company (using inverse relationship), is the same as the company itself
-        if company and department and department.company != company:
+        if company and department and department.company_id != company.pk:
             raise serializers.ValidationError({
                 "department": "Employee department must belong to the same company."
             })
         return attrs
 
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        #Add company name
-        if instance.company:
-            data['company_name'] = instance.company.name
-        #Add dept name
-        if instance.department:
-            data['department_name'] = instance.department.name
-        else:
-            data['department_name'] = None
-        return data
+    @cached_property
+    def today(self):
+        """
+        One "today" per serializer, so a list page doesn't read the clock per employee
+        (with many=True every row goes through the same child serializer).
+        """
+        return timezone.now().date()
+
+    def get_days_employed(self, employee):
+        #Same as Employee.days_employed, against the shared snapshot
+        if not employee.hired_on:
+            return None
+        return (self.today - employee.hired_on).days
+
+class EmployeeValuesSerializer(ValuesSerializer):
+    """
+    EmployeeSerializer output built from values() rows (list/export fast path).
+    """
+    fields = (
+        ('id', 'id'),
+        ('company', 'company_id'),
+        ('department', 'department_id'),
+        ('name', 'name'),
+        ('email', 'email'),
+        ('mobile_number', 'mobile_number'),
+        ('address', 'address'),
+        ('designation', 'designation'),
+        ('hired_on', 'hired_on', date_formatter),
+        ('days_employed', None),
+        ('company_name', 'company__name'),
+        ('department_name', 'department__name'),
+    )
+
+    def __init__(self, *args, **kwargs):
+        # Employee.days_employed, with today's date read once per serializer
+        self.today = timezone.now().date()
+        super().__init__(*args, **kwargs)
+
+    def get_days_employed(self, row):
+        hired_on = row['hired_on']
+        return (self.today - hired_on).days if hired_on else None
+
+
+class EmployeeImportSerializer(serializers.ModelSerializer):
+    """
+    Row-level validation for bulk employee imports.
+    Foreign keys are plain ids and email uniqueness is not checked here,
+    both are resolved for the whole batch at once in company.api.imports.
+    """
+    company = serializers.IntegerField()
+    department = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:
+        model = Employee
+        fields = [
+            'company',
+            'department',
+            'name',
+            'email',
+            'mobile_number',
+            'address',
+            'designation',
+            'hired_on'
+        ]
+        extra_kwargs = {'email': {'validators': []}}
 
 class ProjectSerializer(serializers.ModelSerializer):
     class Meta:
@@ -4,15 +4,30 @@ from .views import (
     company_details,
     list_departments,
     department_details,
+    cache_stats,
     list_employees,
-    employee_by_id
+    export_employees,
+    search_employees,
+    bulk_import_employees,
+    employee_by_id,
+    list_projects,
+    project_details
 )
+from .async_views import alist_employees, aemployee_by_id
 
 urlpatterns = [
     path('' , list_companies , name='list-all-companies'),
     path('<int:id>/', company_details, name='retrieve-single-company'),
     path('department/', list_departments, name='list-all-departments'), #could filter by company
     path('department/<int:id>/', department_details, name='retrieve-single-department'),
+    path('cache-stats/', cache_stats, name='cache-stats'),
     path('employee/' , list_employees, name='list-all/add-employee'), #could filter by comp.,dept. or both
-    path('employee/<int:id>/', employee_by_id, name='retrieve/edit/delete-single-employee')
+    path('employee/export/', export_employees, name='export-employees'), #same filters as the list, ?type=ndjson|csv
+    path('employee/search/', search_employees, name='search-employees'), #?q= prefix search, same company/department scoping
+    path('employee/bulk/', bulk_import_employees, name='bulk-import-employees'), #JSON array or CSV file
+    path('employee/<int:id>/', employee_by_id, name='retrieve/edit/delete-single-employee'),
+    path('async/employee/', alist_employees, name='async-list-employees'), #async-native GET variants (ASGI)
+    path('async/employee/<int:id>/', aemployee_by_id, name='async-retrieve-single-employee'),
+    path('project/', list_projects, name='list-all-projects'), #could filter by comp.,dept. or both
+    path('project/<int:id>/', project_details, name='retrieve-single-project')
 ]
\ No newline at end of file
@@ -1,3 +1,11 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F, Prefetch
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from datetime import date, timedelta
+from math import ceil
+import zlib
+from rest_framework.exceptions import ValidationError
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
@@ -18,79 +26,229 @@ from company.api.serializers import (
     CompanySerializer, 
     DepartmentSerializer, 
     EmployeeSerializer, 
-    ProjectSerializer
+    EmployeeValuesSerializer,
+    ProjectSerializer,
+    with_requested_counts
 )
+from company.cache import response_cache
+from company.search import search_employee_ids, search_terms
+from company.api.export import astream, stream_csv, stream_ndjson
+from company.api.imports import (
+    InvalidCSV, import_batch_size, import_employees, read_csv_rows, validate_employee_rows,
+)
+from companyManagement.async_api import served_async
+from companyManagement.conditional import make_etag, not_modified, precondition_failed
+from companyManagement.fieldsets import requested_fields, select_fields, sparse_queryset
+from companyManagement.pagination import KeysetPagination, paginated_response
+from companyManagement.query_budget import query_budget
+from companyManagement.timing import serializer_data
+from companyManagement.values_serializers import fast_serializers_enabled
+
+EXPORT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
 
 #COMPANY ENDPOINTS
+def company_queryset(fields=None, ordering=()):
+    """
+    Companies with their counts, or for ?fields= only the requested columns and counts.
+    """
+    companies = Company.objects.all()
+    if fields is not None:
+        companies = sparse_queryset(companies, CompanySerializer, fields, ordering)
+    return with_requested_counts(companies, CompanySerializer, fields)
+
 #LATER: Add Permissions
+@query_budget(1)
 @api_view(['GET'])
 @permission_classes([IsAdmin | IsManager | IsHR])
 def list_companies (request):
-    companies = Company.objects.all()
-    serialized_companies = CompanySerializer (instance=companies , many=True)
-    return Response(serialized_companies.data , status=status.HTTP_200_OK)
+    fields = requested_fields(request, CompanySerializer)
+    ordering = ('name', 'id')
+    companies = company_queryset(fields, ordering)
+    return paginated_response(request, companies, CompanySerializer, ordering=ordering,
+                              context={'fields': fields})
 
+def cached_etag(kind, id, version, fields=None):
+    """
+    ETag of a cached company/department payload, from its version token.
+    None unless the cache backend is shared by all workers (see ResponseCache.shared).
+    """
+    if not response_cache.shared:
+        return None
+    return make_etag(kind, id, version, *(fields or ()))
+
+@query_budget(1)
 @api_view(['GET'])
 @permission_classes([IsAdmin | IsManager | IsHR])
 def company_details (request, id):
-    try:
-        company = Company.objects.get(pk=id)
-    except Company.DoesNotExist as e:
-        return Response ({"error":str(e)} , status=status.HTTP_404_NOT_FOUND)
-    serialized_company = CompanySerializer (company)
-    return Response(serialized_company.data , status=status.HTTP_200_OK)
+    fields = requested_fields(request, CompanySerializer)
+    version = response_cache.version('company', id)
+    etag = cached_etag('company', id, version, fields)
+    response = etag and not_modified(request, etag)
+    if response:
+        return response
+
+    # The cache holds full payloads: a sparse request is trimmed from a hit,
+    # on a miss it queries just its fields and leaves the cache alone
+    cache_key = response_cache.key('company', id, version)
+    data = response_cache.get(cache_key)
+    if data is None:
+        try:
+            company = company_queryset(fields).get(pk=id)
+        except Company.DoesNotExist as e:
+            return Response ({"error":str(e)} , status=status.HTTP_404_NOT_FOUND)
+        data = dict(serializer_data(request, CompanySerializer(company, context={'fields': fields})))
+        if fields is None:
+            response_cache.set(cache_key, data)
+    return Response(select_fields(data, fields), status=status.HTTP_200_OK, headers={"ETag": etag} if etag else None)
 
 
 #DEPARTMENT ENDPOINTS
+def department_queryset(fields=None, ordering=()):
+    """
+    Departments with their company and counts, or for ?fields= only the requested columns and counts.
+    """
+    departments = Department.objects.select_related('company')
+    if fields is not None:
+        departments = sparse_queryset(departments, DepartmentSerializer, fields, ordering)
+    return with_requested_counts(departments, DepartmentSerializer, fields)
+
 #LATER: Add Permissions
+@query_budget(1)
 @api_view(['GET'])
 @permission_classes([IsAdmin | IsManager | IsHR])
 def list_departments(request):
     # Get the company query parameter
     company_id = request.query_params.get('company') 
+    fields = requested_fields(request, DepartmentSerializer)
+    departments = department_queryset(fields, ('id',))
     if company_id:
         try:
-            departments = Department.objects.filter(company_id=company_id)
+            departments = departments.filter(company_id=company_id)
         except ValueError:
             # Handle invalid company_id (non-integer)
             return Response({"error": "Invalid company ID"}, status=status.HTTP_400_BAD_REQUEST)
-    else:
-        departments = Department.objects.all()
     
-    serializer = DepartmentSerializer(departments, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return paginated_response(request, departments, DepartmentSerializer, ordering=('id',),
+                              context={'fields': fields})
 
+@query_budget(1)
 @api_view(['GET'])
 @permission_classes([IsAdmin | IsManager | IsHR])
 def department_details(request, id):
-    try:
-        department = Department.objects.get(pk=id)
-    except Department.DoesNotExist as e:
-        return Response({"error":str(e)}, status=status.HTTP_404_NOT_FOUND)
-    
-    serializer = DepartmentSerializer(department)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    fields = requested_fields(request, DepartmentSerializer)
+    version = response_cache.version('department', id)
+    etag = cached_etag('department', id, version, fields)
+    response = etag and not_modified(request, etag)
+    if response:
+        return response
+
+    cache_key = response_cache.key('department', id, version)
+    data = response_cache.get(cache_key)
+    if data is None:
+        try:
+            department = department_queryset(fields).get(pk=id)
+        except Department.DoesNotExist as e:
+            return Response({"error":str(e)}, status=status.HTTP_404_NOT_FOUND)
+        data = dict(serializer_data(request, DepartmentSerializer(department, context={'fields': fields})))
+        if fields is None:
+            response_cache.set(cache_key, data)
+    return Response(select_fields(data, fields), status=status.HTTP_200_OK, headers={"ETag": etag} if etag else None)
+
+@query_budget(0)
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def cache_stats(request):
+    """
+    Hit/miss counters of the detail response cache (this worker process), and whether its
+    backend is shared by all workers, which company/department ETags need.
+    """
+    return Response({**response_cache.stats(), 'shared': response_cache.shared}, status=status.HTTP_200_OK)
 
 #EMPLOYEE ENDPOINTS
+# ?order= values of the employee lists; tenure is today - hired_on, so it sorts on hired_on (reversed)
+TENURE_ORDERINGS = {
+    'tenure': ('-hired_on', '-id'),
+    '-tenure': ('hired_on', 'id'),
+}
+
+def tenure_days_param(request, name, today):
+    value = request.query_params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        days = int(value)
+    except ValueError:
+        days = -1
+    if days < 0:
+        raise ValidationError({name: "Must be a non-negative number of days."})
+    # Any tenure longer than the calendar is the same bound, and today - days stays a valid date
+    return min(days, (today - date.min).days)
+
+def filter_employees(request, employees):
+    """
+    Apply the optional ?company=, ?department=, ?min_days= and ?max_days= filters
+    shared by the employee list endpoints.
+    """
+    # Filter by company if provided
+    company_id = request.query_params.get('company')
+    if company_id:
+        employees = employees.filter(company_id=company_id)
+
+    # Filter by department if provided
+    department_id = request.query_params.get('department')
+    if department_id:
+        employees = employees.filter(department_id=department_id)
+
+    # Tenure bounds become hired_on bounds against one "today", so the index does the work
+    today = timezone.now().date()
+    min_days = tenure_days_param(request, 'min_days', today)
+    if min_days is not None:
+        employees = employees.filter(hired_on__lte=today - timedelta(days=min_days))
+    max_days = tenure_days_param(request, 'max_days', today)
+    if max_days is not None:
+        employees = employees.filter(hired_on__gte=today - timedelta(days=max_days))
+
+    return employees
+
+def order_employees(request, employees, default):
+    """
+    Ordering of an employee list: `default`, or by tenure for ?order=tenure|-tenure.
+    Employees without hired_on have no tenure and are left out of a tenure ordering.
+    """
+    order = request.query_params.get('order')
+    if not order:
+        return employees, default
+    if order not in TENURE_ORDERINGS:
+        raise ValidationError({"order": f"Must be one of: {', '.join(TENURE_ORDERINGS)}."})
+    return employees.filter(hired_on__isnull=False), TENURE_ORDERINGS[order]
+
+def employee_list_source(employees, fields, ordering):
+    """
+    Queryset and serializer of an employee list page: only the requested columns for
+    ?fields=, values() rows and the values serializer when FAST_LIST_SERIALIZERS is on,
+    model instances otherwise.
+    """
+    if fields is not None:
+        return sparse_queryset(employees, EmployeeSerializer, fields, ordering), EmployeeSerializer
+    if fast_serializers_enabled():
+        return EmployeeValuesSerializer.project(employees), EmployeeValuesSerializer
+    return employees, EmployeeSerializer
+
 #LATER: Add Permissions 
+@query_budget({'GET': 1, 'POST': 6})
 @api_view(['GET', 'POST'])
 @permission_classes([IsAdmin | IsManager | IsHR])
 def list_employees (request):
     if request.method == 'GET':
-        employees = Employee.objects.all()
-        
-        # Filter by company if provided
-        company_id = request.query_params.get('company')
-        if company_id:
-            employees = employees.filter(company_id=company_id)
-        
-        # Filter by department if provided
-        department_id = request.query_params.get('department')
-        if department_id:
-            employees = employees.filter(department_id=department_id)
-        
-        serializer = EmployeeSerializer(employees, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        employees = filter_employees(request, Employee.objects.select_related('company', 'department'))
+        employees, ordering = order_employees(request, employees, ('name', 'id'))
+        fields = requested_fields(request, EmployeeSerializer)
+        employees, serializer_class = employee_list_source(employees, fields, ordering)
+        return paginated_response(request, employees, serializer_class, ordering=ordering,
+                                  context={'fields': fields})
     
     elif request.method == 'POST':
         if not (request.user.is_hr or request.user.is_admin):
@@ -98,30 +256,215 @@ def list_employees (request):
         employee = EmployeeSerializer (data=request.data)
         employee.is_valid(raise_exception=True)
         employee.save()
-        return Response(employee.data, status=status.HTTP_201_CREATED)
+        return Response(serializer_data(request, employee), status=status.HTTP_201_CREATED)
+
+
+@query_budget(1)
+@api_view(['GET'])
+@permission_classes([IsAdmin | IsManager | IsHR])
+def export_employees(request):
+    """
+    Stream every matching employee as NDJSON (default) or CSV (?type=csv).
+    Rows are generated from a server-side iterator, nothing is materialized up front
+    (under ASGI too, where the body is an async iterator pulling batches of lines).
+    """
+    export_type = request.query_params.get('type', 'ndjson')
+    if export_type not in EXPORT_CONTENT_TYPES:
+        return Response({"error": "type must be one of: ndjson, csv"}, status=status.HTTP_400_BAD_REQUEST)
+
+    employees, ordering = order_employees(request, filter_employees(request, Employee.objects.all()), ('id',))
+    employees = employees.order_by(*ordering)
+    stream = stream_csv(employees) if export_type == 'csv' else stream_ndjson(employees)
+    if served_async(request):
+        stream = astream(stream)
+    response = StreamingHttpResponse(stream, content_type=EXPORT_CONTENT_TYPES[export_type])
+    response['Content-Disposition'] = f'attachment; filename="employees.{export_type}"'
+    return response
 
 
+def id_param(request, name):
+    value = request.query_params.get(name)
+    if value in (None, ''):
+        return None
+    if not value.isdigit():
+        raise ValidationError({name: "Must be an id."})
+    return int(value)
+
+@query_budget(2)
+@api_view(['GET'])
+@permission_classes([IsAdmin | IsManager | IsHR])
+def search_employees(request):
+    """
+    Type-ahead search: employees whose name/email/designation words start with every
+    word of ?q=, best match first, optionally within ?company=/?department=.
+    Returns up to ?limit= (default 20) employees, no pagination, and `truncated` when the
+    query matched too many employees to rank them all (the client should ask for more words).
+    """
+    query = request.query_params.get('q', '')
+    if not search_terms(query):
+        raise ValidationError({"q": "Must contain at least one word."})
+    limit = request.query_params.get('limit', '20')
+    if not limit.isdigit() or not 0 < int(limit) <= KeysetPagination.max_page_size:
+        raise ValidationError({"limit": f"Must be between 1 and {KeysetPagination.max_page_size}."})
+    fields = requested_fields(request, EmployeeSerializer)
+
+    ids, truncated = search_employee_ids(query, id_param(request, 'company'), id_param(request, 'department'), int(limit))
+    employees = Employee.objects.select_related('company', 'department')
+    if fields is not None:
+        employees = sparse_queryset(employees, EmployeeSerializer, fields)
+    found = employees.in_bulk(ids)
+    results = [found[pk] for pk in ids if pk in found]
+    serializer = EmployeeSerializer(results, many=True, context={'fields': fields})
+    return Response({"results": serializer_data(request, serializer), "truncated": truncated},
+                    status=status.HTTP_200_OK)
+
+
+def import_query_budget(created):
+    """
+    Row validation (3 queries), the transaction, the two counter UPDATEs (with
+    COMPANY_STORED_COUNTERS on) and an INSERT per batch.
+    """
+    return 7 + ceil(created / import_batch_size())
+
+
+@query_budget(import_query_budget)
+@api_view(['POST'])
+@permission_classes([IsAdmin | IsHR])
+def bulk_import_employees(request):
+    """
+    Create many employees in one request from a JSON array or an uploaded CSV (`file`).
+    Either every row is valid and all are inserted, or nothing is written and per-row errors are returned.
+    """
+    if 'file' in request.FILES:
+        try:
+            rows = read_csv_rows(request.FILES['file'])
+        except InvalidCSV as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    elif isinstance(request.data, list):
+        rows = request.data
+    else:
+        return Response({"error": "Send a JSON array of employees or a CSV file in `file`."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    if not rows:
+        return Response({"error": "No employees to import."}, status=status.HTTP_400_BAD_REQUEST)
+
+    validated_rows, errors = validate_employee_rows(rows)
+    if errors:
+        return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        created = import_employees(validated_rows)
+    except IntegrityError:
+        # An email taken by a concurrent request since validation, the import was rolled back
+        return Response({"error": "Some of these emails were taken meanwhile, nothing was imported."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    return Response({"created": len(created)}, status=status.HTTP_201_CREATED)
+
+
+# Columns the employee ETag is built from
+ETAG_COLUMNS = ('version', 'company__name', 'department__name')
+
+def employee_etag(employee, fields=None):
+    """
+    ETag of an employee payload, all from the database so every worker agrees on it:
+    the row version, the company/department names the payload embeds, today's date
+    since days_employed changes daily, and the ?fields= selection.
+    """
+    department_name = employee.department.name if employee.department else ''
+    names = zlib.crc32(f'{employee.company.name}\0{department_name}'.encode())
+    return make_etag('employee', employee.pk, employee.version, f'{names:08x}',
+                     timezone.localdate(), *(fields or ()))
+
+# GET: the ETag columns on a failed revalidation, then the employee. PUT/PATCH: the employee,
+# company/department/email validation, the compare-and-set transaction (its BEGIN under
+# autocommit), the save and up to four counter UPDATEs when the employee moves. DELETE: the
+# employee, BEGIN, its project links, the row and the company/department counter UPDATEs.
+# Counter UPDATEs only run with COMPANY_STORED_COUNTERS on. Measured under autocommit, with
+# the counters on, by WriteQueryBudgetTests.
+@query_budget({'GET': 2, 'PUT': 12, 'PATCH': 12, 'DELETE': 6})
 @api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([IsAdmin | IsManager | IsHR])
 def employee_by_id(request, id):
+    fields = requested_fields(request, EmployeeSerializer) if request.method == 'GET' else None
+    employees = Employee.objects.select_related('company', 'department')
+    if request.method == 'GET' and request.headers.get('If-None-Match'):
+        # Revalidation only reads the ETag columns, no serialization
+        employee = employees.only(*ETAG_COLUMNS).filter(pk=id).first()
+        response = employee and not_modified(request, employee_etag(employee, fields))
+        if response:
+            return response
+
+    if fields is not None:
+        employees = sparse_queryset(employees, EmployeeSerializer, fields, ETAG_COLUMNS)
     try:
-        employee = Employee.objects.get(pk=id)
+        employee = employees.get(pk=id)
     except Employee.DoesNotExist as e:
         return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
     
     if request.method == 'GET':
-        serializer = EmployeeSerializer(employee)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        serializer = EmployeeSerializer(employee, context={'fields': fields})
+        return Response(serializer_data(request, serializer), status=status.HTTP_200_OK,
+                        headers={"ETag": employee_etag(employee, fields)})
     elif request.method == 'DELETE':
         employee.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
-    elif request.method == 'PUT':
-        serializer = EmployeeSerializer(employee, data=request.data)
+    elif request.method in ('PUT', 'PATCH'):
+        # Optimistic concurrency: only update the version the client read
+        response = precondition_failed(request, employee_etag(employee))
+        if response:
+            return response
+        serializer = EmployeeSerializer(employee, data=request.data, partial=request.method == 'PATCH')
         serializer.is_valid(raise_exception=True)
-        serializer.save()
-        return Response(serializer.data, status=status.HTTP_200_OK)
-    elif request.method == 'PATCH':
-        serializer = EmployeeSerializer(employee, data=request.data, partial=True)
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        with transaction.atomic():
+            # Compare-and-set on the version read above, so of two writers holding the
+            # same version only the first one saves (save() writes version + 1 as well)
+            if not Employee.objects.filter(pk=id, version=employee.version).update(version=F('version') + 1):
+                return Response(
+                    {"error": "The employee was changed by another request, fetch it again before updating."},
+                    status=status.HTTP_412_PRECONDITION_FAILED if request.headers.get('If-Match') else status.HTTP_409_CONFLICT,
+                )
+            serializer.save()
+        return Response(serializer_data(request, serializer), status=status.HTTP_200_OK,
+                        headers={"ETag": employee_etag(employee)})
+
+
+#PROJECT ENDPOINTS
+def project_queryset():
+    """
+    Projects with company/department joined and assigned employees prefetched
+    (only the columns ProjectSerializer shows), so any number of projects costs two queries.
+    """
+    return Project.objects.select_related('company', 'department').prefetch_related(
+        Prefetch('assigned_employees', queryset=Employee.objects.only('id', 'name', 'email'))
+    )
+
+@query_budget(2)
+@api_view(['GET'])
+@permission_classes([IsAdmin | IsManager | IsHR])
+def list_projects(request):
+    projects = project_queryset()
+
+    # Filter by company if provided
+    company_id = request.query_params.get('company')
+    if company_id:
+        projects = projects.filter(company_id=company_id)
+
+    # Filter by department if provided
+    department_id = request.query_params.get('department')
+    if department_id:
+        projects = projects.filter(department_id=department_id)
+
+    return paginated_response(request, projects, ProjectSerializer, ordering=('id',))
+
+@query_budget(2)
+@api_view(['GET'])
+@permission_classes([IsAdmin | IsManager | IsHR])
+def project_details(request, id):
+    try:
+        project = project_queryset().get(pk=id)
+    except Project.DoesNotExist as e:
+        return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+
+    serializer = ProjectSerializer(project)
+    return Response(serializer_data(request, serializer), status=status.HTTP_200_OK)
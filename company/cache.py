@@ -0,0 +1,6 @@
+"""
+Response cache of the company/department detail endpoints, served by /cache-stats/.
+"""
+from companyManagement.cache import ResponseCache
+
+response_cache = ResponseCache()
@@ -0,0 +1,45 @@
+from django.core.checks import Tags, Warning, register
+from django.db import connections
+from company.counters import find_drift
+from company.models import Company, stored_counters_enabled
+from company.search import missing_search_triggers
+
+
+@register(Tags.database)
+def check_search_triggers(app_configs, databases=None, **kwargs):
+    """
+    The employee search index only follows writes through its triggers, which SQLite
+    drops when a migration rebuilds the employee table.
+    """
+    return [
+        Warning(
+            f"Employee search triggers missing from the '{alias}' database: {', '.join(missing)}.",
+            hint="A migration rebuilt the employee table, run `python manage.py rebuild_employee_search`.",
+            id='company.W001',
+        )
+        for alias in databases or []
+        if (missing := missing_search_triggers(alias))
+    ]
+
+
+@register(Tags.database)
+def check_stored_counters(app_configs, databases=None, **kwargs):
+    """
+    The counter columns are not written while COMPANY_STORED_COUNTERS is off, so they
+    are stale when it gets switched on until they are recounted.
+    """
+    if not stored_counters_enabled():
+        return []
+    warnings = []
+    for alias in databases or []:
+        if Company._meta.db_table not in connections[alias].introspection.table_names():
+            continue  # not migrated yet
+        drifted = sum(len(pks) for pks in find_drift(alias).values())
+        if drifted:
+            warnings.append(Warning(
+                f"COMPANY_STORED_COUNTERS is on but {drifted} company/department row(s) of the "
+                f"'{alias}' database have stale counters.",
+                hint="Run `python manage.py recount_company_counters`.",
+                id='company.W002',
+            ))
+    return warnings
@@ -0,0 +1,117 @@
+from collections import Counter
+from django.db.models import Case, F, Q, Value, When
+from company.models import Company, Department, Employee, Project, count_subquery, stored_counters_enabled
+
+# The counter columns are only written while COMPANY_STORED_COUNTERS is on, so writes don't pay
+# for UPDATEs nothing reads. recount_all() brings them back in step when it is switched on.
+
+# Counter column each member model maintains on its company/department
+MEMBER_COUNTER_FIELDS = {
+    Employee: 'employees_total',
+    Project: 'projects_total',
+}
+
+
+def adjust(model, pk, field, delta):
+    """
+    Atomic `UPDATE ... SET field = field + delta` on a single row.
+    """
+    if pk is not None and delta:
+        model.objects.filter(pk=pk).update(**{field: F(field) + delta})
+
+
+def adjust_many(model, field, deltas):
+    """
+    adjust() of many rows in one `UPDATE ... SET field = field + CASE id WHEN ... END`.
+    `deltas` maps pks to their delta.
+    """
+    deltas = {pk: delta for pk, delta in deltas.items() if pk is not None and delta}
+    if deltas:
+        model.objects.filter(pk__in=deltas).update(**{field: F(field) + Case(
+            *(When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()),
+            default=Value(0),
+        )})
+
+
+def member_moved(member_model, old, new):
+    """
+    Keep company/department counters in step with an Employee or Project.
+    `old`/`new` are (company_id, department_id) before and after the write,
+    None for a create (old) or a delete (new).
+    """
+    if not stored_counters_enabled():
+        return
+    field = MEMBER_COUNTER_FIELDS[member_model]
+    old_company_id, old_department_id = old or (None, None)
+    new_company_id, new_department_id = new or (None, None)
+    if old_company_id != new_company_id:
+        adjust(Company, old_company_id, field, -1)
+        adjust(Company, new_company_id, field, 1)
+    if old_department_id != new_department_id:
+        adjust(Department, old_department_id, field, -1)
+        adjust(Department, new_department_id, field, 1)
+
+
+def department_moved(old_company_id, new_company_id):
+    """
+    Same as member_moved for a Department and its company's departments_total.
+    """
+    if stored_counters_enabled() and old_company_id != new_company_id:
+        adjust(Company, old_company_id, 'departments_total', -1)
+        adjust(Company, new_company_id, 'departments_total', 1)
+
+
+def members_added(member_model, rows):
+    """
+    Counter bump for rows inserted with bulk_create (which sends no signals),
+    one UPDATE for the companies and one for the departments.
+    `rows` are (company_id, department_id) pairs.
+    """
+    if not stored_counters_enabled():
+        return
+    field = MEMBER_COUNTER_FIELDS[member_model]
+    rows = list(rows)
+    adjust_many(Company, field, Counter(company_id for company_id, _ in rows))
+    adjust_many(Department, field, Counter(department_id for _, department_id in rows))
+
+
+def actual_counts():
+    """
+    Expressions recomputing every counter column from the related tables, per model.
+    """
+    return {
+        Company: {
+            'departments_total': count_subquery(Department, 'company'),
+            'employees_total': count_subquery(Employee, 'company'),
+            'projects_total': count_subquery(Project, 'company'),
+        },
+        Department: {
+            'employees_total': count_subquery(Employee, 'department'),
+            'projects_total': count_subquery(Project, 'department'),
+        },
+    }
+
+
+def find_drift(using='default'):
+    """
+    Primary keys per model of the rows whose stored counters differ from the real counts.
+    """
+    drift = {}
+    for model, expressions in actual_counts().items():
+        annotations = {f'actual_{field}': expression for field, expression in expressions.items()}
+        mismatch = Q()
+        for field in expressions:
+            mismatch |= ~Q(**{field: F(f'actual_{field}')})
+        drift[model] = list(model.objects.using(using).annotate(**annotations).filter(mismatch).values_list('pk', flat=True))
+    return drift
+
+
+def recount_all():
+    """
+    Rewrite every counter column with one UPDATE per model.
+    Returns the number of rows updated per model.
+    """
+    return {
+        model: model.objects.update(**expressions)
+        for model, expressions in actual_counts().items()
+    }
@@ -0,0 +1,328 @@
+import json
+import math
+import platform
+import statistics
+import time
+import tracemalloc
+from typing import NamedTuple
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from accounts.api.serializers import CustomTokenObtainPairSerializer
+from company.models import Company, Department, Employee, Project
+from reviews.models import PerformanceReview
+
+User = get_user_model()
+Status = PerformanceReview.Status
+
+# URL namespaces covered, every named route under them needs a scenario
+API_PREFIXES = ("api/accounts/", "api/company/", "api/reviews/", "api/metrics/")
+# Rows touched by the bulk endpoints per request
+BULK_SIZE = 100
+
+
+class Scenario(NamedTuple):
+    url_name: str
+    method: str
+    path: str
+    role: str = None  # None: anonymous
+    data: object = None
+    expected: int = 200
+
+    @property
+    def writes(self):
+        return self.method != "GET"
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every accounts/company/reviews API endpoint through the Django test client "
+        "against the configured database (fill it with `generate_dataset` first). Reports p50/p95/p99 "
+        "latency, queries per request and peak Python memory per endpoint as JSON. Write requests "
+        "run in a transaction that is rolled back, so the data is the same for every iteration."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20, help="Timed requests per endpoint.")
+        parser.add_argument("--warmup", type=int, default=2, help="Untimed requests per endpoint first.")
+        parser.add_argument("--only", nargs="*", default=(), help="Only endpoints whose name contains one of these.")
+        parser.add_argument("--password", default="benchmark-pass", help="Password of the users (as generated).")
+        parser.add_argument("--label", default="", help="Version label stored in the report, e.g. a commit.")
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+        parser.add_argument("--baseline", help="Earlier JSON report to compare against.")
+        parser.add_argument(
+            "--threshold", type=float, default=0.2,
+            help="Relative p50 increase flagged as a regression against the baseline.",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1.")
+        self.password = options["password"]
+        scenarios = self.scenarios()
+        covered = {scenario.url_name for scenario in scenarios}
+        not_covered = sorted(name for name in api_url_names() if name not in covered)
+        for name in not_covered:
+            self.stderr.write(f"No scenario for {name}, skipped.")
+        if options["only"]:
+            scenarios = [s for s in scenarios if any(part in self.label(s) for part in options["only"])]
+
+        # DEBUG would record every query of every request
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=["testserver"]):
+            results = {}
+            for scenario in scenarios:
+                results[self.label(scenario)] = self.measure(scenario, options)
+                self.stderr.write(self.summary_line(self.label(scenario), results[self.label(scenario)]))
+
+        report = {
+            "meta": {
+                "label": options["label"],
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "iterations": options["iterations"],
+                "dataset": {
+                    model._meta.model_name: model.objects.count()
+                    for model in (Company, Department, Employee, Project, User, PerformanceReview)
+                },
+            },
+            "endpoints": results,
+            "not_covered": not_covered,
+        }
+        if options["baseline"]:
+            with open(options["baseline"]) as baseline:
+                report["comparison"] = compare(results, json.load(baseline)["endpoints"], options["threshold"])
+            for name, change in report["comparison"].items():
+                if change["regression"]:
+                    self.stderr.write(self.style.WARNING(
+                        f"Regression {name}: p50 x{change['p50_ratio']:.2f}, queries {change['queries_delta']:+d}"
+                    ))
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+    @staticmethod
+    def label(scenario):
+        return f"{scenario.method} {scenario.url_name}"
+
+    @staticmethod
+    def summary_line(name, result):
+        return (
+            f"{name:55} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+            f"queries {result['queries']:3d}  peak {result['peak_memory_kb']:8.0f} KB  errors {result['errors']}"
+        )
+
+    def user(self, role):
+        user = User.objects.filter(role=role).order_by("pk").first()
+        if user is None:
+            raise CommandError(f"No {role} user in the database, run generate_dataset first.")
+        return user
+
+    def scenarios(self):
+        """
+        One request per endpoint (and method), against rows sampled from the database.
+        """
+        def first(queryset, what):
+            obj = queryset.order_by("pk").first()
+            if obj is None:
+                raise CommandError(f"No {what} in the database, run generate_dataset first.")
+            return obj
+
+        def review_ids(status):
+            ids = list(PerformanceReview.objects.filter(status=status).order_by("pk").values_list("pk", flat=True)[:BULK_SIZE])
+            if not ids:
+                raise CommandError(f"No {status} review in the database, run generate_dataset first.")
+            return ids
+
+        company = first(Company.objects.all(), "company")
+        department = first(Department.objects.filter(company=company), "department")
+        employee = first(Employee.objects.filter(department=department), "employee")
+        project = first(Project.objects.all(), "project")
+        reviewed = first(PerformanceReview.objects.all(), "review")
+        self.review_owner = reviewed.employee
+        pending, scheduled, feedback, under_approval = (
+            review_ids(status) for status in (Status.PENDING, Status.SCHEDULED, Status.FEEDBACK_PROVIDED, Status.UNDER_APPROVAL)
+        )
+        admin, hr, manager, staff = User.Roles.ADMIN, User.Roles.HR, User.Roles.MANAGER, User.Roles.EMPLOYEE
+        login_user = self.user(admin)
+        new_employee = {"company": company.pk, "department": department.pk, "name": "Bench Mark",
+                        "email": "bench.mark@bench.test", "designation": "Tester", "hired_on": "2024-01-01"}
+
+        return [
+            # accounts
+            Scenario("token_obtain_pair", "POST", reverse("token_obtain_pair"),
+                     data={"email": login_user.email, "password": self.password}),
+            Scenario("token_refresh", "POST", reverse("token_refresh"),
+                     data={"refresh": str(CustomTokenObtainPairSerializer.get_token(login_user))}),
+            Scenario("register_user", "POST", reverse("register_user"), expected=201,
+                     data={"email": "new.user@bench.test", "username": "bench-new-user",
+                           "role": staff, "password": "A-long-benchmark-password-1"}),
+            # company
+            Scenario("list-all-companies", "GET", reverse("list-all-companies"), admin),
+            Scenario("retrieve-single-company", "GET", reverse("retrieve-single-company", args=[company.pk]), admin),
+            Scenario("list-all-departments", "GET", reverse("list-all-departments"), admin, {"company": company.pk}),
+            Scenario("retrieve-single-department", "GET", reverse("retrieve-single-department", args=[department.pk]), admin),
+            Scenario("cache-stats", "GET", reverse("cache-stats"), admin),
+            Scenario("list-all/add-employee", "GET", reverse("list-all/add-employee"), admin, {"company": company.pk}),
+            Scenario("list-all/add-employee", "POST", reverse("list-all/add-employee"), hr, new_employee, 201),
+            Scenario("export-employees", "GET", reverse("export-employees"), admin, {"department": department.pk}),
+            Scenario("search-employees", "GET", reverse("search-employees"), admin,
+                     {"q": employee.name.split()[0][:3]}),
+            Scenario("bulk-import-employees", "POST", reverse("bulk-import-employees"), hr, [
+                {**new_employee, "email": f"bench.import.{n}@bench.test"} for n in range(BULK_SIZE)
+            ], 201),
+            Scenario("retrieve/edit/delete-single-employee", "GET",
+                     reverse("retrieve/edit/delete-single-employee", args=[employee.pk]), admin),
+            Scenario("retrieve/edit/delete-single-employee", "PATCH",
+                     reverse("retrieve/edit/delete-single-employee", args=[employee.pk]), hr, {"designation": "Lead"}),
+            Scenario("retrieve/edit/delete-single-employee", "DELETE",
+                     reverse("retrieve/edit/delete-single-employee", args=[employee.pk]), hr, expected=204),
+            Scenario("async-list-employees", "GET", reverse("async-list-employees"), admin, {"company": company.pk}),
+            Scenario("async-retrieve-single-employee", "GET",
+                     reverse("async-retrieve-single-employee", args=[employee.pk]), admin),
+            Scenario("list-all-projects", "GET", reverse("list-all-projects"), admin, {"company": company.pk}),
+            Scenario("retrieve-single-project", "GET", reverse("retrieve-single-project", args=[project.pk]), admin),
+            # reviews
+            Scenario("review-list", "GET", reverse("review-list"), manager),
+            Scenario("review-detail", "GET", reverse("review-detail", args=[reviewed.pk]), manager),
+            Scenario("emp-reviews", "GET", reverse("emp-reviews"), "owner"),
+            Scenario("review-dashboard", "GET", reverse("review-dashboard"), manager),
+            Scenario("review-list-async", "GET", reverse("review-list-async"), manager),
+            Scenario("review-detail-async", "GET", reverse("review-detail-async", args=[reviewed.pk]), manager),
+            Scenario("review-assign", "POST", reverse("review-assign"), hr, {"employee": self.user(staff).pk}, 201),
+            Scenario("review-assign-bulk", "POST", reverse("review-assign-bulk"), hr, {"company": company.pk}, 201),
+            Scenario("review-confirm", "PATCH", reverse("review-confirm", args=[pending[0]]), staff),
+            Scenario("review-feedback", "PATCH", reverse("review-feedback", args=[scheduled[0]]), hr,
+                     {"feedback": "Benchmark feedback"}),
+            Scenario("review-push", "PATCH", reverse("review-push", args=[feedback[0]]), hr),
+            Scenario("review-approve", "PATCH", reverse("review-approve", args=[under_approval[0]]), manager),
+            Scenario("review-reject", "PATCH", reverse("review-reject", args=[under_approval[0]]), manager),
+            Scenario("review-bulk-confirm", "PATCH", reverse("review-bulk-confirm"), staff, {"ids": pending}),
+            Scenario("review-bulk-push", "PATCH", reverse("review-bulk-push"), hr, {"ids": feedback}),
+            Scenario("review-bulk-approve", "PATCH", reverse("review-bulk-approve"), manager, {"ids": under_approval}),
+            Scenario("review-bulk-reject", "PATCH", reverse("review-bulk-reject"), manager, {"ids": under_approval}),
+            Scenario("metrics", "GET", reverse("metrics"), admin),
+        ]
+
+    def headers(self, role):
+        if role is None:
+            return {}
+        user = self.review_owner if role == "owner" else self.user(role)
+        # Issued per scenario, access tokens are short-lived
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        return {"Authorization": f"Bearer {token}"}
+
+    def send(self, client, scenario, headers):
+        if scenario.method == "GET":
+            response = client.get(scenario.path, scenario.data, headers=headers)
+        else:
+            response = client.generic(
+                scenario.method, scenario.path,
+                json.dumps(scenario.data) if scenario.data is not None else "",
+                content_type="application/json", headers=headers,
+            )
+        if response.streaming:
+            b"".join(response.streaming_content)
+        return response
+
+    def request(self, client, scenario, headers):
+        """
+        Time one request and count its queries. Writes are rolled back.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            if scenario.writes:
+                with transaction.atomic():
+                    start = time.perf_counter()
+                    response = self.send(client, scenario, headers)
+                    elapsed = time.perf_counter() - start
+                    transaction.set_rollback(True)
+            else:
+                start = time.perf_counter()
+                response = self.send(client, scenario, headers)
+                elapsed = time.perf_counter() - start
+        return elapsed, len(queries), response.status_code
+
+    def measure(self, scenario, options):
+        client = Client()
+        headers = self.headers(scenario.role)
+        for _ in range(options["warmup"]):
+            self.request(client, scenario, headers)
+
+        timings, query_counts, errors = [], [], 0
+        for _ in range(options["iterations"]):
+            elapsed, queries, status_code = self.request(client, scenario, headers)
+            timings.append(elapsed * 1000)
+            query_counts.append(queries)
+            errors += status_code != scenario.expected
+
+        # One more request under tracemalloc, which slows everything down too much to time with it
+        tracemalloc.start()
+        try:
+            self.request(client, scenario, headers)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {
+            "p50_ms": percentile(timings, 50),
+            "p95_ms": percentile(timings, 95),
+            "p99_ms": percentile(timings, 99),
+            "mean_ms": statistics.fmean(timings),
+            "queries": max(query_counts),
+            "peak_memory_kb": peak / 1024,
+            "errors": errors,
+        }
+
+
+def percentile(values, p):
+    """
+    Nearest-rank percentile.
+    """
+    ordered = sorted(values)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+def api_url_names():
+    """
+    Names of the routes under API_PREFIXES.
+    """
+    names = set()
+
+    def walk(patterns, prefix):
+        for pattern in patterns:
+            route = prefix + str(pattern.pattern)
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns, route)
+            elif isinstance(pattern, URLPattern) and pattern.name and route.startswith(API_PREFIXES):
+                names.add(pattern.name)
+
+    walk(get_resolver().url_patterns, "")
+    return names
+
+
+def compare(results, baseline, threshold):
+    """
+    p50 ratio and query count change of each endpoint also in `baseline`.
+    """
+    comparison = {}
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        ratio = current["p50_ms"] / before["p50_ms"] if before["p50_ms"] else 1.0
+        queries_delta = current["queries"] - before["queries"]
+        comparison[name] = {
+            "p50_ratio": ratio,
+            "queries_delta": queries_delta,
+            "regression": ratio > 1 + threshold or queries_delta > 0,
+        }
+    return comparison
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import ThreadSensitiveContext
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from company.models import Employee
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "SIMULATION, not a server benchmark: drive the sync employee list from a thread pool "
+        "(WSGI-style) and the async one from coroutines on one event loop (ASGI-style), in "
+        "process through the test clients, against the configured database. --client-delay "
+        "models a slow client as a sleep after the response is built (blocking a pool thread "
+        "vs awaited), so with it the difference comes from that model, not from the views. "
+        "For real numbers, load-test the app under a WSGI server (gunicorn) and an ASGI "
+        "server (uvicorn)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per variant.")
+        parser.add_argument("--concurrency", type=int, default=200, help="Requests in flight at once.")
+        parser.add_argument(
+            "--threads", type=int, default=8,
+            help="Worker threads of the sync variant (a threaded WSGI worker).",
+        )
+        parser.add_argument(
+            "--client-delay", type=float, default=0.0,
+            help="Simulated slow client: milliseconds slept after each response (in a pool thread for sync, awaited for async).",
+        )
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+
+    def handle(self, *args, **options):
+        if not Employee.objects.exists():
+            self.stderr.write("No employees in the database, the list pages will be empty.")
+
+        # Stateless auth: an admin token needs no user row
+        token = AccessToken()
+        token["user_id"] = 0
+        token["role"] = User.Roles.ADMIN
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.delay = options["client_delay"] / 1000
+
+        # DEBUG would record every query of every request
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=["testserver"]):
+            results = {
+                "sync": self.run_sync(reverse("list-all/add-employee"), options),
+                "async": asyncio.run(self.run_async(reverse("async-list-employees"), options)),
+            }
+
+        simulation = {
+            "in_process": True,
+            "sync_threads": min(options["threads"], options["concurrency"]),
+            "async_concurrency": options["concurrency"],
+            "client_delay_ms": options["client_delay"],
+        }
+        if options["json"]:
+            self.stdout.write(json.dumps({"simulation": simulation, **results}, indent=2))
+            return
+        self.stdout.write(
+            f"In-process simulation ({simulation['sync_threads']} threads vs {simulation['async_concurrency']} "
+            f"coroutines, simulated client delay {options['client_delay']:.0f} ms), not a server benchmark."
+        )
+        for name, result in results.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(
+                f"  {result['requests_per_second']:.0f} req/s  "
+                f"p50 {result['p50_ms']:.1f} ms  p95 {result['p95_ms']:.1f} ms  "
+                f"errors {result['errors']}  peak threads {result['peak_threads']}"
+            )
+
+    def summarize(self, timings, errors, elapsed, peak_threads):
+        timings.sort()
+        return {
+            "requests": len(timings),
+            "errors": errors,
+            "requests_per_second": len(timings) / elapsed,
+            "p50_ms": statistics.median(timings) * 1000,
+            "p95_ms": timings[int(len(timings) * 0.95) - 1] * 1000,
+            "peak_threads": peak_threads,
+        }
+
+    def run_sync(self, url, options):
+        """
+        The sync view behind a pool of worker threads: a slow client holds its thread.
+        """
+        local = threading.local()
+        data = {"page_size": options["page_size"]}
+        peak_threads = threading.active_count()
+
+        def request(_):
+            nonlocal peak_threads
+            if not hasattr(local, "client"):
+                local.client = Client()
+            start = time.perf_counter()
+            response = local.client.get(url, data, headers=self.headers)
+            time.sleep(self.delay)
+            peak_threads = max(peak_threads, threading.active_count())
+            return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(options["threads"], options["concurrency"])) as pool:
+            outcomes = list(pool.map(request, range(options["requests"])))
+        elapsed = time.perf_counter() - start
+
+        errors = sum(1 for _, code in outcomes if code != 200)
+        return self.summarize([timing for timing, _ in outcomes], errors, elapsed, peak_threads)
+
+    async def run_async(self, url, options):
+        """
+        The async view on one event loop: a slow client is just a pending coroutine.
+        """
+        client = AsyncClient()
+        data = {"page_size": options["page_size"]}
+        slots = asyncio.Semaphore(options["concurrency"])
+        peak_threads = threading.active_count()
+
+        async def request():
+            nonlocal peak_threads
+            async with slots:
+                start = time.perf_counter()
+                # As Django's ASGIHandler does per request (AsyncClient doesn't): the request's
+                # sync_to_async calls get their own thread instead of sharing one with the others
+                async with ThreadSensitiveContext():
+                    response = await client.get(url, data, headers=self.headers)
+                await asyncio.sleep(self.delay)
+                peak_threads = max(peak_threads, threading.active_count())
+                return time.perf_counter() - start, response.status_code
+
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(*(request() for _ in range(options["requests"])))
+        elapsed = time.perf_counter() - start
+
+        errors = sum(1 for _, code in outcomes if code != 200)
+        return self.summarize([timing for timing, _ in outcomes], errors, elapsed, peak_threads)
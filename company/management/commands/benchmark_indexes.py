@@ -0,0 +1,173 @@
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from company.models import Company, Department, Employee
+from reviews.models import PerformanceReview
+
+User = get_user_model()
+
+BENCHMARK_ALIAS = "index_benchmark"
+INSERT_CHUNK = 10000
+
+
+class Command(BaseCommand):
+    help = (
+        "Build a throwaway SQLite database, fill it with synthetic employees and reviews, "
+        "and compare query plans/latency of the filtered list queries before and after the "
+        "index migrations (everything after each app's 0001)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Employees and reviews to generate (each).")
+        parser.add_argument("--companies", type=int, default=100)
+        parser.add_argument("--departments", type=int, default=10, help="Departments per company.")
+        parser.add_argument("--repeat", type=int, default=20, help="Runs per query, the median is reported.")
+        parser.add_argument("--db", help="SQLite file to build (default: a temporary file).")
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+
+    def handle(self, *args, **options):
+        if options["db"] and os.path.exists(options["db"]):
+            raise CommandError(f"{options['db']} already exists, the benchmark needs a fresh database file.")
+        path = options["db"] or tempfile.NamedTemporaryFile(suffix=".sqlite3", delete=False).name
+        connections.databases[BENCHMARK_ALIAS] = {**connections.databases["default"], "NAME": path}
+        connection = connections[BENCHMARK_ALIAS]
+        random.seed(42)
+
+        self.stderr.write(f"Building {path} ...")
+        try:
+            with connection.cursor() as cursor:
+                # Throwaway database, durability doesn't matter
+                cursor.execute("PRAGMA synchronous = OFF")
+                cursor.execute("PRAGMA journal_mode = MEMORY")
+            for app in ("accounts", "company", "reviews"):
+                call_command("migrate", app, "0001", database=BENCHMARK_ALIAS, verbosity=0)
+            self.populate(connection, options)
+
+            results = {"rows": options["rows"], "before": self.measure(connection, options)}
+
+            call_command("migrate", "company", database=BENCHMARK_ALIAS, verbosity=0)
+            call_command("migrate", "reviews", database=BENCHMARK_ALIAS, verbosity=0)
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+            results["after"] = self.measure(connection, options)
+        finally:
+            connection.close()
+            # Forget the connection too, or a second run in the process would reuse its file name
+            del connections[BENCHMARK_ALIAS]
+            del connections.databases[BENCHMARK_ALIAS]
+            if not options["db"]:
+                # A million-row temporary file, even when the run fails or is interrupted
+                os.remove(path)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for name in results["before"]:
+            before, after = results["before"][name], results["after"][name]
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(f"  before: {before['median_ms']:.3f} ms  {before['plan']}")
+            self.stdout.write(f"  after:  {after['median_ms']:.3f} ms  {after['plan']}")
+
+    def populate(self, connection, options):
+        rows, companies, departments = options["rows"], options["companies"], options["departments"]
+        users = max(rows // 20, 1)
+        now = datetime(2025, 1, 1)
+        stamp = "%Y-%m-%d %H:%M:%S"
+        statuses = list(PerformanceReview.Status.values)
+
+        with transaction.atomic(using=BENCHMARK_ALIAS), connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO "{Company._meta.db_table}" (id, name) VALUES (%s, %s)',
+                [(c, f"Company {c}") for c in range(1, companies + 1)],
+            )
+            cursor.executemany(
+                f'INSERT INTO "{Department._meta.db_table}" (id, company_id, name) VALUES (%s, %s, %s)',
+                [
+                    ((c - 1) * departments + d, c, f"Department {d}")
+                    for c in range(1, companies + 1) for d in range(1, departments + 1)
+                ],
+            )
+            self.insert_chunked(
+                cursor,
+                f'INSERT INTO "{User._meta.db_table}" (id, password, is_superuser, username, first_name, last_name, '
+                "email, is_staff, is_active, date_joined, role) VALUES (%s, '!', 0, %s, '', '', %s, 0, 1, %s, %s)",
+                ((u, f"user{u}", f"user{u}@bench.test", now.strftime(stamp), User.Roles.EMPLOYEE) for u in range(1, users + 1)),
+            )
+
+            def employees():
+                for e in range(1, rows + 1):
+                    company = random.randint(1, companies)
+                    department = (company - 1) * departments + random.randint(1, departments)
+                    yield (e, company, department, f"Employee {random.randint(1, rows):08d}", f"employee{e}@bench.test")
+
+            self.insert_chunked(
+                cursor,
+                f'INSERT INTO "{Employee._meta.db_table}" (id, company_id, department_id, name, email, '
+                "mobile_number, address, designation, hired_on) VALUES (%s, %s, %s, %s, %s, '', '', '', NULL)",
+                employees(),
+            )
+
+            def reviews():
+                for r in range(1, rows + 1):
+                    created = (now - timedelta(minutes=random.randint(0, 525_600))).strftime(stamp)
+                    yield (r, random.randint(1, users), random.choice(statuses), created, created)
+
+            self.insert_chunked(
+                cursor,
+                f'INSERT INTO "{PerformanceReview._meta.db_table}" (id, employee_id, status, created_at, updated_at) '
+                "VALUES (%s, %s, %s, %s, %s)",
+                reviews(),
+            )
+            cursor.execute("ANALYZE")
+
+    def insert_chunked(self, cursor, sql, rows):
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == INSERT_CHUNK:
+                cursor.executemany(sql, chunk)
+                chunk = []
+        if chunk:
+            cursor.executemany(sql, chunk)
+
+    def queries(self, options):
+        """
+        The access paths of list_employees, list_reviews and emp_reviews (first keyset page).
+        """
+        company = min(7, options["companies"])
+        department = (company - 1) * options["departments"] + 1
+        # Only the 0001 columns, so the same SQL runs before and after
+        employees = Employee.objects.using(BENCHMARK_ALIAS).defer("version")
+        reviews = PerformanceReview.objects.using(BENCHMARK_ALIAS)
+        return {
+            "employees by company": employees.filter(company_id=company).order_by("name", "id")[:50],
+            "employees by company+department": employees.filter(company_id=company, department_id=department).order_by("name", "id")[:50],
+            "employees by department": employees.filter(department_id=department).order_by("name", "id")[:50],
+            "reviews by employee+status": reviews.filter(employee_id=11, status="PENDING").order_by("-created_at", "-id")[:50],
+            "reviews by status": reviews.filter(status="UNDER_APPROVAL").order_by("-created_at", "-id")[:50],
+            "emp reviews": reviews.filter(employee_id=11).order_by("-created_at", "-id")[:50],
+        }
+
+    def measure(self, connection, options):
+        results = {}
+        for name, queryset in self.queries(options).items():
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                plan = "; ".join(row[-1] for row in cursor.fetchall())
+                timings = []
+                for _ in range(options["repeat"]):
+                    start = time.perf_counter()
+                    cursor.execute(sql, params)
+                    cursor.fetchall()
+                    timings.append((time.perf_counter() - start) * 1000)
+            results[name] = {"median_ms": statistics.median(timings), "plan": plan}
+        return results
@@ -0,0 +1,223 @@
+import random
+import time
+from collections import defaultdict
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from company import counters
+from company.models import Company, Department, Employee, Project
+from company.signals import invalidate_companies
+from reviews.models import PerformanceReview
+from reviews.signals import invalidate_dashboard
+
+User = get_user_model()
+Status = PerformanceReview.Status
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Omar", "Mona",
+    "Ahmed", "Fatma", "Youssef", "Nour", "Karim", "Laila", "Hassan", "Salma", "Ali", "Hana",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "White",
+    "Hassan", "Mostafa", "Ibrahim", "Mahmoud", "Salem", "Fahmy", "Nasser", "Khalil", "Saad", "Farouk",
+]
+DEPARTMENTS = [
+    "Engineering", "HR", "Sales", "Marketing", "Finance", "Support", "Operations", "Legal", "Design", "Research",
+]
+DESIGNATIONS = [
+    "Software Engineer", "Senior Software Engineer", "QA Engineer", "HR Specialist", "Account Executive",
+    "Marketing Specialist", "Accountant", "Support Agent", "Operations Analyst", "Designer", "Team Lead",
+]
+# Share of the generated users per role, everyone else is an EMPLOYEE
+ROLE_SHARES = {User.Roles.ADMIN: 0.01, User.Roles.HR: 0.05, User.Roles.MANAGER: 0.05}
+# Statuses that went through scheduling/feedback
+SCHEDULED_STATUSES = {Status.SCHEDULED, Status.FEEDBACK_PROVIDED, Status.UNDER_APPROVAL, Status.APPROVED, Status.REJECTED}
+FEEDBACK_STATUSES = {Status.FEEDBACK_PROVIDED, Status.UNDER_APPROVAL, Status.APPROVED, Status.REJECTED}
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-generate a synthetic dataset: companies, departments, employees, projects with "
+        "assigned employees, user accounts of every role and performance reviews in every status. "
+        "Rows are added to what the database already holds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--companies", type=int, default=20)
+        parser.add_argument("--departments", type=int, default=5, help="Departments per company.")
+        parser.add_argument("--employees", type=int, default=20_000)
+        parser.add_argument("--projects", type=int, default=500)
+        parser.add_argument("--assignments", type=int, default=5, help="Employees assigned per project.")
+        parser.add_argument("--users", type=int, default=2_000, help="User accounts (at least one per role).")
+        parser.add_argument("--reviews", type=int, default=20_000)
+        parser.add_argument("--days", type=int, default=365, help="Hire/review dates are spread over this many past days.")
+        parser.add_argument("--password", default="benchmark-pass", help="Password of every generated user.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        if options["companies"] < 1 or options["departments"] < 1:
+            raise CommandError("At least one company and one department per company are needed.")
+        if options["users"] < len(ROLE_SHARES) + 1:
+            raise CommandError(f"At least {len(ROLE_SHARES) + 1} users are needed (one per role).")
+        random.seed(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.today = timezone.now().date()
+        self.days = max(options["days"], 1)
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            companies = self.create_companies(options)
+            departments = self.create_departments(companies, options)
+            employees = self.create_employees(departments, options)
+            self.create_projects(departments, employees, options)
+            users = self.create_users(employees, options)
+            self.create_reviews(users, options)
+
+        # bulk_create sends no signals: recompute the counters and drop what the caches hold
+        counters.recount_all()
+        invalidate_companies(companies)
+        invalidate_dashboard()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(companies)} companies, {sum(len(d) for d in departments.values())} departments, "
+            f"{len(employees)} employees, {options['projects']} projects, {options['users']} users and "
+            f"{options['reviews']} reviews in {time.perf_counter() - start:.1f}s."
+        ))
+
+    def bulk_create(self, model, objects):
+        return model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def past_date(self):
+        return self.today - timedelta(days=random.randrange(self.days))
+
+    def create_companies(self, options):
+        offset = Company.objects.count()
+        companies = self.bulk_create(Company, [
+            Company(name=f"Company {offset + n}") for n in range(1, options["companies"] + 1)
+        ])
+        return [company.pk for company in companies]
+
+    def create_departments(self, companies, options):
+        """
+        Department ids per company id.
+        """
+        created = self.bulk_create(Department, [
+            Department(company_id=company_id, name=DEPARTMENTS[n % len(DEPARTMENTS)] + ("" if n < len(DEPARTMENTS) else f" {n}"))
+            for company_id in companies for n in range(options["departments"])
+        ])
+        departments = defaultdict(list)
+        for department in created:
+            departments[department.company_id].append(department.pk)
+        return departments
+
+    def create_employees(self, departments, options):
+        """
+        (id, company id, email) of every generated employee.
+        """
+        offset = Employee.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        companies = list(departments)
+        employees = []
+        for n in range(offset + 1, offset + options["employees"] + 1):
+            company_id = random.choice(companies)
+            first, last = random.choice(FIRST_NAMES), random.choice(LAST_NAMES)
+            employees.append(Employee(
+                company_id=company_id,
+                # a few employees without a department
+                department_id=random.choice(departments[company_id]) if n % 20 else None,
+                name=f"{first} {last}",
+                email=f"{first}.{last}.{n}@company{company_id}.test".lower(),
+                mobile_number=f"+20 1{n:09d}",
+                address=f"{n} Main Street",
+                designation=random.choice(DESIGNATIONS),
+                hired_on=self.past_date() if n % 10 else None,
+            ))
+        return [(employee.pk, employee.company_id, employee.email) for employee in self.bulk_create(Employee, employees)]
+
+    def create_projects(self, departments, employees, options):
+        by_company = defaultdict(list)
+        for pk, company_id, _ in employees:
+            by_company[company_id].append(pk)
+        companies = list(departments)
+
+        projects = []
+        for n in range(1, options["projects"] + 1):
+            company_id = random.choice(companies)
+            started = self.past_date()
+            projects.append(Project(
+                company_id=company_id,
+                department_id=random.choice(departments[company_id]),
+                name=f"Project {n}",
+                description=f"Synthetic project {n}",
+                start_date=started,
+                end_date=started + timedelta(days=random.randint(30, 365)) if n % 3 else None,
+            ))
+        projects = self.bulk_create(Project, projects)
+
+        # Only employees of the project's company are assigned
+        Assignment = Project.assigned_employees.through
+        assignments = []
+        for project in projects:
+            members = by_company[project.company_id]
+            for employee_id in random.sample(members, min(options["assignments"], len(members))):
+                assignments.append(Assignment(project_id=project.pk, employee_id=employee_id))
+        self.bulk_create(Assignment, assignments)
+
+    def create_users(self, employees, options):
+        """
+        User ids per role. EMPLOYEE accounts take the emails of company employees, which is
+        how accounts and employees are linked (see BulkAssignReviewSerializer).
+        """
+        offset = User.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        password = make_password(options["password"])  # hashing once, not per user
+        total = options["users"]
+        roles = []
+        for role, share in ROLE_SHARES.items():
+            roles += [role] * max(1, int(total * share))
+        roles += [User.Roles.EMPLOYEE] * (total - len(roles))
+
+        emails = [email for _, _, email in employees]
+        users = []
+        for n, role in enumerate(roles, start=offset + 1):
+            if role == User.Roles.EMPLOYEE and emails:
+                email = emails.pop()
+            else:
+                email = f"{role.lower()}.{n}@bench.test"
+            users.append(User(username=f"user{n}", email=email, role=role, password=password))
+
+        by_role = defaultdict(list)
+        for user in self.bulk_create(User, users):
+            by_role[user.role].append(user.pk)
+        return by_role
+
+    def create_reviews(self, users, options):
+        statuses = list(Status)
+        reviews = []
+        for n in range(options["reviews"]):
+            status = statuses[n % len(statuses)]  # every status, evenly
+            reviews.append(PerformanceReview(
+                employee_id=random.choice(users[User.Roles.EMPLOYEE]),
+                assigner_id=random.choice(users[User.Roles.HR]),
+                approved_by_id=random.choice(users[User.Roles.MANAGER]) if status == Status.APPROVED else None,
+                scheduled_at=timezone.now() + timedelta(days=random.randint(1, 30)) if status in SCHEDULED_STATUSES else None,
+                feedback=f"Synthetic feedback {n}" if status in FEEDBACK_STATUSES else None,
+                status=status,
+            ))
+        reviews = self.bulk_create(PerformanceReview, reviews)
+
+        # created_at is auto_now_add: spread the reviews over the past days with one UPDATE per day
+        by_day = defaultdict(list)
+        for review in reviews:
+            by_day[random.randrange(self.days)].append(review.pk)
+        now = timezone.now()
+        for days, ids in by_day.items():
+            created = now - timedelta(days=days)
+            for chunk in range(0, len(ids), self.batch_size):
+                PerformanceReview.objects.filter(pk__in=ids[chunk:chunk + self.batch_size]).update(
+                    created_at=created, updated_at=created,
+                )
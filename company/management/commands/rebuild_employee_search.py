@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+from company.search import rebuild_search_index, search_enabled
+
+
+class Command(BaseCommand):
+    help = "Recreate the employee full-text search index (SQLite FTS5) from the employee table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        if not search_enabled(options["database"]):
+            raise CommandError("Employee search uses a full-text index on SQLite only, nothing to rebuild.")
+        total = rebuild_search_index(options["database"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} employee(s)."))
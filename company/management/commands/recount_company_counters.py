@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from company import counters
+from company.cache import response_cache
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized company/department counter columns and repair any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report how many rows have drifted, don't write anything.",
+        )
+
+    def handle(self, *args, **options):
+        drift = counters.find_drift()
+        for model, pks in drift.items():
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {len(pks)} row(s) out of sync")
+
+        if options["check"]:
+            return
+
+        updated = counters.recount_all()
+        # Cached detail payloads of the drifted rows hold the wrong counts
+        for model, pks in drift.items():
+            for pk in pks:
+                response_cache.bump(model._meta.model_name, pk)
+
+        for model, total in updated.items():
+            self.stdout.write(self.style.SUCCESS(
+                f"{model._meta.verbose_name_plural}: recounted {total} row(s)"
+            ))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 00:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0002_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['hired_on', 'id'], name='employee_hired_on_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+from django.db import migrations
+
+# The search index of company.search as it is at this migration (SQLite only): a
+# contentless FTS5 table kept in sync by triggers, filled from the current employees.
+SCOPE = "'c' || {row}.company_id || ifnull(' d' || {row}.department_id, '')"
+INDEXED = "{row}.id, {row}.name, {row}.email, {row}.designation, " + SCOPE
+INSERT = (
+    "INSERT INTO company_employee_search (rowid, name, email, designation, scope) "
+    f"VALUES ({INDEXED.format(row='new')});"
+)
+DELETE = (
+    "INSERT INTO company_employee_search (company_employee_search, rowid, name, email, designation, scope) "
+    f"VALUES ('delete', {INDEXED.format(row='old')});"
+)
+
+CREATE_INDEX = [
+    "CREATE VIRTUAL TABLE company_employee_search USING fts5("
+    "name, email, designation, scope, "
+    "content='', prefix='2 3 4', tokenize='unicode61 remove_diacritics 2')",
+    "INSERT INTO company_employee_search (company_employee_search, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0, 0.0)')",
+    f'CREATE TRIGGER company_employee_search_insert AFTER INSERT ON "company_employee" BEGIN {INSERT} END',
+    f'CREATE TRIGGER company_employee_search_delete AFTER DELETE ON "company_employee" BEGIN {DELETE} END',
+    "CREATE TRIGGER company_employee_search_update AFTER UPDATE OF "
+    f'name, email, designation, company_id, department_id ON "company_employee" BEGIN {DELETE} {INSERT} END',
+    "INSERT INTO company_employee_search (rowid, name, email, designation, scope) "
+    f'SELECT {INDEXED.format(row="employee")} FROM "company_employee" AS employee',
+]
+
+DROP_INDEX = [
+    "DROP TRIGGER IF EXISTS company_employee_search_insert",
+    "DROP TRIGGER IF EXISTS company_employee_search_delete",
+    "DROP TRIGGER IF EXISTS company_employee_search_update",
+    "DROP TABLE IF EXISTS company_employee_search",
+]
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in CREATE_INDEX:
+            schema_editor.execute(statement)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in DROP_INDEX:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0003_tenure_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations, models
+
+# On SQLite, adding (or removing) a NOT NULL column rebuilds the employee table, which
+# drops the search triggers of 0004. They are recreated as they are at this migration.
+SEARCH_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS company_employee_search_insert AFTER INSERT ON \"company_employee\" BEGIN "
+    "INSERT INTO company_employee_search (rowid, name, email, designation, scope) VALUES "
+    "(new.id, new.name, new.email, new.designation, 'c' || new.company_id || ifnull(' d' || new.department_id, '')); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS company_employee_search_delete AFTER DELETE ON \"company_employee\" BEGIN "
+    "INSERT INTO company_employee_search (company_employee_search, rowid, name, email, designation, scope) VALUES "
+    "('delete', old.id, old.name, old.email, old.designation, 'c' || old.company_id || ifnull(' d' || old.department_id, '')); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS company_employee_search_update AFTER UPDATE OF "
+    "name, email, designation, company_id, department_id ON \"company_employee\" BEGIN "
+    "INSERT INTO company_employee_search (company_employee_search, rowid, name, email, designation, scope) VALUES "
+    "('delete', old.id, old.name, old.email, old.designation, 'c' || old.company_id || ifnull(' d' || old.department_id, '')); "
+    "INSERT INTO company_employee_search (rowid, name, email, designation, scope) VALUES "
+    "(new.id, new.name, new.email, new.designation, 'c' || new.company_id || ifnull(' d' || new.department_id, '')); "
+    "END",
+]
+
+
+def restore_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in SEARCH_TRIGGERS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0004_employee_search'),
+    ]
+
+    operations = [
+        # Runs last when unapplying, after RemoveField rebuilt the table
+        migrations.RunPython(migrations.RunPython.noop, restore_search_triggers),
+        migrations.AddField(
+            model_name='employee',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+    ]
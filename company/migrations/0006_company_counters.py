@@ -0,0 +1,66 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(field)
+        .annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+def recount(apps, schema_editor):
+    """
+    Backfill the new counter columns from the existing rows (company.counters keeps them up to date from here on).
+    """
+    using = schema_editor.connection.alias
+    Company = apps.get_model('company', 'Company')
+    Department = apps.get_model('company', 'Department')
+    Employee = apps.get_model('company', 'Employee')
+    Project = apps.get_model('company', 'Project')
+    Company.objects.using(using).update(
+        departments_total=count_subquery(Department, 'company'),
+        employees_total=count_subquery(Employee, 'company'),
+        projects_total=count_subquery(Project, 'company'),
+    )
+    Department.objects.using(using).update(
+        employees_total=count_subquery(Employee, 'department'),
+        projects_total=count_subquery(Project, 'department'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0005_employee_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='departments_total',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='employees_total',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='projects_total',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='department',
+            name='employees_total',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='department',
+            name='projects_total',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(recount, migrations.RunPython.noop),
+    ]
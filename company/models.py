@@ -1,9 +1,78 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 #from django.core.exceptions import ValidationError
 
+def count_subquery(model, field):
+    """
+    Correlated COUNT(*) of `model` rows whose `field` points at the outer row.
+    Each count is its own subquery so several of them never multiply joins.
+    """
+    counts = (
+        model.objects
+        .filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts), 0)
+
+def stored_counters_enabled():
+    """
+    Whether counts are read from the denormalized *_total columns (see company.counters)
+    instead of being computed with COUNT.
+    """
+    return getattr(settings, 'COMPANY_STORED_COUNTERS', False)
+
+class CompanyQuerySet(models.QuerySet):
+    def with_counts(self, *names):
+        """
+        Annotate departments/employees/projects counts in the same query
+        (only the `names` annotations when given).
+        """
+        if stored_counters_enabled():
+            counts = {
+                'departments_count': F('departments_total'),
+                'employees_count': F('employees_total'),
+                'projects_count': F('projects_total'),
+            }
+        else:
+            counts = {
+                'departments_count': count_subquery(Department, 'company'),
+                'employees_count': count_subquery(Employee, 'company'),
+                'projects_count': count_subquery(Project, 'company'),
+            }
+        return self.annotate(**{name: count for name, count in counts.items() if not names or name in names})
+
+class DepartmentQuerySet(models.QuerySet):
+    def with_counts(self, *names):
+        """
+        Annotate employees/projects counts in the same query
+        (only the `names` annotations when given).
+        """
+        if stored_counters_enabled():
+            counts = {
+                'employees_count': F('employees_total'),
+                'projects_count': F('projects_total'),
+            }
+        else:
+            counts = {
+                'employees_count': count_subquery(Employee, 'department'),
+                'projects_count': count_subquery(Project, 'department'),
+            }
+        return self.annotate(**{name: count for name, count in counts.items() if not names or name in names})
+
 class Company(models.Model):
     name = models.CharField(max_length=255, help_text="Company name")
+    # Denormalized counts, maintained by company.counters
+    departments_total = models.IntegerField(default=0, editable=False)
+    employees_total = models.IntegerField(default=0, editable=False)
+    projects_total = models.IntegerField(default=0, editable=False)
+
+    objects = CompanyQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Company"
@@ -18,6 +87,8 @@ class Company(models.Model):
         """
         Returns the total number of departments in this company.
         """
+        if stored_counters_enabled():
+            return self.departments_total
         return self.departments.count()
 
     @property
@@ -25,6 +96,8 @@ class Company(models.Model):
         """
         Returns the total number of employees in this company.
         """
+        if stored_counters_enabled():
+            return self.employees_total
         return self.employees.count()
 
     @property
@@ -32,6 +105,8 @@ class Company(models.Model):
         """
         Returns the total number of projects in this company.
         """
+        if stored_counters_enabled():
+            return self.projects_total
         return self.projects.count()
     
 class Department(models.Model):
@@ -43,6 +118,11 @@ class Department(models.Model):
     name = models.CharField(
         max_length=255
     )
+    # Denormalized counts, maintained by company.counters
+    employees_total = models.IntegerField(default=0, editable=False)
+    projects_total = models.IntegerField(default=0, editable=False)
+
+    objects = DepartmentQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Department"
@@ -59,6 +139,8 @@ class Department(models.Model):
         """
         Returns the total number of employees in this department.
         """
+        if stored_counters_enabled():
+            return self.employees_total
         return self.employees.count()
 
     @property
@@ -66,6 +148,8 @@ class Department(models.Model):
         """
         Returns the total number of projects assigned to this department.
         """
+        if stored_counters_enabled():
+            return self.projects_total
         return self.projects.count()
     
 class Employee(models.Model):
@@ -96,15 +180,35 @@ class Employee(models.Model):
         null=True, 
         blank=True
     )
+    # Bumped by every save, the employee ETag (company.api.views.employee_etag)
+    version = models.PositiveIntegerField(default=0, editable=False)
     
     class Meta:
         verbose_name = "Employee"
         verbose_name_plural = "Employees"
         ordering = ['name']
+        # list_employees filters on company and/or department and pages by name,
+        # tenure filters/ordering (?min_days=, ?max_days=, ?order=tenure) are ranges on hired_on
+        indexes = [
+            models.Index(fields=['company', 'name', 'id'], name='employee_company_name_idx'),
+            models.Index(fields=['company', 'department', 'name'], name='employee_comp_dept_name_idx'),
+            models.Index(fields=['department', 'name'], name='employee_dept_name_idx'),
+            models.Index(fields=['hired_on', 'id'], name='employee_hired_on_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.company.name})"
 
+    def save(self, *args, **kwargs):
+        """
+        Every update of an existing employee is a new version.
+        """
+        if not self._state.adding:
+            self.version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        super().save(*args, **kwargs)
+
     @property
     def days_employed(self):
         """
@@ -0,0 +1,158 @@
+"""
+Employee search: prefix matching over name, email and designation, ranked, optionally
+scoped to a company/department.
+
+On SQLite it is served by `company_employee_search`, a contentless FTS5 table kept in
+sync by triggers on the employee table (so bulk_create/update() writes are covered too).
+Next to the searchable columns every row has a `scope` column holding `c<company id>
+d<department id>` tokens, so a company/department scope is intersected inside the full-text
+index instead of joining back to the employees. Other backends fall back to
+`icontains` filters.
+
+SQLite migrations that remake the employee table drop its triggers with it (the
+company.W001 check reports it), run `python manage.py rebuild_employee_search` after one.
+"""
+import re
+from django.db import connections
+from django.db.models import Q
+from company.models import Employee
+
+SEARCH_TABLE = 'company_employee_search'
+SEARCH_TRIGGERS = tuple(f'{SEARCH_TABLE}_{event}' for event in ('insert', 'delete', 'update'))
+SEARCH_VENDORS = ('sqlite',)
+
+# Only the first RANK_WINDOW matches (by id) are ranked: a short prefix ("jo*") matches a
+# large part of the table, and scoring and sorting all of it is what makes type-ahead slow
+# (5-10x slower for one or two letters on 200k employees). A query with more matches than
+# the window is reported as truncated, its best match may be missing until it narrows.
+RANK_WINDOW = 1000
+
+# bm25 weights of name, email, designation (scope never ranks)
+RANK = 'bm25(10.0, 5.0, 1.0, 0.0)'
+
+SCOPE = "'c' || {row}.company_id || ifnull(' d' || {row}.department_id, '')"
+INDEXED = "{row}.id, {row}.name, {row}.email, {row}.designation, " + SCOPE
+
+TOKEN = re.compile(r'\w+')
+
+
+def search_enabled(using='default'):
+    return connections[using].vendor in SEARCH_VENDORS
+
+
+def create_search_index(connection):
+    """
+    Create the FTS5 table and its sync triggers, and index the current employees.
+    """
+    table = connection.ops.quote_name(Employee._meta.db_table)
+    insert = f"INSERT INTO {SEARCH_TABLE} (rowid, name, email, designation, scope) VALUES ({INDEXED.format(row='new')});"
+    # A contentless table is told exactly which values to remove
+    delete = (
+        f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, name, email, designation, scope) "
+        f"VALUES ('delete', {INDEXED.format(row='old')});"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+            "name, email, designation, scope, "
+            "content='', prefix='2 3 4', tokenize='unicode61 remove_diacritics 2')"
+        )
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rank) VALUES ('rank', %s)", [RANK])
+        cursor.execute(f"CREATE TRIGGER {SEARCH_TABLE}_insert AFTER INSERT ON {table} BEGIN {insert} END")
+        cursor.execute(f"CREATE TRIGGER {SEARCH_TABLE}_delete AFTER DELETE ON {table} BEGIN {delete} END")
+        cursor.execute(
+            f"CREATE TRIGGER {SEARCH_TABLE}_update AFTER UPDATE OF "
+            f"name, email, designation, company_id, department_id ON {table} BEGIN {delete} {insert} END"
+        )
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, name, email, designation, scope) "
+            f"SELECT {INDEXED.format(row='employee')} FROM {table} AS employee"
+        )
+
+
+def drop_search_index(connection):
+    with connection.cursor() as cursor:
+        for trigger in SEARCH_TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+def missing_search_triggers(using='default'):
+    """
+    Sync triggers missing next to an existing search table, i.e. dropped by a table rebuild.
+    """
+    connection = connections[using]
+    if connection.vendor not in SEARCH_VENDORS:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name FROM sqlite_master WHERE name IN (%s)" % ', '.join(['%s'] * (len(SEARCH_TRIGGERS) + 1)),
+            [SEARCH_TABLE, *SEARCH_TRIGGERS],
+        )
+        present = {name: kind for kind, name in cursor.fetchall()}
+    if present.get(SEARCH_TABLE) != 'table':
+        return []  # not migrated yet
+    return [trigger for trigger in SEARCH_TRIGGERS if present.get(trigger) != 'trigger']
+
+
+def rebuild_search_index(using='default'):
+    """
+    Recreate the index (table, triggers and rows) from the employee table, merged
+    into a single segment. Returns the number of employees indexed.
+    """
+    connection = connections[using]
+    drop_search_index(connection)
+    create_search_index(connection)
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+    return Employee.objects.using(using).count()
+
+
+def search_terms(query):
+    return TOKEN.findall(query or '')
+
+
+def match_expression(terms, company_id=None, department_id=None):
+    """
+    FTS5 query: every term as a prefix of a name/email/designation token, AND the scope tokens.
+    Terms are \\w runs, so quoting them is enough to keep FTS5 syntax out.
+    """
+    expression = '{name email designation} : (%s)' % ' '.join(f'"{term}"*' for term in terms)
+    if company_id is not None:
+        expression += f' AND scope : "c{int(company_id)}"'
+    if department_id is not None:
+        expression += f' AND scope : "d{int(department_id)}"'
+    return expression
+
+
+def search_employee_ids(query, company_id=None, department_id=None, limit=20, using='default'):
+    """
+    (ids, truncated): ids of the best matching employees for `query`, best first, and
+    whether more than RANK_WINDOW employees matched, so only the first of them were ranked.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return [], False
+
+    if not search_enabled(using):
+        employees = Employee.objects.using(using)
+        if company_id is not None:
+            employees = employees.filter(company_id=company_id)
+        if department_id is not None:
+            employees = employees.filter(department_id=department_id)
+        for term in terms:
+            employees = employees.filter(
+                Q(name__icontains=term) | Q(email__icontains=term) | Q(designation__icontains=term)
+            )
+        return list(employees.order_by('name', 'id').values_list('id', flat=True)[:limit]), False
+
+    # One row past the window tells whether it was full
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT rowid, count(*) OVER () FROM "
+            f"(SELECT rowid, rank FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s LIMIT %s) "
+            "ORDER BY rank LIMIT %s",
+            [match_expression(terms, company_id, department_id), RANK_WINDOW + 1, limit],
+        )
+        rows = cursor.fetchall()
+    return [row[0] for row in rows], bool(rows) and rows[0][1] > RANK_WINDOW
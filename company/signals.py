@@ -0,0 +1,84 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from company import counters
+from company.cache import response_cache
+from company.models import Company, Department, Employee, Project
+
+
+def invalidate_companies(company_ids):
+    for company_id in set(company_ids):
+        if company_id is not None:
+            response_cache.bump('company', company_id)
+
+
+def invalidate_departments(department_ids):
+    for department_id in set(department_ids):
+        if department_id is not None:
+            response_cache.bump('department', department_id)
+
+
+# Origin of an instance loaded without its company/department columns (only()/defer())
+DEFERRED = object()
+
+
+def _current(instance):
+    return (instance.company_id, getattr(instance, 'department_id', None))
+
+
+def _origin(instance, current, created=False):
+    if created:
+        # An instance built with its pk set (Employee(id=...), loaddata) looked loaded
+        return None
+    origin = getattr(instance, '_origin', None)
+    # Saving a deferred instance never writes the deferred foreign keys, so nothing moved
+    return current if origin is DEFERRED else origin
+
+
+@receiver(post_init, sender=Department)
+@receiver(post_init, sender=Employee)
+@receiver(post_init, sender=Project)
+def remember_origin(sender, instance, **kwargs):
+    # Company/department as loaded, so a reassignment also updates the ones it left.
+    # Read from __dict__ so deferred (only()) instances don't trigger a query here.
+    # Instances without a pk have no origin (their first save is a create).
+    if instance.pk is None:
+        instance._origin = None
+    elif 'company_id' not in instance.__dict__:
+        instance._origin = DEFERRED
+    else:
+        instance._origin = (instance.company_id, instance.__dict__.get('department_id'))
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def company_changed(sender, instance, **kwargs):
+    invalidate_companies([instance.pk])
+    # Department payloads embed the company name
+    invalidate_departments(Department.objects.filter(company_id=instance.pk).values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def department_changed(sender, instance, signal, **kwargs):
+    origin_company_id = (_origin(instance, _current(instance), kwargs.get('created')) or (None, None))[0]
+    new_company_id = None if signal is post_delete else instance.company_id
+    counters.department_moved(origin_company_id, new_company_id)
+
+    invalidate_companies([instance.company_id, origin_company_id])
+    invalidate_departments([instance.pk])
+    instance._origin = None if signal is post_delete else _current(instance)
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def member_changed(sender, instance, signal, **kwargs):
+    origin = _origin(instance, _current(instance), kwargs.get('created'))
+    new = None if signal is post_delete else _current(instance)
+    counters.member_moved(sender, origin, new)
+
+    origin_company_id, origin_department_id = origin or (None, None)
+    invalidate_companies([instance.company_id, origin_company_id])
+    invalidate_departments([instance.department_id, origin_department_id])
+    instance._origin = new
@@ -1,14 +1,60 @@
-from django.test import TestCase
-from rest_framework.test import APITestCase, APIClient
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+from base64 import b64encode
+from asgiref.sync import async_to_sync, sync_to_async
+from datetime import date
+from pathlib import Path
+from django.core.cache import cache
+from django.utils import timezone
+from django.http import StreamingHttpResponse
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from unittest.mock import patch
+from rest_framework.test import APITestCase, APIClient, APIRequestFactory
 from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework.response import Response
 from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from .api import async_views as company_async_views, views as company_views
+from .api.imports import validate_employee_rows
+from .api.serializers import EmployeeSerializer, EmployeeValuesSerializer
 from .models import Company, Department, Employee, Project
+from . import counters
+from .checks import check_search_triggers, check_stored_counters
+from .cache import response_cache
 from accounts.models import UserAccount
+from reviews.api import async_views as review_async_views, views as review_views
+from reviews.models import PerformanceReview
+from accounts.api.serializers import CustomTokenObtainPairSerializer
+from accounts.api.permissions import IsAdmin, IsHR
+from companyManagement.cache import ResponseCache
+from companyManagement.metrics import registry
+from companyManagement.pagination import KeysetPagination
+from companyManagement.query_budget import QueryBudgetExceeded, QueryBudgetTestMixin, query_budget
 
-class CompanyAPITestCase(APITestCase):
+class CompanyAPITestCase(QueryBudgetTestMixin, APITestCase):
     def setUp(self):
         """Set up test data - companies, departments, employees, projects"""
         self.client = APIClient()
+        cache.clear()
+        response_cache.reset_stats()
+        self.admin = UserAccount.objects.create_user(
+            username="admin", email="admin@test.com", password="pass", role=UserAccount.Roles.ADMIN
+        )
+        self.client.force_authenticate(self.admin)
         
         # Create test companies
         self.company1 = Company.objects.create(name="Tech Corp")
@@ -81,6 +127,9 @@ class CompanyAPITestCase(APITestCase):
         self.project1.assigned_employees.add(self.employee1)
         self.project2.assigned_employees.add(self.employee3)
 
+        # Counter columns aren't written with COMPANY_STORED_COUNTERS off (the default)
+        counters.recount_all()
+
     # ============= COMPANY TESTS =============
     def test_list_companies_success(self):
         """Test GET /api/company/ returns all companies"""
@@ -88,10 +137,10 @@ class CompanyAPITestCase(APITestCase):
         response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 3)
+        self.assertEqual(len(response.data['results']), 3)
         
         # Check computed fields are included
-        company_data = response.data[0]  # Assuming ordered by name
+        company_data = response.data['results'][0]  # Assuming ordered by name
         self.assertIn('number_of_departments', company_data)
         self.assertIn('number_of_employees', company_data)
         self.assertIn('number_of_projects', company_data)
@@ -115,6 +164,203 @@ class CompanyAPITestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertIn('error', response.data)
 
+    def test_list_companies_query_count_is_constant(self):
+        """Test GET /api/company/ does not issue per-company count queries"""
+        def grow():
+            for i in range(10):
+                company = Company.objects.create(name=f"Extra Company {i}")
+                Department.objects.create(company=company, name="Operations")
+
+        response = self.assertQueriesConstant(lambda: self.client.get(reverse('list-all-companies')), grow)
+        self.assertEqual(len(response.data['results']), 13)
+
+    def test_list_companies_annotated_counts_match_properties(self):
+        """Test annotated counts equal the model property counts"""
+        url = reverse('list-all-companies')
+        response = self.client.get(url)
+
+        for company_data in response.data['results']:
+            company = Company.objects.get(pk=company_data['id'])
+            self.assertEqual(company_data['number_of_departments'], company.number_of_departments)
+            self.assertEqual(company_data['number_of_employees'], company.number_of_employees)
+            self.assertEqual(company_data['number_of_projects'], company.number_of_projects)
+
+    def test_company_details_served_from_cache(self):
+        """Test a repeated GET /api/company/{id}/ runs no queries and counts as a hit"""
+        url = reverse('retrieve-single-company', args=[self.company1.id])
+        first = self.client.get(url)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(response_cache.stats()['hits'], 1)
+        self.assertEqual(response_cache.stats()['misses'], 1)
+
+    def test_company_details_cache_invalidated_by_changes(self):
+        """Test employee/department/project/company writes refresh the cached company"""
+        url = reverse('retrieve-single-company', args=[self.company1.id])
+        self.client.get(url)
+
+        Employee.objects.create(company=self.company1, name="New Hire", email="new.hire@techcorp.com")
+        self.assertEqual(self.client.get(url).data['number_of_employees'], 3)
+
+        Department.objects.create(company=self.company1, name="Sales")
+        self.assertEqual(self.client.get(url).data['number_of_departments'], 3)
+
+        self.project1.delete()
+        self.assertEqual(self.client.get(url).data['number_of_projects'], 0)
+
+        self.company1.name = "Tech Corp International"
+        self.company1.save()
+        self.assertEqual(self.client.get(url).data['name'], "Tech Corp International")
+
+    @patch.object(ResponseCache, 'shared', True)
+    def test_company_details_conditional_get(self):
+        """Test If-None-Match with the current ETag gets a 304 without queries, until the company changes"""
+        url = reverse('retrieve-single-company', args=[self.company1.id])
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        Department.objects.create(company=self.company1, name="Sales")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_company_details_no_etag_with_process_local_cache(self):
+        """Test no ETag is sent while the version tokens live in a per-process (locmem) cache"""
+        url = reverse('retrieve-single-company', args=[self.company1.id])
+        response = self.client.get(url)
+        self.assertNotIn('ETag', response)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @patch.object(ResponseCache, 'shared', True)
+    def test_company_sparse_fields(self):
+        """Test ?fields= trims company payloads and skips the counts that aren't requested"""
+        url = reverse('list-all-companies')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'id,name'})
+        self.assertEqual(response.data['results'][0], {'id': self.company2.id, 'name': "Design Studio"})
+        self.assertNotIn('COUNT', queries[0]['sql'].upper())
+
+        response = self.client.get(url, {'fields': 'name,number_of_employees'})
+        self.assertEqual(response.data['results'][0], {'name': "Design Studio", 'number_of_employees': 1})
+
+        detail_url = reverse('retrieve-single-company', args=[self.company1.id])
+        full = self.client.get(detail_url)
+        # served trimmed from the cached full payload, under its own ETag
+        with self.assertNumQueries(0):
+            response = self.client.get(detail_url, {'fields': 'number_of_projects'})
+        self.assertEqual(response.data, {'number_of_projects': 1})
+        self.assertNotEqual(response['ETag'], full['ETag'])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('list-all-departments'), {'fields': 'name,company_name'})
+        self.assertEqual(response.data['results'][0], {'name': "Engineering", 'company_name': "Tech Corp"})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('COUNT', queries[0]['sql'].upper())
+
+        response = self.client.get(url, {'fields': 'id,revenue'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+
+    def test_cache_stats_admin_only(self):
+        """Test GET /api/company/cache-stats/ exposes hit/miss counters to admins only"""
+        url = reverse('cache-stats')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {'hits', 'misses', 'hit_ratio', 'shared'})
+        self.assertFalse(response.data['shared'])  # locmem, no company/department ETags
+
+        hr = UserAccount.objects.create_user(
+            username="hr", email="hr@test.com", password="pass", role=UserAccount.Roles.HR
+        )
+        self.client.force_authenticate(hr)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(COMPANY_STORED_COUNTERS=True)
+    def test_stored_counters_follow_writes(self):
+        """Test counter columns track creates, deletes and department reassignment"""
+        Employee.objects.create(company=self.company1, department=self.dept1_hr, name="Extra", email="extra@techcorp.com")
+        employee = Employee.objects.get(pk=self.employee1.id)
+        employee.department = self.dept1_hr
+        employee.save()
+        self.employee2.delete()
+        Department.objects.create(company=self.company1, name="Sales")
+
+        self.company1.refresh_from_db()
+        self.dept1_eng.refresh_from_db()
+        self.dept1_hr.refresh_from_db()
+        self.assertEqual(self.company1.employees_total, 2)
+        self.assertEqual(self.company1.departments_total, 3)
+        self.assertEqual(self.company1.projects_total, 1)
+        self.assertEqual(self.dept1_eng.employees_total, 0)
+        self.assertEqual(self.dept1_hr.employees_total, 2)
+        self.assertEqual(self.dept1_eng.projects_total, 1)
+
+    def test_stored_counters_match_live_counts(self):
+        """Test reads from the counter columns equal COUNT queries"""
+        for company in Company.objects.all():
+            expected = (company.number_of_departments, company.number_of_employees, company.number_of_projects)
+            with self.settings(COMPANY_STORED_COUNTERS=True), self.assertNumQueries(0):
+                stored = (company.number_of_departments, company.number_of_employees, company.number_of_projects)
+            self.assertEqual(stored, expected)
+
+    @override_settings(COMPANY_STORED_COUNTERS=True)
+    def test_stored_counters_count_instances_created_with_a_pk(self):
+        """Test a create with the pk preset (Employee(id=...)) is counted, not taken for an update"""
+        Employee(id=9999, company=self.company1, department=self.dept1_hr, name="Preset", email="preset@techcorp.com").save()
+        self.company1.refresh_from_db()
+        self.dept1_hr.refresh_from_db()
+        self.assertEqual(self.company1.employees_total, 3)
+        self.assertEqual(self.dept1_hr.employees_total, 2)
+
+    def test_stored_counters_not_written_while_off(self):
+        """Test writes skip the counter UPDATEs while COMPANY_STORED_COUNTERS is off, and company.W002 flags the stale columns once it is on"""
+        with CaptureQueriesContext(connection) as queries:
+            Employee.objects.create(company=self.company1, department=self.dept1_hr, name="Extra", email="extra@techcorp.com")
+            self.client.post(reverse('bulk-import-employees'), [
+                {'company': self.company1.id, 'name': "Imported Ian", 'email': "ian@techcorp.com"},
+            ], format='json')
+            Department.objects.create(company=self.company1, name="Sales")
+        self.assertFalse(any(query['sql'].startswith('UPDATE') for query in queries))
+        self.assertEqual(check_stored_counters(None, databases=['default']), [])
+
+        with self.settings(COMPANY_STORED_COUNTERS=True):
+            warnings = check_stored_counters(None, databases=['default'])
+            self.assertEqual([warning.id for warning in warnings], ['company.W002'])
+            self.assertIn("2 company/department row(s)", warnings[0].msg)  # Tech Corp and HR
+
+            call_command('recount_company_counters', stdout=io.StringIO())
+            self.assertEqual(check_stored_counters(None, databases=['default']), [])
+            self.company1.refresh_from_db()
+            self.assertEqual(self.company1.employees_total, 4)
+            self.assertEqual(self.company1.departments_total, 3)
+
+    def test_recount_company_counters_repairs_drift(self):
+        """Test the recount_company_counters command fixes drifted counter columns"""
+        Company.objects.filter(pk=self.company1.id).update(employees_total=42)
+        Department.objects.filter(pk=self.dept1_eng.id).update(projects_total=-3)
+
+        out = io.StringIO()
+        call_command('recount_company_counters', '--check', stdout=out)
+        self.assertIn("Companies: 1 row(s) out of sync", out.getvalue())
+        self.assertIn("Departments: 1 row(s) out of sync", out.getvalue())
+        self.company1.refresh_from_db()
+        self.assertEqual(self.company1.employees_total, 42)
+
+        call_command('recount_company_counters', stdout=io.StringIO())
+        self.company1.refresh_from_db()
+        self.dept1_eng.refresh_from_db()
+        self.assertEqual(self.company1.employees_total, 2)
+        self.assertEqual(self.dept1_eng.projects_total, 1)
+
     # ============= DEPARTMENT TESTS =============
     def test_list_departments_success(self):
         """Test GET /api/company/departments/ returns all departments"""
@@ -122,23 +368,34 @@ class CompanyAPITestCase(APITestCase):
         response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 4)  # 2 + 2 departments
+        self.assertEqual(len(response.data['results']), 4)  # 2 + 2 departments
         
         # Check computed fields and company name are included
-        dept_data = response.data[0]
+        dept_data = response.data['results'][0]
         self.assertIn('number_of_employees', dept_data)
         self.assertIn('number_of_projects', dept_data)
         self.assertIn('company_name', dept_data)
 
+    def test_list_departments_query_count_is_constant(self):
+        """Test GET /api/company/departments/ does not issue per-department queries"""
+        def grow():
+            for i in range(10):
+                department = Department.objects.create(company=self.company3, name=f"Team {i}")
+                Employee.objects.create(company=self.company3, department=department,
+                                        name=f"Member {i}", email=f"member{i}@agency.com")
+
+        response = self.assertQueriesConstant(lambda: self.client.get(reverse('list-all-departments')), grow)
+        self.assertEqual(len(response.data['results']), 14)
+
     def test_list_departments_filtered_by_company(self):
         """Test GET /api/company/departments/?company=1 filters by company"""
         url = reverse('list-all-departments')
         response = self.client.get(url, {'company': self.company1.id})
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)  # Only company1 departments
+        self.assertEqual(len(response.data['results']), 2)  # Only company1 departments
         
-        for dept in response.data:
+        for dept in response.data['results']:
             self.assertEqual(dept['company'], self.company1.id)
             self.assertEqual(dept['company_name'], "Tech Corp")
 
@@ -148,7 +405,7 @@ class CompanyAPITestCase(APITestCase):
         response = self.client.get(url, {'company': 9999})
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 0)
+        self.assertEqual(len(response.data['results']), 0)
 
     def test_list_departments_invalid_company_id(self):
         """Test GET /api/company/departments/?company=invalid returns 400"""
@@ -167,6 +424,41 @@ class CompanyAPITestCase(APITestCase):
         self.assertEqual(response.data['company_name'], "Tech Corp")
         self.assertEqual(response.data['number_of_employees'], 1)
 
+    def test_department_details_cache_invalidated_by_reassignment(self):
+        """Test moving an employee between departments refreshes both cached departments"""
+        eng_url = reverse('retrieve-single-department', args=[self.dept1_eng.id])
+        hr_url = reverse('retrieve-single-department', args=[self.dept1_hr.id])
+        self.client.get(eng_url)
+        self.client.get(hr_url)
+
+        employee = Employee.objects.get(pk=self.employee1.id)
+        employee.department = self.dept1_hr
+        employee.save()
+
+        self.assertEqual(self.client.get(eng_url).data['number_of_employees'], 0)
+        self.assertEqual(self.client.get(hr_url).data['number_of_employees'], 2)
+
+    def test_department_details_cache_invalidated_by_company_rename(self):
+        """Test renaming a company refreshes the company_name of its cached departments"""
+        url = reverse('retrieve-single-department', args=[self.dept1_eng.id])
+        self.client.get(url)
+
+        self.company1.name = "Renamed Corp"
+        self.company1.save()
+
+        self.assertEqual(self.client.get(url).data['company_name'], "Renamed Corp")
+
+    @patch.object(ResponseCache, 'shared', True)
+    def test_department_details_conditional_get(self):
+        """Test a department ETag changes when its company is renamed (the payload embeds the name)"""
+        url = reverse('retrieve-single-department', args=[self.dept1_eng.id])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.company1.name = "Tech Corp International"
+        self.company1.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
     def test_department_details_not_found(self):
         """Test GET /api/company/department/{id}/ with non-existent ID returns 404"""
         url = reverse('retrieve-single-department', args=[9999])
@@ -181,10 +473,10 @@ class CompanyAPITestCase(APITestCase):
         response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 3)
+        self.assertEqual(len(response.data['results']), 3)
         
         # Check computed fields and nested names are included
-        emp_data = response.data[0]
+        emp_data = response.data['results'][0]
         self.assertIn('days_employed', emp_data)
         self.assertIn('company_name', emp_data)
         self.assertIn('department_name', emp_data)
@@ -195,7 +487,7 @@ class CompanyAPITestCase(APITestCase):
         response = self.client.get(url, {'company': self.company1.id})
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)  # Only company1 employees
+        self.assertEqual(len(response.data['results']), 2)  # Only company1 employees
 
     def test_list_employees_filtered_by_department(self):
         """Test GET /api/company/employee/?department=1 filters by department"""
@@ -203,8 +495,8 @@ class CompanyAPITestCase(APITestCase):
         response = self.client.get(url, {'department': self.dept1_eng.id})
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['name'], "John Doe")
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['name'], "John Doe")
 
     def test_list_employees_filtered_by_company_and_department(self):
         """Test GET /api/company/employee/?company=1&department=1 filters by both"""
@@ -215,7 +507,463 @@ class CompanyAPITestCase(APITestCase):
         })
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_list_employees_tenure_filters_and_ordering(self):
+        """Test ?min_days=, ?max_days= and ?order=tenure|-tenure on the employee list"""
+        url = reverse('list-all/add-employee')
+        john_days = (timezone.now().date() - date(2023, 1, 15)).days
+
+        response = self.client.get(url, {'order': '-tenure'})
+        self.assertEqual([e['name'] for e in response.data['results']], ['Jane Smith', 'John Doe'])
+        response = self.client.get(url, {'order': 'tenure'})
+        self.assertEqual([e['name'] for e in response.data['results']], ['John Doe', 'Jane Smith'])
+        self.assertEqual(response.data['results'][0]['days_employed'], john_days)
+
+        response = self.client.get(url, {'min_days': john_days + 1})
+        self.assertEqual([e['name'] for e in response.data['results']], ['Jane Smith'])
+        response = self.client.get(url, {'max_days': john_days})
+        self.assertEqual([e['name'] for e in response.data['results']], ['John Doe'])
+
+        # the same filters apply to the export and the async list
+        response = self.client.get(reverse('export-employees'), {'order': '-tenure', 'min_days': 1})
+        names = [json.loads(line)['name'] for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(names, ['Jane Smith', 'John Doe'])
+        response = self.client.get(reverse('async-list-employees'), {'max_days': john_days})
+        self.assertEqual([e['name'] for e in response.json()['results']], ['John Doe'])
+
+    def test_employee_sparse_fields(self):
+        """Test ?fields= on the employee list/detail (sync and async) loads only the needed columns"""
+        url = reverse('list-all/add-employee')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'name,department_name'})
+        self.assertEqual(response.data['results'][0], {'name': "Bob Wilson", 'department_name': "Creative"})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"email"', queries[0]['sql'])
+        self.assertNotIn('"company_company"', queries[0]['sql'])
+
+        response = self.client.get(reverse('async-list-employees'), {'fields': 'name,department_name'})
+        self.assertEqual(response.json()['results'][0], {'name': "Bob Wilson", 'department_name': "Creative"})
+
+        detail_url = reverse('retrieve/edit/delete-single-employee', args=[self.employee1.id])
+        response = self.client.get(detail_url, {'fields': 'days_employed,company_name'})
+        self.assertEqual(response.data, {
+            'days_employed': (timezone.now().date() - date(2023, 1, 15)).days,
+            'company_name': "Tech Corp",
+        })
+        etag = response['ETag']
+        self.assertEqual(self.client.get(detail_url, {'fields': 'days_employed,company_name'},
+                                         HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+        response = self.client.get(reverse('async-retrieve-single-employee', args=[self.employee1.id]),
+                                   {'fields': 'email'})
+        self.assertEqual(response.json(), {'email': "john@techcorp.com"})
+        self.assertEqual(self.client.get(url, {'fields': ''}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_employees(self):
+        """Test GET /api/company/employee/search/ prefix-matches words, ranks name matches first and scopes"""
+        url = reverse('search-employees')
+        response = self.client.get(url, {'q': 'jo do'})
+        self.assertEqual([e['name'] for e in response.data['results']], ["John Doe"])
+        self.assertEqual(response.data['results'][0]['company_name'], "Tech Corp")
+
+        Employee.objects.create(company=self.company2, name="Eve Engineer", email="eve@design.com")
+        response = self.client.get(url, {'q': 'engin'})
+        self.assertEqual([e['name'] for e in response.data['results']], ["Eve Engineer", "John Doe"])
+        response = self.client.get(url, {'q': 'engin', 'company': self.company1.id, 'fields': 'name'})
+        self.assertEqual(response.data['results'], [{'name': "John Doe"}])
+        response = self.client.get(url, {'q': 'techcorp', 'department': self.dept1_hr.id})
+        self.assertEqual([e['name'] for e in response.data['results']], ["Jane Smith"])
+        self.assertEqual(len(self.client.get(url, {'q': 'techcorp', 'limit': 1}).data['results']), 1)
+
+    def test_search_employees_reports_truncated_ranking(self):
+        """Test a search matching more employees than the rank window says its results are truncated"""
+        url = reverse('search-employees')
+        Employee.objects.create(company=self.company1, name="Ann Early", email="zed.early@techcorp.com")
+        Employee.objects.create(company=self.company1, name="Bob Early", email="zed.bob@techcorp.com")
+        Employee.objects.create(company=self.company1, name="Zed Late", email="late@techcorp.com")
+
+        response = self.client.get(url, {'q': 'zed'})
+        self.assertEqual(response.data['results'][0]['name'], "Zed Late")
+        self.assertFalse(response.data['truncated'])
+
+        with patch('company.search.RANK_WINDOW', 1):  # the two early matches are ranked, one past the window
+            response = self.client.get(url, {'q': 'zed'})
+            self.assertTrue(response.data['truncated'])
+            self.assertNotIn("Zed Late", [e['name'] for e in response.data['results']])
+            response = self.client.get(url, {'q': 'zed lat'})
+            self.assertEqual([e['name'] for e in response.data['results']], ["Zed Late"])
+            self.assertFalse(response.data['truncated'])
+
+    def test_search_employees_query_count_is_constant(self):
+        """Test GET /api/company/employee/search/ loads every match with its company and department at once"""
+        def grow():
+            for i in range(10):
+                Employee.objects.create(company=self.company2, department=self.dept2_dev,
+                                        name=f"Johan {i}", email=f"johan{i}@design.com")
+
+        request = lambda: self.client.get(reverse('search-employees'), {'q': 'jo'})
+        response = self.assertQueriesConstant(request, grow)
+        self.assertEqual(len(response.data['results']), 11)  # John Doe and the Johans
+
+    def test_search_index_follows_writes(self):
+        """Test the search index picks up creates, updates, moves, deletes and bulk imports"""
+        url = reverse('search-employees')
+        self.employee1.name = "Johnny Walker"
+        self.employee1.department = self.dept1_hr
+        self.employee1.save()
+        self.assertEqual(self.client.get(url, {'q': 'doe'}).data['results'], [])
+        response = self.client.get(url, {'q': 'walk', 'department': self.dept1_hr.id})
+        self.assertEqual([e['name'] for e in response.data['results']], ["Johnny Walker"])
+
+        self.employee1.delete()
+        self.assertEqual(self.client.get(url, {'q': 'walk'}).data['results'], [])
+
+        self.client.post(reverse('bulk-import-employees'), [
+            {'company': self.company3.id, 'name': "Imported Ian", 'email': "ian@marketing.com"},
+        ], format='json')
+        response = self.client.get(url, {'q': 'ian', 'company': self.company3.id})
+        self.assertEqual([e['name'] for e in response.data['results']], ["Imported Ian"])
+
+        out = io.StringIO()
+        call_command('rebuild_employee_search', stdout=out)
+        self.assertIn("Indexed 3 employee(s).", out.getvalue())
+        self.assertEqual(len(self.client.get(url, {'q': 'ian'}).data['results']), 1)
+
+    def test_search_triggers_checked(self):
+        """Test the migrated schema keeps the search triggers, and the company.W001 check reports dropped ones"""
+        # The test database is built by the migrations, so one rebuilding the table without restoring them fails here
+        self.assertEqual(check_search_triggers(None, databases=['default']), [])
+
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER company_employee_search_update")
+        warnings = check_search_triggers(None, databases=['default'])
+        self.assertEqual([warning.id for warning in warnings], ['company.W001'])
+        self.assertIn('company_employee_search_update', warnings[0].msg)
+
+        call_command('rebuild_employee_search', stdout=io.StringIO())
+        self.assertEqual(check_search_triggers(None, databases=['default']), [])
+
+    def test_search_employees_params_validated(self):
+        """Test search parameters are validated"""
+        url = reverse('search-employees')
+        for params in ({}, {'q': ' *" '}, {'q': 'jo', 'limit': 0}, {'q': 'jo', 'limit': 'x'},
+                       {'q': 'jo', 'company': '1 OR 1'}):
+            self.assertEqual(self.client.get(url, params).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_employees_tenure_params_validated(self):
+        """Test invalid tenure parameters are rejected with 400"""
+        url = reverse('list-all/add-employee')
+        self.assertEqual(self.client.get(url, {'min_days': 'abc'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'max_days': -3}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'order': 'salary'}).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('async-list-employees'), {'order': 'salary'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('order', response.json())
+
+    def test_list_employees_huge_tenure_bounds(self):
+        """Test tenure bounds past the calendar are capped instead of overflowing the date arithmetic"""
+        hired = Employee.objects.filter(hired_on__isnull=False).count()
+        for days in (1_000_000, 10 ** 30):
+            response = self.client.get(reverse('list-all/add-employee'), {'max_days': days})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['results']), hired)
+            response = self.client.get(reverse('async-list-employees'), {'min_days': days})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()['results'], [])
+            response = self.client.get(reverse('export-employees'), {'max_days': days})
+            self.assertEqual(len(b''.join(response.streaming_content).splitlines()), hired)
+
+    def test_list_employees_query_count_is_constant(self):
+        """Test GET /api/company/employee/ loads company and department in the same query"""
+        def grow():
+            for i in range(10):
+                Employee.objects.create(
+                    company=self.company2,
+                    department=self.dept2_dev,
+                    name=f"Developer {i}",
+                    email=f"dev{i}@design.com"
+                )
+
+        response = self.assertQueriesConstant(lambda: self.client.get(reverse('list-all/add-employee')), grow)
+        self.assertEqual(len(response.data['results']), 13)
+
+    def test_server_timing_header_and_log(self):
+        """Test every response carries Server-Timing metrics and logs them tagged with the URL name"""
+        url = reverse('list-all/add-employee')
+        with self.assertLogs('companyManagement.timing', 'INFO') as logs, \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertRegex(
+            response['Server-Timing'],
+            rf'^db;dur=[\d.]+;desc="{len(queries)} queries", serialize;dur=[\d.]+, view;dur=[\d.]+$',
+        )
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line['url_name'], 'list-all/add-employee')
+        self.assertEqual((line['method'], line['status'], line['queries']), ('GET', 200, len(queries)))
+        self.assertGreater(line['serialize_ms'], 0)
+        self.assertGreaterEqual(line['view_ms'], line['db_ms'])
+
+        # the query recorder only lives as long as the request
+        self.assertEqual(connection.execute_wrappers, [])
+
+    def test_server_timing_serialize_on_details_and_writes(self):
+        """Test detail and write responses report their serialization time too, not just list pages"""
+        detail = reverse('retrieve/edit/delete-single-employee', args=[self.employee1.id])
+        for send in (
+            lambda: self.client.get(detail),
+            lambda: self.client.patch(detail, {'designation': "Staff Engineer"}, format='json'),
+            lambda: self.client.get(reverse('retrieve-single-project', args=[self.project1.id])),
+            lambda: self.client.get(reverse('async-retrieve-single-employee', args=[self.employee1.id])),
+        ):
+            with self.assertLogs('companyManagement.timing', 'INFO') as logs:
+                response = send()
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertGreater(json.loads(logs.records[0].getMessage())['serialize_ms'], 0, response.request)
+            self.assertNotIn('serialize;dur=0.00,', response['Server-Timing'])
+
+    async def test_server_timing_async_middleware(self):
+        """Test the async middleware path counts the queries the async ORM runs in its worker thread"""
+        token = await sync_to_async(lambda: str(CustomTokenObtainPairSerializer.get_token(self.admin).access_token))()
+        with self.assertLogs('companyManagement.timing', 'INFO') as logs:
+            response = await self.async_client.get(
+                reverse('async-list-employees'), headers={'Authorization': f'Bearer {token}'},
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line['url_name'], 'async-list-employees')
+        self.assertEqual(line['queries'], 1)
+        self.assertGreater(line['serialize_ms'], 0)
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+        self.assertEqual(connection.execute_wrappers, [])
+
+    def test_list_employees_cursor_pagination(self):
+        """Test GET /api/company/employee/?page_size=1 walks every employee by name via opaque cursors"""
+        url = reverse('list-all/add-employee')
+        response = self.client.get(url, {'page_size': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['previous'])
+
+        names = []
+        while True:
+            self.assertLessEqual(len(response.data['results']), 1)
+            names.extend(emp['name'] for emp in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        self.assertEqual(names, ["Bob Wilson", "Jane Smith", "John Doe"])
+
+    def test_list_employees_cursor_pagination_through_duplicate_names(self):
+        """Test pages through more same-named employees than a page holds, both ways, without skips or repeats"""
+        # More duplicates than an OFFSET-within-ties cursor can skip (DRF's offset_cutoff is 1000)
+        Employee.objects.bulk_create(
+            Employee(company=self.company3, name="Zed Same", email=f"zed{i}@marketing.com") for i in range(1200)
+        )
+        expected = list(Employee.objects.order_by('name', 'id').values_list('id', flat=True))
+        url = reverse('list-all/add-employee')
+
+        pages = [self.client.get(url, {'page_size': 300, 'fields': 'id'}).data]
+        while pages[-1]['next']:
+            pages.append(self.client.get(pages[-1]['next']).data)
+        self.assertEqual([emp['id'] for page in pages for emp in page['results']], expected)
+        self.assertEqual(len(pages), 5)
+
+        backwards = [pages[-1]]
+        while backwards[-1]['previous']:
+            backwards.append(self.client.get(backwards[-1]['previous']).data)
+        self.assertEqual([emp['id'] for page in reversed(backwards) for emp in page['results']], expected)
+
+        response = self.client.get(url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_employees_cursor_with_tampered_values(self):
+        """Test a well-formed cursor whose values don't fit the ordering fields is a 404, not a 500"""
+        def cursor(position):
+            return b64encode(json.dumps({'p': position, 'b': False}).encode(), altchars=b'-_').decode()
+
+        for url, params, position in (
+            (reverse('list-all/add-employee'), {}, ["x", "abc"]),
+            (reverse('list-all/add-employee'), {}, ["x", None]),
+            (reverse('list-all/add-employee'), {}, [["x"], {"id": 1}]),
+            (reverse('async-list-employees'), {}, ["x", "abc"]),
+            (reverse('list-all/add-employee'), {'order': 'tenure'}, ["not-a-date", 1]),
+            (reverse('review-list'), {}, ["yesterday", 1]),
+        ):
+            response = self.client.get(url, {**params, 'cursor': cursor(position)})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, (url, position))
+
+        # the genuine article still works
+        response = self.client.get(reverse('list-all/add-employee'), {'cursor': cursor(["Bob Wilson", self.employee3.id])})
+        self.assertEqual([e['name'] for e in response.data['results']], ["Jane Smith", "John Doe"])
+
+    def test_list_employees_page_size_is_capped(self):
+        """Test ?page_size= above MAX_PAGE_SIZE is clamped to the cap"""
+        url = reverse('list-all/add-employee')
+        with patch.object(KeysetPagination, 'max_page_size', 2):
+            response = self.client.get(url, {'page_size': 1000})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_async_list_employees_matches_sync_list(self):
+        """Test GET /api/company/async/employee/ returns the same pages as the sync endpoint"""
+        sync_page = self.client.get(reverse('list-all/add-employee'), {'company': self.company1.id, 'page_size': 1})
+        async_page = self.client.get(reverse('async-list-employees'), {'company': self.company1.id, 'page_size': 1})
+
+        self.assertEqual(async_page.status_code, status.HTTP_200_OK)
+        self.assertEqual(async_page.json()['results'], json.loads(json.dumps(sync_page.data['results'])))
+        self.assertIsNotNone(async_page.json()['next'])
+
+        # following the cursor gives the second employee
+        next_page = self.client.get(async_page.json()['next'])
+        self.assertEqual(next_page.json()['results'][0]['name'], 'John Doe')
+
+    def test_async_employee_endpoints_permissions(self):
+        """Test the async views authenticate from the bearer token and apply the role permissions"""
+        url = reverse('async-retrieve-single-employee', args=[self.employee1.id])
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        employee_user = UserAccount.objects.create_user(
+            username="emp", email="emp@test.com", password="pass", role=UserAccount.Roles.EMPLOYEE
+        )
+        token = CustomTokenObtainPairSerializer.get_token(employee_user).access_token
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        token = CustomTokenObtainPairSerializer.get_token(self.admin).access_token
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['department_name'], 'Engineering')
+
+        missing = reverse('async-retrieve-single-employee', args=[9999])
+        self.assertEqual(self.client.get(missing, HTTP_AUTHORIZATION=f'Bearer {token}').status_code,
+                         status.HTTP_404_NOT_FOUND)
+
+    async def test_async_views_check_query_free_permissions_on_the_event_loop(self):
+        """Test the stateless JWT user and role permissions are checked on the event loop, others in a worker thread"""
+        token = await sync_to_async(lambda: str(CustomTokenObtainPairSerializer.get_token(self.admin).access_token))()
+        view = company_async_views.alist_employees.cls
+        on_loop = []
+
+        class Recorded(IsAdmin):
+            def has_permission(self, request, view):
+                try:
+                    asyncio.get_running_loop()
+                    on_loop.append(True)
+                except RuntimeError:
+                    on_loop.append(False)
+                return super().has_permission(request, view)
+
+        class Unmarked(Recorded):
+            query_free = False
+
+        for permission in (Recorded, Recorded | IsHR, Unmarked):
+            with patch.object(view, 'permission_classes', [permission]):
+                response = await self.async_client.get(
+                    reverse('async-list-employees'), headers={'Authorization': f'Bearer {token}'},
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(on_loop, [True, True, False])
+
+    async def test_async_views_run_drf_request_handling(self):
+        """Test async views authenticate off the event loop (JWTAuthentication loads the user) and apply throttles"""
+        token = await sync_to_async(lambda: str(CustomTokenObtainPairSerializer.get_token(self.admin).access_token))()
+        view = company_async_views.aemployee_by_id.cls
+        url = reverse('async-retrieve-single-employee', args=[self.employee1.id])
+        headers = {'Authorization': f'Bearer {token}'}
+
+        # The user lookup counts against the view's budget of 1 like any other query
+        with patch.object(view, 'authentication_classes', [JWTAuthentication]), \
+                override_settings(QUERY_BUDGET_STRICT=False), \
+                self.assertLogs('companyManagement.query_budget', 'WARNING'):
+            response = await self.async_client.get(url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['name'], self.employee1.name)
+
+        class Closed(BaseThrottle):
+            def allow_request(self, request, view):
+                return False
+
+        with patch.object(view, 'throttle_classes', [Closed]):
+            response = await self.async_client.get(url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_employee_values_serializer_parity(self):
+        """Test the values() fast path renders exactly the JSON of EmployeeSerializer"""
+        Employee.objects.create(company=self.company3, name="No Department", email="nodept@agency.com")
+        employees = Employee.objects.select_related('company', 'department').order_by('id')
+
+        expected = JSONRenderer().render(EmployeeSerializer(employees, many=True).data)
+        actual = JSONRenderer().render(
+            EmployeeValuesSerializer(EmployeeValuesSerializer.project(employees), many=True).data
+        )
+        self.assertEqual(actual, expected)
+
+        url = reverse('list-all/add-employee')
+        regular = self.client.get(url, {'page_size': 2})
+        with override_settings(FAST_LIST_SERIALIZERS=True):
+            fast = self.client.get(url, {'page_size': 2})
+            self.assertEqual(fast.content, regular.content)
+            # same cursor positions too
+            self.assertEqual(self.client.get(fast.data['next']).content, self.client.get(regular.data['next']).content)
+
+    def test_export_employees_ndjson_matches_serializer(self):
+        """Test GET /api/company/employee/export/ streams one serializer-shaped JSON object per line"""
+        url = reverse('export-employees')
+        response = self.client.get(url, {'company': self.company1.id})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row['id'] for row in rows], [self.employee1.id, self.employee2.id])
+
+        detail_url = reverse('retrieve/edit/delete-single-employee', args=[self.employee1.id])
+        expected = json.loads(json.dumps(self.client.get(detail_url).data))
+        self.assertEqual(rows[0], expected)
+
+    def test_export_employees_csv(self):
+        """Test GET /api/company/employee/export/?type=csv streams a header and one line per employee"""
+        url = reverse('export-employees')
+        response = self.client.get(url, {'type': 'csv', 'department': self.dept2_creative.id})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['name'], "Bob Wilson")
+        self.assertEqual(rows[0]['department_name'], "Creative")
+        self.assertEqual(rows[0]['hired_on'], "")
+
+    def test_export_employees_invalid_type(self):
+        """Test GET /api/company/employee/export/?type=xml returns 400"""
+        url = reverse('export-employees')
+        response = self.client.get(url, {'type': 'xml'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_export_employees_streams_asynchronously_under_asgi(self):
+        """Test under ASGI the export body is an async iterator instead of a sync generator Django would buffer"""
+        token = await sync_to_async(lambda: str(CustomTokenObtainPairSerializer.get_token(self.admin).access_token))()
+        response = await self.async_client.get(
+            reverse('export-employees'), {'type': 'csv'}, headers={'Authorization': f'Bearer {token}'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+
+        content = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([row['name'] for row in rows], ["John Doe", "Jane Smith", "Bob Wilson"])
+        self.assertEqual(connection.execute_wrappers, [])
 
     def test_create_employee_success(self):
         """Test POST /api/company/employee/ creates new employee"""
@@ -257,6 +1005,150 @@ class CompanyAPITestCase(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    @override_settings(COMPANY_STORED_COUNTERS=True)
+    def test_bulk_import_employees_json(self):
+        """Test POST /api/company/employee/bulk/ creates every row of a JSON array"""
+        url = reverse('bulk-import-employees')
+        rows = [
+            {
+                'company': self.company1.id,
+                'department': self.dept1_eng.id,
+                'name': f'Imported {i}',
+                'email': f'imported{i}@techcorp.com',
+                'hired_on': '2024-03-01'
+            }
+            for i in range(5)
+        ]
+        with self.settings(EMPLOYEE_IMPORT_BATCH_SIZE=2):
+            response = self.client.post(url, rows, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 5)
+        self.assertEqual(Employee.objects.filter(email__startswith='imported').count(), 5)
+        self.company1.refresh_from_db()
+        self.assertEqual(self.company1.employees_total, 7)
+
+    def test_bulk_import_employees_validation_query_count_is_constant(self):
+        """Test bulk import validates the whole batch with a fixed number of lookups"""
+        url = reverse('bulk-import-employees')
+
+        def rows(count, prefix):
+            return [
+                {
+                    'company': self.company2.id,
+                    'department': self.dept2_dev.id,
+                    'name': f'Row {i}',
+                    'email': f'{prefix}{i}@design.com'
+                }
+                for i in range(count)
+            ]
+
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(url, rows(2, 'small'), format='json')
+        with CaptureQueriesContext(connection) as large:
+            self.client.post(url, rows(40, 'large'), format='json')
+
+        self.assertEqual(len(large), len(small))
+
+    def test_bulk_import_employees_reports_row_errors(self):
+        """Test bulk import writes nothing and reports each invalid row"""
+        url = reverse('bulk-import-employees')
+        rows = [
+            {'company': self.company1.id, 'name': 'Valid', 'email': 'valid@techcorp.com'},
+            {'company': self.company1.id, 'department': self.dept2_dev.id, 'name': 'Wrong Dept', 'email': 'wrong@techcorp.com'},
+            {'company': self.company1.id, 'name': 'Taken', 'email': 'john@techcorp.com'},
+            {'company': 9999, 'name': 'No Company', 'email': 'nocompany@techcorp.com'},
+            {'name': 'Missing Fields'},
+        ]
+        response = self.client.post(url, rows, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = {error['row']: error['errors'] for error in response.data['errors']}
+        self.assertEqual(sorted(errors), [2, 3, 4, 5])
+        self.assertIn('department', errors[2])
+        self.assertIn('email', errors[3])
+        self.assertIn('company', errors[4])
+        self.assertIn('email', errors[5])
+        self.assertFalse(Employee.objects.filter(email='valid@techcorp.com').exists())
+
+    def test_bulk_import_employees_csv(self):
+        """Test bulk import accepts a CSV upload"""
+        url = reverse('bulk-import-employees')
+        content = (
+            "company,department,name,email,designation,hired_on\n"
+            f"{self.company2.id},{self.dept2_creative.id},Csv One,csv1@design.com,Designer,2024-01-01\n"
+            f"{self.company2.id},,Csv Two,csv2@design.com,,\n"
+        )
+        upload = SimpleUploadedFile("employees.csv", content.encode(), content_type="text/csv")
+        response = self.client.post(url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertIsNone(Employee.objects.get(email='csv2@design.com').department)
+
+    def test_bulk_import_employees_rejects_undecodable_csv(self):
+        """Test a CSV that isn't UTF-8 is a 400"""
+        url = reverse('bulk-import-employees')
+        content = f"company,name,email\n{self.company2.id},Jos\xe9,jose@design.com\n".encode('latin-1')
+        upload = SimpleUploadedFile("employees.csv", content, content_type="text/csv")
+        response = self.client.post(url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('UTF-8', response.data['error'])
+
+    @override_settings(COMPANY_STORED_COUNTERS=True)
+    def test_bulk_import_employees_concurrent_insert(self):
+        """Test an email taken between validation and insert is a 400 and rolls back the whole import"""
+        url = reverse('bulk-import-employees')
+        rows = [
+            {'company': self.company1.id, 'name': 'First', 'email': 'first@techcorp.com'},
+            {'company': self.company1.id, 'name': 'Second', 'email': 'second@techcorp.com'},
+        ]
+
+        def validate_then_race(rows):
+            result = validate_employee_rows(rows)
+            Employee.objects.create(company=self.company2, name="Racer", email='second@techcorp.com')
+            return result
+
+        with patch.object(company_views, 'validate_employee_rows', validate_then_race):
+            response = self.client.post(url, rows, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Employee.objects.filter(email='first@techcorp.com').exists())
+        self.company1.refresh_from_db()
+        self.assertEqual(self.company1.employees_total, 2)
+
+    @override_settings(COMPANY_STORED_COUNTERS=True)
+    def test_bulk_import_employees_counters_in_the_insert_transaction(self):
+        """Test the counter bump shares the import's transaction and the caches are invalidated on commit"""
+        url = reverse('bulk-import-employees')
+        rows = [{'company': self.company1.id, 'department': self.dept1_eng.id, 'name': 'New', 'email': 'new@techcorp.com'}]
+
+        with patch.object(counters, 'members_added', side_effect=RuntimeError), self.assertRaises(RuntimeError):
+            self.client.post(url, rows, format='json')
+        self.assertFalse(Employee.objects.filter(email='new@techcorp.com').exists())
+
+        version = response_cache.version('company', self.company1.id)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(url, rows, format='json')
+            self.assertEqual(response_cache.version('company', self.company1.id), version)
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertNotEqual(response_cache.version('company', self.company1.id), version)
+        self.company1.refresh_from_db()
+        self.assertEqual(self.company1.employees_total, 3)
+
+    def test_bulk_import_employees_forbidden_for_manager(self):
+        """Test bulk import is restricted to HR and Admin"""
+        manager = UserAccount.objects.create_user(
+            username="manager", email="manager@test.com", password="pass", role=UserAccount.Roles.MANAGER
+        )
+        self.client.force_authenticate(manager)
+        url = reverse('bulk-import-employees')
+        response = self.client.post(url, [], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_employee_details_success(self):
         """Test GET /api/company/employee/{id}/ returns specific employee"""
         url = reverse('retrieve/edit/delete-single-employee', args=[self.employee1.id])
@@ -300,6 +1192,69 @@ class CompanyAPITestCase(APITestCase):
         self.assertEqual(response.data['designation'], 'Lead Developer')
         self.assertEqual(response.data['name'], 'John Doe')  # Unchanged
 
+    def test_employee_details_conditional_get(self):
+        """Test employee revalidation skips serialization and follows department renames"""
+        url = reverse('retrieve/edit/delete-single-employee', args=[self.employee1.id])
+        etag = self.client.get(url)['ETag']
+
+        # one query for the foreign keys, no join/serialization
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.dept1_eng.name = "Platform"
+        self.dept1_eng.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['department_name'], "Platform")
+
+    def test_update_employee_if_match(self):
+        """Test PATCH with a stale If-Match is refused with 412, with the current one it applies"""
+        url = reverse('retrieve/edit/delete-single-employee', args=[self.employee1.id])
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.patch(url, {'designation': 'Lead Developer'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # a second client still holding the old ETag
+        response = self.client.patch(url, {'designation': 'Architect'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.employee1.refresh_from_db()
+        self.assertEqual(self.employee1.designation, 'Lead Developer')
+
+    def test_employee_etag_comes_from_the_database(self):
+        """Test the employee ETag survives losing the cache (another worker) and changes with every save"""
+        url = reverse('retrieve/edit/delete-single-employee', args=[self.employee1.id])
+        etag = self.client.get(url)['ETag']
+        cache.clear()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Employee.objects.get(pk=self.employee1.pk).save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_update_employee_compare_and_set(self):
+        """Test a write landing between the If-Match check and the save wins, the late one is refused"""
+        url = reverse('retrieve/edit/delete-single-employee', args=[self.employee1.id])
+        etag = self.client.get(url)['ETag']
+
+        def concurrent_write(attrs):
+            # another request holding the same ETag saves first
+            other = Employee.objects.get(pk=self.employee1.pk)
+            other.designation = 'Architect'
+            other.save()
+            return attrs
+
+        with patch.object(EmployeeSerializer, 'validate', side_effect=concurrent_write):
+            response = self.client.patch(url, {'designation': 'Lead Developer'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.employee1.refresh_from_db()
+        self.assertEqual(self.employee1.designation, 'Architect')
+
+        with patch.object(EmployeeSerializer, 'validate', side_effect=concurrent_write):
+            response = self.client.patch(url, {'designation': 'Lead Developer'})
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
     def test_delete_employee_success(self):
         """Test DELETE /api/company/employee/{id}/ deletes employee"""
         url = reverse('retrieve/edit/delete-single-employee', args=[self.employee3.id])
@@ -309,3 +1264,346 @@ class CompanyAPITestCase(APITestCase):
         
         # Verify employee was deleted
         self.assertFalse(Employee.objects.filter(id=self.employee3.id).exists())
+
+    # ============= PROJECT TESTS =============
+    def test_list_projects_success(self):
+        """Test GET /api/company/project/ returns projects with assigned employees"""
+        url = reverse('list-all-projects')
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+
+        project_data = response.data['results'][0]
+        self.assertEqual(project_data['name'], "Website Redesign")
+        self.assertEqual(project_data['company_name'], "Tech Corp")
+        self.assertEqual(project_data['department_name'], "Engineering")
+        self.assertEqual(project_data['assigned_employees'], [self.employee1.id])
+        self.assertEqual(project_data['assigned_employees_list'], [
+            {'id': self.employee1.id, 'name': "John Doe", 'email': "john@techcorp.com"}
+        ])
+
+    def test_list_projects_filtered_by_company(self):
+        """Test GET /api/company/project/?company=2 filters by company"""
+        url = reverse('list-all-projects')
+        response = self.client.get(url, {'company': self.company2.id})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['name'], "Brand Identity")
+
+    def test_list_projects_query_count_is_constant(self):
+        """Test GET /api/company/project/ does not issue per-project queries"""
+        def grow():
+            for i in range(10):
+                project = Project.objects.create(
+                    company=self.company1,
+                    department=self.dept1_hr,
+                    name=f"Extra Project {i}",
+                    start_date="2024-05-01"
+                )
+                project.assigned_employees.add(self.employee1, self.employee2)
+
+        response = self.assertQueriesConstant(lambda: self.client.get(reverse('list-all-projects')), grow)
+        self.assertEqual(len(response.data['results']), 12)
+
+    def test_project_details_success(self):
+        """Test GET /api/company/project/{id}/ returns specific project"""
+        url = reverse('retrieve-single-project', args=[self.project2.id])
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], "Brand Identity")
+        self.assertEqual(response.data['assigned_employees_list'][0]['name'], "Bob Wilson")
+
+    def test_project_details_not_found(self):
+        """Test GET /api/company/project/{id}/ with non-existent ID returns 404"""
+        url = reverse('retrieve-single-project', args=[9999])
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        for i in range(3):
+            company = Company.objects.create(name=f"Company {i}")
+            Department.objects.create(company=company, name="Engineering")
+
+        # One query for the companies plus one per company: over a budget of one per company
+        @query_budget(lambda size: size)
+        @api_view(['GET'])
+        @permission_classes([AllowAny])
+        def department_names(request):
+            return Response([
+                [department.name for department in company.departments.all()]
+                for company in Company.objects.all()
+            ])
+
+        self.view = department_names
+        self.request = APIRequestFactory().get('/departments/')
+
+    def test_every_api_view_declares_a_query_budget(self):
+        """Test every company/reviews API view, sync and async, has a @query_budget"""
+        self.assertQueryBudgetsDeclared(company_views, review_views, company_async_views, review_async_views)
+
+    def test_budget_per_method(self):
+        """Test a GET is held to its own budget, not to the write path's"""
+        @query_budget({'GET': 1, 'POST': 4})
+        @api_view(['GET', 'POST'])
+        @permission_classes([AllowAny])
+        def departments(request):
+            return Response([
+                [department.name for department in company.departments.all()]
+                for company in Company.objects.all()
+            ])
+
+        factory = APIRequestFactory()
+        with override_settings(QUERY_BUDGET_STRICT=True):
+            self.assertEqual(departments(factory.post('/departments/')).status_code, status.HTTP_200_OK)
+            with self.assertRaises(QueryBudgetExceeded) as raised:
+                departments(factory.get('/departments/'))
+        self.assertIn('ran 4 queries, over its budget of 1', str(raised.exception))
+
+    def test_write_over_budget_only_logs_when_strict(self):
+        """Test a write over its budget is served (it has committed) and the overrun logged, even when strict"""
+        @query_budget({'GET': 4, 'POST': 1})
+        @api_view(['GET', 'POST'])
+        @permission_classes([AllowAny])
+        def rename(request):
+            Company.objects.update(name='Renamed')
+            return Response(list(Company.objects.values_list('name', flat=True)))
+
+        with override_settings(QUERY_BUDGET_STRICT=True), \
+                self.assertLogs('companyManagement.query_budget', 'WARNING') as logs:
+            response = rename(APIRequestFactory().post('/companies/'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('rename ran 2 queries, over its budget of 1', logs.output[0])
+
+    def test_async_view_budget(self):
+        """Test the queries an async view runs through the async ORM count against its budget"""
+        @query_budget(1)
+        async def companies(request):
+            return Response([company.name async for company in Company.objects.all()]
+                            + [department.name async for department in Department.objects.all()])
+
+        with override_settings(QUERY_BUDGET_STRICT=True), self.assertRaises(QueryBudgetExceeded) as raised:
+            async_to_sync(companies)(self.request)
+        self.assertIn('companies ran 2 queries, over its budget of 1', str(raised.exception))
+
+    def test_view_over_budget_raises_when_strict(self):
+        """Test an N+1 over the budget raises with the offending SQL"""
+        with override_settings(QUERY_BUDGET_STRICT=True), self.assertRaises(QueryBudgetExceeded) as raised:
+            self.view(self.request)
+        self.assertIn('ran 4 queries, over its budget of 3 (result size 3)', str(raised.exception))
+        self.assertIn('"company_department"', str(raised.exception))
+
+    def test_view_over_budget_logs_otherwise(self):
+        """Test outside strict mode the response is served and the overrun logged"""
+        with override_settings(QUERY_BUDGET_STRICT=False), \
+                self.assertLogs('companyManagement.query_budget', 'WARNING') as logs:
+            response = self.view(self.request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('department_names ran 4 queries', logs.output[0])
+
+    def test_streamed_queries_count_against_the_budget(self):
+        """Test a streaming response is checked once its body has been consumed"""
+        @query_budget(0)
+        @api_view(['GET'])
+        @permission_classes([AllowAny])
+        def stream(request):
+            return StreamingHttpResponse(company.name for company in Company.objects.all())
+
+        response = stream(self.request)
+        with override_settings(QUERY_BUDGET_STRICT=True), self.assertRaises(QueryBudgetExceeded):
+            b''.join(response.streaming_content)
+
+    def test_streamed_queries_counted_per_chunk(self):
+        """Test the counting wrapper isn't held across chunks, where the consumer may enter its own"""
+        @query_budget(1)
+        @api_view(['GET'])
+        @permission_classes([AllowAny])
+        def stream(request):
+            return StreamingHttpResponse(company.name for company in Company.objects.all())
+
+        def consumer_wrapper(execute, sql, params, many, context):
+            return execute(sql, params, many, context)
+
+        content = iter(stream(self.request).streaming_content)
+        with connection.execute_wrapper(consumer_wrapper):
+            next(content)
+            self.assertEqual(connection.execute_wrappers, [consumer_wrapper])
+        self.assertEqual(len(list(content)), 2)
+        self.assertEqual(connection.execute_wrappers, [])
+
+
+class WriteQueryBudgetTests(TransactionTestCase):
+    """
+    Write budgets measured under autocommit, as in production: a transaction there starts
+    with a BEGIN, which TestCase (where atomic blocks are savepoints, or nothing) never sends.
+    """
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        self.client.force_authenticate(UserAccount.objects.create_user(
+            username="admin", email="admin@test.com", password="pass", role=UserAccount.Roles.ADMIN
+        ))
+        self.company1 = Company.objects.create(name="Tech Corp")
+        self.company2 = Company.objects.create(name="Design Studio")
+        self.dept1 = Department.objects.create(company=self.company1, name="Engineering")
+        self.dept2 = Department.objects.create(company=self.company2, name="Creative")
+        self.employee = Employee.objects.create(
+            company=self.company1, department=self.dept1, name="John Doe", email="john@techcorp.com"
+        )
+        project = Project.objects.create(company=self.company1, name="Platform", start_date="2024-01-01")
+        project.assigned_employees.add(self.employee)
+
+    def assertWithinBudget(self, send):
+        with self.assertNoLogs('companyManagement.query_budget', 'WARNING'):
+            response = send()
+        self.assertLess(response.status_code, 400, response.content)
+        return response
+
+    @override_settings(COMPANY_STORED_COUNTERS=True)
+    def test_employee_writes_within_budget(self):
+        """Test create, move (PUT/PATCH), bulk import and delete stay within their budgets"""
+        url = reverse('retrieve/edit/delete-single-employee', args=[self.employee.id])
+        self.assertWithinBudget(lambda: self.client.post(reverse('list-all/add-employee'), {
+            'company': self.company1.id, 'department': self.dept1.id, 'name': "Jane Smith", 'email': "jane@techcorp.com",
+        }, format='json'))
+        self.assertWithinBudget(lambda: self.client.put(url, {
+            'company': self.company2.id, 'department': self.dept2.id, 'name': "John Doe", 'email': "john@techcorp.com",
+        }, format='json'))
+        self.assertWithinBudget(lambda: self.client.patch(url, {
+            'company': self.company1.id, 'department': self.dept1.id,
+        }, format='json'))
+        with self.settings(EMPLOYEE_IMPORT_BATCH_SIZE=2):
+            self.assertWithinBudget(lambda: self.client.post(reverse('bulk-import-employees'), [
+                {'company': self.company1.id, 'department': self.dept1.id, 'name': f"Imported {i}",
+                 'email': f"imported{i}@techcorp.com"}
+                for i in range(5)
+            ], format='json'))
+        self.assertWithinBudget(lambda: self.client.delete(url))
+        self.assertFalse(Employee.objects.filter(pk=self.employee.pk).exists())
+
+
+class MetricsEndpointTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.addCleanup(registry.reset)
+        self.admin = UserAccount.objects.create_user(
+            username="admin", email="admin@test.com", password="pass", role=UserAccount.Roles.ADMIN
+        )
+        self.company = Company.objects.create(name="Metrics Co")
+        self.client.force_authenticate(self.admin)
+
+    def scrape(self):
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def test_metrics_admin_only(self):
+        """Test GET /api/metrics/ is limited to admins"""
+        hr = UserAccount.objects.create_user(
+            username="hr", email="hr@test.com", password="pass", role=UserAccount.Roles.HR
+        )
+        self.client.force_authenticate(hr)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_request_and_cache_metrics(self):
+        """Test latency/query histograms and error counts per URL name, and the cache hit ratio"""
+        url = reverse('retrieve-single-company', args=[self.company.id])
+        for _ in range(3):
+            self.client.get(url)
+        self.client.get(reverse('retrieve-single-company', args=[9999]))
+
+        body = self.scrape()
+        labels = 'method="GET",route="retrieve-single-company"'
+        self.assertIn(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 4', body)
+        self.assertIn(f'http_request_duration_seconds_count{{{labels}}} 4', body)
+        self.assertIn('http_request_db_queries_count{route="retrieve-single-company"} 4', body)
+        self.assertIn('http_request_errors_total{route="retrieve-single-company",status="404"} 1', body)
+        self.assertIn('api_cache_lookups_total{kind="company",result="hit"} 2', body)
+        self.assertIn('api_cache_lookups_total{kind="company",result="miss"} 2', body)
+        self.assertIn('api_cache_hit_ratio{kind="company"} 0.5', body)
+
+    def test_metrics_summed_across_worker_processes(self):
+        """Test a scrape adds up the totals every worker process wrote to METRICS_DIR"""
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            other_worker = {
+                'counters': [['review_transitions_total', {'status': 'APPROVED'}, 2]],
+                'histograms': [['http_request_db_queries', {'route': 'list-all-companies'}, [0, 0, 1] + [0] * 8 + [2]]],
+            }
+            Path(directory, 'metrics-999999.json').write_text(json.dumps(other_worker))
+            registry.inc('review_transitions_total', status='APPROVED')
+            self.client.get(reverse('list-all-companies'))
+
+            body = self.scrape()
+            self.assertTrue(Path(directory, f'metrics-{os.getpid()}.json').exists())
+
+        self.assertIn('review_transitions_total{status="APPROVED"} 3', body)
+        # the other worker's request ran 2 queries, the local one 1
+        self.assertIn('http_request_db_queries_bucket{route="list-all-companies",le="1"} 1', body)
+        self.assertIn('http_request_db_queries_bucket{route="list-all-companies",le="2"} 2', body)
+        self.assertIn('http_request_db_queries_count{route="list-all-companies"} 2', body)
+
+    def test_registry_is_thread_safe(self):
+        """Test concurrent updates from many threads are all counted"""
+        def work():
+            for _ in range(500):
+                registry.inc('api_cache_lookups_total', kind='company', result='hit')
+                registry.observe('http_request_db_queries', 1, route='threads')
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        body = self.scrape()
+        self.assertIn('api_cache_lookups_total{kind="company",result="hit"} 4000', body)
+        self.assertIn('http_request_db_queries_count{route="threads"} 4000', body)
+
+
+class DatasetAndBenchmarkCommandTests(TestCase):
+    def test_generate_dataset_and_benchmark_every_endpoint(self):
+        """Test generate_dataset builds a consistent dataset and benchmark_api runs every endpoint on it without errors"""
+        call_command('generate_dataset', companies=2, departments=2, employees=60, projects=4,
+                     assignments=3, users=20, reviews=30, stdout=io.StringIO())
+        self.assertEqual(Employee.objects.count(), 60)
+        self.assertEqual(Project.assigned_employees.through.objects.count(), 12)
+        self.assertEqual(set(PerformanceReview.objects.values_list('status', flat=True)),
+                         set(PerformanceReview.Status.values))
+        self.assertEqual(set(UserAccount.objects.values_list('role', flat=True)), set(UserAccount.Roles.values))
+        self.assertFalse(any(counters.find_drift().values()))
+
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command('benchmark_api', iterations=1, warmup=0, output=output.name, stderr=io.StringIO())
+            report = json.load(output)
+
+        self.assertEqual(report['not_covered'], [])
+        self.assertEqual({name: result['errors'] for name, result in report['endpoints'].items() if result['errors']}, {})
+        self.assertEqual(report['meta']['dataset']['employee'], 60)
+        self.assertEqual(set(report['endpoints']['GET list-all-companies']),
+                         {'p50_ms', 'p95_ms', 'p99_ms', 'mean_ms', 'queries', 'peak_memory_kb', 'errors'})
+
+
+class BenchmarkIndexesCommandTests(unittest.TestCase):
+    # Not a Django TestCase: the command opens a database of its own, outside the test database
+    def test_benchmark_indexes_removes_its_temporary_database(self):
+        """Test benchmark_indexes deletes the database it built without --db, even when the run fails"""
+        with tempfile.TemporaryDirectory() as directory, patch('tempfile.tempdir', directory):
+            out = io.StringIO()
+            call_command('benchmark_indexes', rows=50, companies=2, departments=2, repeat=1, json=True,
+                         stdout=out, stderr=io.StringIO())
+            self.assertEqual(json.loads(out.getvalue())['rows'], 50)
+            self.assertEqual(os.listdir(directory), [])
+
+            with patch('company.management.commands.benchmark_indexes.Command.measure', side_effect=RuntimeError):
+                with self.assertRaises(RuntimeError):
+                    call_command('benchmark_indexes', rows=50, companies=2, departments=2, stderr=io.StringIO())
+            self.assertEqual(os.listdir(directory), [])
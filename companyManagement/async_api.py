@@ -0,0 +1,94 @@
+"""
+Async (ASGI-native) read-only views.
+
+DRF's APIView.dispatch is sync, so under ASGI each request runs in a worker thread.
+AsyncAPIView runs DRF's own request handling around a coroutine handler instead.
+initial() (authentication, permissions, throttles, content negotiation) runs on the
+event loop when every authenticator and permission is known to be query-free (the
+stateless JWT authenticator, the role permissions), and in a worker thread otherwise
+(JWTAuthentication loads the user, throttles hit the cache). The handler runs on the
+event loop with the async ORM, exceptions go through the configured EXCEPTION_HANDLER
+and the Response is rendered as usual.
+"""
+from inspect import isawaitable
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.request import ForcedAuthentication
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+
+# Library authenticators/permissions that never touch the database or the cache.
+# Project classes say so with a `query_free = True` attribute.
+QUERY_FREE_CLASSES = (AllowAny, IsAuthenticated, ForcedAuthentication, JWTStatelessUserAuthentication)
+
+
+def query_free(component):
+    """
+    Whether an authenticator or permission instance (or an `A | B`, `A & B`, `~A` of them)
+    runs no queries.
+    """
+    operands = [getattr(component, name) for name in ('op1', 'op2') if hasattr(component, name)]
+    if operands:
+        return all(query_free(operand) for operand in operands)
+    return getattr(component, 'query_free', False) or type(component) in QUERY_FREE_CLASSES
+
+
+class AsyncAPIView(APIView):
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        APIView.dispatch, awaiting the handler.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            if self.initial_is_query_free(request):
+                self.initial(request, *args, **kwargs)
+            else:
+                await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    def initial_is_query_free(self, request):
+        return (
+            not self.throttle_classes
+            and all(query_free(authenticator) for authenticator in request.authenticators)
+            and all(query_free(permission) for permission in self.get_permissions())
+        )
+
+
+def async_api_view(permission_classes=None):
+    """
+    Async counterpart of `@api_view(['GET'])` + `@permission_classes([...])`
+    for a coroutine returning a Response.
+    """
+    def decorator(view):
+        async def get(self, request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        attrs = {'get': get, '__doc__': view.__doc__, '__module__': view.__module__}
+        if permission_classes is not None:
+            attrs['permission_classes'] = permission_classes
+        return type(view.__name__, (AsyncAPIView,), attrs).as_view()
+    return decorator
+
+
+def served_async(request):
+    """
+    Whether the request came in through ASGI (a DRF Request or the HttpRequest itself).
+    """
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
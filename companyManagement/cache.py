@@ -0,0 +1,109 @@
+"""
+Versioned response cache.
+
+Every cached object has a version token stored next to it. Entries are keyed by
+(kind, id, version), so invalidating an object is just replacing its token
+(see company.signals); old entries are never read again and age out of the backend.
+Each app keeps its own ResponseCache (company.cache, reviews.dashboard), so hit/miss
+counters are per app; the entries share the API_CACHE_ALIAS backend.
+"""
+import threading
+from uuid import uuid4
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from companyManagement.metrics import registry
+
+# Which CACHES alias backs the response cache, and how long entries live
+DEFAULT_CACHE_ALIAS = 'default'
+DEFAULT_CACHE_TIMEOUT = 600
+
+
+class ResponseCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self):
+        return caches[getattr(settings, 'API_CACHE_ALIAS', DEFAULT_CACHE_ALIAS)]
+
+    @property
+    def shared(self):
+        """
+        Whether every worker process sees the same backend. A per-process one (locmem, dummy)
+        keeps a version token other workers may have bumped, fine for entries that expire
+        but not for ETags, which never do.
+        """
+        return not isinstance(self.backend, (LocMemCache, DummyCache))
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'API_CACHE_TIMEOUT', DEFAULT_CACHE_TIMEOUT)
+
+    @staticmethod
+    def _version_key(kind, pk):
+        return f'api:{kind}:{pk}:version'
+
+    def version(self, kind, pk):
+        """
+        Current version token of an object, created on first use.
+        A fresh random token (not a counter) means a lost version key can never
+        resurrect an entry written under an old one.
+        """
+        version_key = self._version_key(kind, pk)
+        version = self.backend.get(version_key)
+        if version is None:
+            self.backend.add(version_key, uuid4().hex, None)
+            version = self.backend.get(version_key)
+        return version
+
+    def bump(self, kind, pk):
+        """
+        Invalidate every cached entry of an object.
+        """
+        self.backend.set(self._version_key(kind, pk), uuid4().hex, None)
+
+    def key(self, kind, pk, version=None):
+        """
+        Cache key of the object's current version (or of `version`, when already read).
+        Read it once per request and use it for both get() and set(),
+        so data computed before a concurrent bump is stored under the old version.
+        """
+        if version is None:
+            version = self.version(kind, pk)
+        return f'api:{kind}:{pk}:{version}'
+
+    def get(self, key):
+        data = self.backend.get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        registry.inc('api_cache_lookups_total', kind=key.split(':')[1], result='miss' if data is None else 'hit')
+        return data
+
+    def set(self, key, data, timeout=None):
+        self.backend.set(key, data, self.timeout if timeout is None else timeout)
+
+    def stats(self):
+        """
+        Hit/miss counters of this process since start (or the last reset()).
+        """
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / lookups if lookups else None,
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
@@ -0,0 +1,43 @@
+from django.utils.http import parse_etags, quote_etag
+from rest_framework.response import Response
+from rest_framework import status
+
+
+def make_etag(*parts):
+    """
+    Strong ETag built from a cheap version source (a cache version token, a timestamp),
+    never from the serialized payload, so checking it costs no serialization.
+    """
+    return quote_etag("-".join(str(part) for part in parts))
+
+
+def _matches(header, etag, weak):
+    if not header:
+        return False
+    etags = parse_etags(header)
+    if "*" in etags:
+        return True
+    if weak:
+        # If-None-Match uses the weak comparison (RFC 9110 13.1.2)
+        etags = [tag.removeprefix("W/") for tag in etags]
+    return etag in etags
+
+
+def not_modified(request, etag):
+    """
+    304 response when the client's If-None-Match already names `etag`, else None.
+    """
+    if _matches(request.headers.get("If-None-Match"), etag, weak=True):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
+
+
+def precondition_failed(request, etag):
+    """
+    412 response when the client sent If-Match and none of its tags is `etag`, else None.
+    """
+    header = request.headers.get("If-Match")
+    if header and not _matches(header, etag, weak=False):
+        return Response({"error": "The resource has changed, fetch it again before updating."},
+                        status=status.HTTP_412_PRECONDITION_FAILED, headers={"ETag": etag})
+    return None
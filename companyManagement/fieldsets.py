@@ -0,0 +1,72 @@
+"""
+Sparse fieldsets: `?fields=id,name` on the read endpoints returns only those keys.
+
+requested_fields() validates the parameter against a serializer, SparseFieldsMixin
+drops the other fields before anything is serialized (so computed fields are never
+evaluated) and sparse_queryset() narrows the query to the columns and joins the
+remaining fields read.
+"""
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+
+
+def requested_fields(request, serializer_class):
+    """
+    Field names listed in ?fields=a,b (None without the parameter). Unknown names are a 400.
+    """
+    value = request.query_params.get(FIELDS_PARAM)
+    if value is None:
+        return None
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    available = serializer_class().fields
+    if not fields or any(name not in available for name in fields):
+        raise ValidationError({FIELDS_PARAM: f"Must be a comma separated list of: {', '.join(available)}."})
+    return fields
+
+
+def select_fields(data, fields):
+    """
+    `data` (a full serialized payload, e.g. from the response cache) trimmed to `fields`.
+    """
+    if fields is None:
+        return data
+    return {key: value for key, value in data.items() if key in fields}
+
+
+def sparse_queryset(queryset, serializer_class, fields, extra=()):
+    """
+    `queryset` loading only what `fields` read: only() of their columns, the pk and the
+    `extra` columns (e.g. the keyset ordering the paginator reads back), and select_related()
+    of just the relations they traverse. A field reads its source unless the serializer's
+    `sparse_columns` says otherwise.
+    """
+    serializer = serializer_class()
+    columns = {queryset.model._meta.pk.name, *(column.lstrip('-') for column in extra)}
+    for name in fields:
+        if name in serializer.sparse_columns:
+            columns.update(serializer.sparse_columns[name])
+        else:
+            columns.add('__'.join(serializer.fields[name].source_attrs))
+
+    queryset = queryset.select_related(None)
+    relations = {column.rsplit('__', 1)[0] for column in columns if '__' in column}
+    if relations:
+        queryset = queryset.select_related(*relations)
+    return queryset.only(*columns)
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin keeping only the fields named in context['fields'] (all of them without it).
+    `sparse_columns` maps the fields whose source isn't a column (computed values,
+    annotations) to the columns they do read, see sparse_queryset().
+    """
+    sparse_columns = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('fields')
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
@@ -0,0 +1,233 @@
+"""
+In-process metrics registry, exposed in the Prometheus text format at /api/metrics/.
+
+Counters and histograms live in memory and are updated under a lock. With METRICS_DIR
+set, every worker process also writes its totals to `<METRICS_DIR>/metrics-<pid>.json`
+(atomically, at most every METRICS_FLUSH_INTERVAL seconds after a change), and a scrape
+sums the files of all workers, so any worker answers with the totals of the whole server.
+Files of exited workers keep counting, like their requests did: empty the directory
+when the server (re)starts, not while it runs. Without METRICS_DIR a scrape sees the
+answering process only.
+"""
+import json
+import os
+import tempfile
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+from typing import NamedTuple
+from django.conf import settings
+
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class Metric(NamedTuple):
+    name: str
+    kind: str
+    help: str
+    buckets: tuple = None
+
+
+METRICS = {metric.name: metric for metric in (
+    Metric('http_request_duration_seconds', 'histogram', 'Request latency per URL name.', LATENCY_BUCKETS),
+    Metric('http_request_errors_total', 'counter', 'Responses with a 4xx/5xx status per URL name.'),
+    Metric('http_request_db_queries', 'histogram', 'SQL queries per request per URL name.', QUERY_BUCKETS),
+    Metric('api_cache_lookups_total', 'counter', 'Response cache lookups per kind and result (hit/miss).'),
+    Metric('review_transitions_total', 'counter', 'Performance reviews moved to each status.'),
+)}
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timer = None
+        self._clear()
+        if hasattr(os, 'register_at_fork'):
+            # A forked worker starts from zero, its parent's totals are the parent's file
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _clear(self):
+        self._counters = defaultdict(float)
+        # (name, labels) -> [count per bucket..., count above the last bucket, sum]
+        self._histograms = {}
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self._timer = None
+        self._clear()
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            self._counters[name, _labels_key(labels)] += value
+        self._schedule_flush()
+
+    def observe(self, name, value, **labels):
+        buckets = METRICS[name].buckets
+        with self._lock:
+            key = name, _labels_key(labels)
+            counts = self._histograms.get(key)
+            if counts is None:
+                counts = self._histograms[key] = [0] * (len(buckets) + 2)
+            counts[bisect_left(buckets, value)] += 1
+            counts[-1] += value
+        self._schedule_flush()
+
+    def snapshot(self):
+        """
+        JSON-able copy of this process's totals.
+        """
+        with self._lock:
+            return {
+                'counters': [[name, dict(labels), value] for (name, labels), value in self._counters.items()],
+                'histograms': [[name, dict(labels), list(counts)] for (name, labels), counts in self._histograms.items()],
+            }
+
+    def reset(self):
+        with self._lock:
+            self._clear()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        directory = metrics_dir()
+        if directory:
+            self._path(directory).unlink(missing_ok=True)
+
+    @staticmethod
+    def _path(directory):
+        return Path(directory) / f'metrics-{os.getpid()}.json'
+
+    def _schedule_flush(self):
+        if not metrics_dir():
+            return
+        with self._lock:
+            if self._timer is not None:
+                return
+            interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+            self._timer = threading.Timer(interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """
+        Write this process's totals to its file in METRICS_DIR (replaced atomically).
+        """
+        with self._lock:
+            self._timer = None
+        directory = metrics_dir()
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=directory, suffix='.tmp', delete=False) as file:
+            json.dump(self.snapshot(), file)
+        os.replace(file.name, self._path(directory))
+
+    def collect(self):
+        """
+        Totals of every worker process (of this one only without METRICS_DIR).
+        """
+        directory = metrics_dir()
+        if not directory:
+            return [self.snapshot()]
+        self.flush()
+        snapshots = []
+        for path in Path(directory).glob('metrics-*.json'):
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue  # removed while listing
+        return snapshots
+
+
+def metrics_dir():
+    return getattr(settings, 'METRICS_DIR', None)
+
+
+registry = Registry()
+
+
+def record_request(url_name, method, status_code, duration, queries):
+    """
+    Called by ServerTimingMiddleware (companyManagement.timing) once per request.
+    """
+    route = url_name or 'unmatched'
+    registry.observe('http_request_duration_seconds', duration, route=route, method=method)
+    registry.observe('http_request_db_queries', queries, route=route)
+    if status_code >= 400:
+        registry.inc('http_request_errors_total', route=route, status=str(status_code))
+
+
+def aggregate(snapshots):
+    counters = defaultdict(float)
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            counters[name, _labels_key(labels)] += value
+        for name, labels, counts in snapshot['histograms']:
+            key = name, _labels_key(labels)
+            if key in histograms:
+                histograms[key] = [total + count for total, count in zip(histograms[key], counts)]
+            else:
+                histograms[key] = list(counts)
+    return counters, histograms
+
+
+def _format_labels(labels, **extra):
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ''
+    escaped = (
+        str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+        for _, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def cache_hit_ratios(counters):
+    lookups = defaultdict(lambda: {'hit': 0, 'miss': 0})
+    for (name, labels), value in counters.items():
+        if name == 'api_cache_lookups_total':
+            labels = dict(labels)
+            lookups[labels['kind']][labels['result']] += value
+    return {kind: counts['hit'] / (counts['hit'] + counts['miss']) for kind, counts in lookups.items()}
+
+
+def render(snapshots):
+    """
+    Prometheus text exposition (format 0.0.4) of the summed snapshots.
+    """
+    counters, histograms = aggregate(snapshots)
+    lines = []
+    for metric in METRICS.values():
+        lines += [f'# HELP {metric.name} {metric.help}', f'# TYPE {metric.name} {metric.kind}']
+        if metric.kind == 'counter':
+            for (name, labels), value in sorted(counters.items()):
+                if name == metric.name:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+            continue
+        for (name, labels), counts in sorted(histograms.items()):
+            if name != metric.name:
+                continue
+            cumulative = 0
+            for bound, count in zip((*metric.buckets, '+Inf'), counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels(labels, le=bound)} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(counts[-1])}')
+            lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+
+    lines += ['# HELP api_cache_hit_ratio Share of response cache lookups that hit, per kind.',
+              '# TYPE api_cache_hit_ratio gauge']
+    for kind, ratio in sorted(cache_hit_ratios(counters).items()):
+        lines.append(f'api_cache_hit_ratio{_format_labels([("kind", kind)])} {ratio!r}')
+    return '\n'.join(lines) + '\n'
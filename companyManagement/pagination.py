@@ -0,0 +1,213 @@
+import json
+from base64 import b64decode, b64encode
+from binascii import Error as Base64Error
+from datetime import date, time
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from companyManagement.timing import serializer_data
+
+
+def cursor_value(value):
+    # Dates/times as full ISO strings (the lookups parse them back), microseconds included
+    return value.isoformat() if isinstance(value, (date, time)) else value
+
+
+def keyset_filter(ordering, position, backwards=False):
+    """
+    Rows after `position` (before it when `backwards`) in `ordering`, compared as a tuple:
+    `a > x OR (a = x AND id > y)`, plus `a >= x` so the index on the leading field is used.
+    """
+    after, equal = Q(), {}
+    for field, value in zip(ordering, position):
+        name = field.lstrip('-')
+        descending = field.startswith('-') != backwards
+        after |= Q(**equal, **{f'{name}__{"lt" if descending else "gt"}': value})
+        equal[name] = value
+    leading = ordering[0].lstrip('-')
+    descending = ordering[0].startswith('-') != backwards
+    return Q(**{f'{leading}__{"lte" if descending else "gte"}': position[0]}) & after
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor (keyset) pagination shared by the list endpoints.
+    The ordering ends with a unique, non-null field (the id), and a page is the rows after
+    the last one of the previous page, compared on the whole ordering tuple. Deep pages
+    and long runs of equal values (names, timestamps) cost the same as the first page
+    and never skip or repeat rows. The cursor is an opaque base64 token handed back in
+    `next`/`previous`.
+    """
+    ordering = ('id',)
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.REST_FRAMEWORK.get('MAX_PAGE_SIZE', 100)
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    # Split around the one query a page runs, so the async views can fetch it with `async for`
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.page_queryset(queryset, request)
+        if page_queryset is None:
+            return None
+        return self.build_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.page_queryset(queryset, request)
+        if page_queryset is None:
+            return None
+        return self.build_page([obj async for obj in page_queryset])
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(page_size, self.max_page_size) if page_size > 0 else self.page_size
+
+    def decode_cursor(self, request):
+        """
+        (position, backwards) of the ?cursor= token, None without one.
+        """
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            cursor = json.loads(b64decode(token.encode('ascii'), altchars=b'-_', validate=True))
+            position, backwards = cursor['p'], cursor['b']
+        except (UnicodeEncodeError, Base64Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(backwards)
+
+    def encode_cursor(self, row, backwards):
+        position = [cursor_value(self.row_value(row, field.lstrip('-'))) for field in self.ordering]
+        token = b64encode(json.dumps({'p': position, 'b': backwards}).encode(), altchars=b'-_').decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def typed_position(self, model, position):
+        """
+        The cursor position converted by the ordering's model fields, so a tampered value
+        (a string where the id goes) is an invalid cursor rather than an error in the filter.
+        """
+        typed = []
+        for field, value in zip(self.ordering, position):
+            try:
+                value = model._meta.get_field(field.lstrip('-')).to_python(value)
+            except FieldDoesNotExist:
+                pass  # a related path, compared as is
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+            if value is None or isinstance(value, (list, dict)):
+                raise NotFound(self.invalid_cursor_message)
+            typed.append(value)
+        return typed
+
+    @staticmethod
+    def row_value(row, field):
+        # Model instances, or values() rows
+        return row[field] if isinstance(row, dict) else getattr(row, field)
+
+    def page_queryset(self, queryset, request):
+        """
+        The (unevaluated) query of the requested page, plus one row to tell if there is a page after it.
+        """
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = remove_query_param(request.build_absolute_uri(), self.cursor_query_param)
+        cursor = self.decode_cursor(request)
+        self.position, self.backwards = cursor if cursor else (None, False)
+
+        ordering = self.ordering
+        if self.backwards:
+            ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            self.position = self.typed_position(queryset.model, self.position)
+            queryset = queryset.filter(keyset_filter(self.ordering, self.position, self.backwards))
+        return queryset[:self.page_size + 1]
+
+    def build_page(self, rows):
+        """
+        Page and next/previous links from the rows page_queryset() returned.
+        """
+        more = len(rows) > self.page_size
+        page = list(rows[:self.page_size])
+        if self.backwards:
+            # The query ran in reverse order, flip the page back
+            page.reverse()
+            has_previous, has_next = more, True
+        else:
+            has_previous, has_next = self.position is not None, more
+        self.next = self.encode_cursor(page[-1], False) if has_next and page else None
+        self.previous = self.encode_cursor(page[0], True) if has_previous and page else None
+        return page
+
+    def get_next_link(self):
+        return self.next
+
+    def get_previous_link(self):
+        return self.previous
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.next,
+            'previous': self.previous,
+            'results': data,
+        })
+
+
+def serialized(request, serializer_class, objects, **serializer_kwargs):
+    """
+    `serializer_class(objects, many=True).data`, timed as the request's serialization
+    (the Server-Timing `serialize` metric).
+    """
+    return serializer_data(request, serializer_class(objects, many=True, **serializer_kwargs))
+
+
+def paginated_response(request, queryset, serializer_class, ordering=None, **serializer_kwargs):
+    """
+    Paginate `queryset` with the configured DEFAULT_PAGINATION_CLASS and serialize the page.
+    Function-based views use this instead of the generic views' built-in pagination.
+    `ordering` overrides the paginator ordering (first field is the keyset position).
+    Falls back to the full, unpaginated list when no pagination class/page size is configured.
+    """
+    pagination_class = api_settings.DEFAULT_PAGINATION_CLASS
+    if pagination_class is None:
+        return Response(serialized(request, serializer_class, queryset, **serializer_kwargs), status=status.HTTP_200_OK)
+
+    paginator = pagination_class()
+    if ordering:
+        paginator.ordering = ordering
+    page = paginator.paginate_queryset(queryset, request)
+    if page is None:
+        return Response(serialized(request, serializer_class, queryset, **serializer_kwargs), status=status.HTTP_200_OK)
+
+    return paginator.get_paginated_response(serialized(request, serializer_class, page, **serializer_kwargs))
+
+
+async def apaginated_data(request, queryset, serializer_class, ordering=None, **serializer_kwargs):
+    """
+    Async paginated_response for the async views: the same page and next/previous
+    links, fetched with `async for`, returned as the response body (not a Response).
+    """
+    pagination_class = api_settings.DEFAULT_PAGINATION_CLASS
+    if pagination_class is None:
+        return serialized(request, serializer_class, [obj async for obj in queryset], **serializer_kwargs)
+
+    paginator = pagination_class()
+    if ordering:
+        paginator.ordering = ordering
+    page = await paginator.apaginate_queryset(queryset, request)
+    if page is None:
+        return serialized(request, serializer_class, [obj async for obj in queryset], **serializer_kwargs)
+
+    return paginator.get_paginated_response(serialized(request, serializer_class, page, **serializer_kwargs)).data
@@ -0,0 +1,198 @@
+"""
+Query budgets: the maximum number of SQL queries an API view may run per request.
+
+    @query_budget({'GET': 1, 'POST': 6})
+    @api_view(['GET', 'POST'])
+    def list_employees(request):
+
+A budget is a number, a function of the result size for views whose queries grow with it
+(batched INSERTs), or a dict of either per HTTP method (HEAD uses GET's, unlisted methods
+get 0). Going over it logs a warning, or raises QueryBudgetExceeded when
+QUERY_BUDGET_STRICT is on, as in the test suite. Writes only ever log: by the time
+the budget is checked they have committed, and a 500 would hide that from the client.
+"""
+import logging
+from contextlib import contextmanager
+from functools import wraps
+from inspect import iscoroutinefunction
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from companyManagement.timing import record_queries
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a streaming body in counted_stream()/acounted_stream()
+STOP = object()
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    """
+    execute_wrapper keeping the SQL of every query it sees.
+    """
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.statements.append(sql)
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def counting_queries(counter=None):
+    counter = counter or QueryCounter()
+    with record_queries(counter):
+        yield counter
+
+
+def result_size(response):
+    data = getattr(response, 'data', None)
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        return len(data['results'])
+    if isinstance(data, dict) and isinstance(data.get('created'), int):
+        return data['created']  # bulk write summaries
+    if isinstance(data, list):
+        return len(data)
+    return 1 if data else 0
+
+
+def method_budget(budget, method):
+    if not isinstance(budget, dict):
+        return budget
+    if method == 'HEAD' and 'HEAD' not in budget:
+        method = 'GET'
+    return budget.get(method, 0)
+
+
+def check_budget(view_name, budget, statements, size, method='GET'):
+    """
+    `size` is the result size, or a function returning it (only called for a budget depending on it).
+    """
+    if callable(budget):
+        size = size() if callable(size) else size
+        limit = budget(size)
+    else:
+        limit = budget
+    if len(statements) <= limit:
+        return
+    message = f"{view_name} ran {len(statements)} queries, over its budget of {limit}"
+    if callable(budget):
+        message += f" (result size {size})"
+    if getattr(settings, 'QUERY_BUDGET_STRICT', False) and method in SAFE_METHODS:
+        raise QueryBudgetExceeded(message + ':\n' + '\n'.join(statements))
+    logger.warning(message)
+
+
+def counted_stream(content, view_name, budget, counter):
+    """
+    A streaming body runs its queries while it is consumed, after the view returned.
+    Count them around each next() (never across a yield, where the consumer may enter
+    wrappers of its own) and check the budget once the body is exhausted.
+    """
+    content = iter(content)
+    size = 0
+    while True:
+        with counting_queries(counter):
+            chunk = next(content, STOP)
+        if chunk is STOP:
+            break
+        size += 1
+        yield chunk
+    check_budget(view_name, budget, counter.statements, size)
+
+
+async def acounted_stream(content, view_name, budget, counter):
+    """
+    counted_stream() for an async body, whose queries run in the request's worker thread.
+    """
+    content = aiter(content)
+    size = 0
+    while True:
+        queries = await sync_to_async(record_queries)(counter)
+        try:
+            chunk = await anext(content, STOP)
+        finally:
+            await sync_to_async(queries.close)()
+        if chunk is STOP:
+            break
+        size += 1
+        yield chunk
+    check_budget(view_name, budget, counter.statements, size)
+
+
+def query_budget(budget):
+    """
+    Decorator declaring the query budget of an API view, applied above @api_view
+    (or @async_api_view).
+    """
+    def decorator(view):
+        # @api_view/@async_api_view return a function named "view", its APIView class has the real name
+        view_name = f'{view.__module__}.{getattr(view, "cls", view).__name__}'
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def budgeted(request, *args, **kwargs):
+                # The async ORM runs its queries in the request's sync_to_async thread
+                counter = QueryCounter()
+                queries = await sync_to_async(record_queries)(counter)
+                try:
+                    response = await view(request, *args, **kwargs)
+                finally:
+                    await sync_to_async(queries.close)()
+                check_budget(view_name, method_budget(budget, request.method), counter.statements,
+                             lambda: result_size(response), request.method)
+                return response
+        else:
+            @wraps(view)
+            def budgeted(request, *args, **kwargs):
+                with counting_queries() as counter:
+                    response = view(request, *args, **kwargs)
+                limit = method_budget(budget, request.method)
+                if response.streaming:
+                    stream = acounted_stream if response.is_async else counted_stream
+                    response.streaming_content = stream(response.streaming_content, view_name, limit, counter)
+                else:
+                    check_budget(view_name, limit, counter.statements, lambda: result_size(response), request.method)
+                return response
+
+        budgeted.query_budget = budget
+        return budgeted
+    return decorator
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase helpers around query budgets.
+    """
+    def assertQueryBudgetsDeclared(self, *modules):
+        """
+        Every API view (sync or async) defined in `modules` declares a query budget.
+        """
+        missing = [
+            f'{module.__name__}.{name}' for module in modules for name, view in vars(module).items()
+            if (getattr(view, 'cls', None) is not None or iscoroutinefunction(view))
+            and view.__module__ == module.__name__ and not hasattr(view, 'query_budget')
+        ]
+        self.assertEqual(missing, [], 'API views without a @query_budget')
+
+    def assertQueriesConstant(self, request, grow, using='default'):
+        """
+        request() runs as many queries after grow() added rows as before: no per-row query.
+        Returns the second response.
+        """
+        with CaptureQueriesContext(connections[using]) as baseline:
+            request()
+        grow()
+        with CaptureQueriesContext(connections[using]) as grown:
+            response = request()
+        self.assertEqual(
+            len(grown), len(baseline),
+            'Query count grew with the data:\n' + '\n'.join(query['sql'] for query in grown.captured_queries),
+        )
+        return response
@@ -46,6 +46,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "companyManagement.timing.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -85,6 +86,53 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+# Backend of the versioned response caches (companyManagement.cache): company/department details, review dashboard.
+# Company/department ETags come from its version tokens, so they are only sent when this is a backend
+# shared by all workers (Redis, Memcached, database): with the locmem default each worker would keep
+# its own token and could answer 304 for a company another worker changed. Employee/review ETags
+# come from database columns and are always sent.
+API_CACHE_ALIAS = "default"
+API_CACHE_TIMEOUT = 600
+
+# Serve the employee/review list endpoints from values() rows through the ValuesSerializer
+# classes instead of ModelSerializers (same JSON, companyManagement.values_serializers)
+FAST_LIST_SERIALIZERS = False
+
+# Lifetime of the cached review dashboard aggregate (reviews.dashboard), in seconds
+REVIEW_DASHBOARD_CACHE_TIMEOUT = 30
+
+# Read company/department counts from the denormalized *_total columns (company.counters)
+# instead of COUNT subqueries. While on, the columns follow every save()/delete(), but not
+# writes that skip them (queryset.update(), raw SQL); while off they are not written at all.
+# Run `python manage.py recount_company_counters` right after switching this on, and after
+# such writes (`check --database default` warns with company.W002 when they have drifted).
+COMPANY_STORED_COUNTERS = False
+
+# Send the per-request query/serializer/view timings (companyManagement.timing) as a
+# Server-Timing header. They are also logged, one JSON line per request, on the
+# "companyManagement.timing" logger at INFO (no handler is configured here).
+SERVER_TIMING_HEADER = True
+
+# Metrics served at /api/metrics/ (companyManagement.metrics). With several worker processes,
+# point METRICS_DIR at a directory shared by them (emptied when the server starts): each
+# worker writes its totals there at most every METRICS_FLUSH_INTERVAL seconds and a scrape
+# sums them. None keeps the metrics per process.
+METRICS_DIR = None
+METRICS_FLUSH_INTERVAL = 1.0
+
+# API views over their @query_budget (companyManagement.query_budget) raise QueryBudgetExceeded
+# instead of logging a warning. On while developing, and so in the test suite.
+QUERY_BUDGET_STRICT = DEBUG
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -126,10 +174,16 @@ STATIC_URL = "static/"
 
 #Rest Framework
 REST_FRAMEWORK = {
+    # Stateless: the user is built from the token claims (accounts.api.authentication.RoleTokenUser),
+    # no UserAccount query per request. Use JWTAuthentication instead to load the user row every time.
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'rest_framework_simplejwt.authentication.JWTStatelessUserAuthentication',
     ),
-    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated']
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
+    # Keyset pagination for every list endpoint, clients may ask for ?page_size= up to MAX_PAGE_SIZE
+    'DEFAULT_PAGINATION_CLASS': 'companyManagement.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+    'MAX_PAGE_SIZE': 500,
 }
 
 #Simple-JWT Settings
@@ -138,7 +192,8 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
-    "TOKEN_OBTAIN_SERIALIZER": "accounts.api.serializers.CustomTokenObtainPairSerializer"
+    "TOKEN_OBTAIN_SERIALIZER": "accounts.api.serializers.CustomTokenObtainPairSerializer",
+    "TOKEN_USER_CLASS": "accounts.api.authentication.RoleTokenUser",
 }
 
 # Default primary key field type
@@ -0,0 +1,144 @@
+"""
+Per-request performance instrumentation.
+
+ServerTimingMiddleware measures every request: the number of SQL queries and the time
+spent in them (an execute_wrapper entered on the request's connections for its duration),
+the time spent serializing response bodies (serializer_data(), used by the views and
+the list helpers paginated_response/apaginated_data), and the total time of the view (including rendering and the
+middleware below it). It sends them as a `Server-Timing` header, which browser dev
+tools show next to the request, and logs one JSON line per request on the
+`companyManagement.timing` logger, tagged with the resolved URL name. The same numbers
+feed the latency/query histograms of companyManagement.metrics.
+
+Serializer time includes the SQL it triggers (a lazily evaluated queryset, an N+1),
+so those queries show up in both `db` and `serialize`. The body of a streaming
+response runs after the middleware returned and is not measured.
+"""
+import json
+import logging
+from asyncio import iscoroutinefunction
+from contextlib import ExitStack, contextmanager
+from time import perf_counter
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils.decorators import sync_and_async_middleware
+from companyManagement.metrics import record_request
+
+logger = logging.getLogger(__name__)
+
+# Attribute of the HttpRequest holding its RequestMetrics (DRF's Request proxies to it)
+METRICS_ATTR = 'server_timing'
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db', 'serialize')
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """
+        execute_wrapper counting the request's queries and their time.
+        """
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db += perf_counter() - start
+
+
+def record_queries(wrapper):
+    """
+    Enter `wrapper` as execute_wrapper of this thread's connections, closing the
+    returned ExitStack leaves them.
+    """
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(wrapper))
+    return stack
+
+
+@contextmanager
+def serialization_timer(request):
+    """
+    Count the time of the block as serialization of `request` (a no-op outside the middleware).
+    """
+    metrics = getattr(request, METRICS_ATTR, None)
+    if metrics is None:
+        yield
+        return
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serialize += perf_counter() - start
+
+
+def serializer_data(request, serializer):
+    """
+    `serializer.data`, timed as serialization of `request`.
+    """
+    with serialization_timer(request):
+        return serializer.data
+
+
+def server_timing(metrics, total):
+    return (
+        f'db;dur={metrics.db * 1000:.2f};desc="{metrics.queries} queries", '
+        f'serialize;dur={metrics.serialize * 1000:.2f}, '
+        f'view;dur={total * 1000:.2f}'
+    )
+
+
+def finish(request, response, metrics, total):
+    if getattr(settings, 'SERVER_TIMING_HEADER', True):
+        response['Server-Timing'] = server_timing(metrics, total)
+    match = request.resolver_match
+    url_name = match.view_name if match else None
+    record_request(url_name, request.method, response.status_code, total, metrics.queries)
+    logger.info(json.dumps({
+        'url_name': url_name,
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'queries': metrics.queries,
+        'db_ms': round(metrics.db * 1000, 2),
+        'serialize_ms': round(metrics.serialize * 1000, 2),
+        'view_ms': round(total * 1000, 2),
+    }))
+    return response
+
+
+@sync_and_async_middleware
+def ServerTimingMiddleware(get_response):
+    """
+    Outermost middleware, so `view` covers everything below it.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            metrics = RequestMetrics()
+            setattr(request, METRICS_ATTR, metrics)
+            start = perf_counter()
+            # Connections are thread-local: enter the wrapper in the thread the request's
+            # sync_to_async calls (async ORM included) run in, Django gives every ASGI
+            # request its own (ThreadSensitiveContext)
+            queries = await sync_to_async(record_queries)(metrics)
+            try:
+                response = await get_response(request)
+            finally:
+                await sync_to_async(queries.close)()
+            return finish(request, response, metrics, perf_counter() - start)
+    else:
+        def middleware(request):
+            metrics = RequestMetrics()
+            setattr(request, METRICS_ATTR, metrics)
+            start = perf_counter()
+            with record_queries(metrics):
+                response = get_response(request)
+            return finish(request, response, metrics, perf_counter() - start)
+
+    return middleware
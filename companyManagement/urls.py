@@ -16,10 +16,12 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path,include
+from companyManagement.views import metrics
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/accounts/", include('accounts.api.urls')),
     path("api/company/", include('company.api.urls')),
     path("api/reviews/", include('reviews.api.urls')),
+    path("api/metrics/", metrics, name="metrics"),
 ]
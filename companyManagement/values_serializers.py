@@ -0,0 +1,105 @@
+"""
+Read-only serializers over `values()` rows, for the hot list endpoints.
+
+A ModelSerializer builds a model instance per row and runs every value through
+its bound Field objects. A ValuesSerializer takes the dicts of a values()
+projection and turns them into the same JSON with getters compiled once per
+serializer: plain columns are `itemgetter`s, dates/datetimes go through
+formatters that resolve DRF's output format and timezone once (and defer to
+DRF's own fields for anything but ISO 8601), computed keys are `get_<key>(row)`
+methods.
+
+Switched on by the FAST_LIST_SERIALIZERS setting.
+"""
+from datetime import timezone as dt_timezone
+from operator import itemgetter
+from django.conf import settings
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+
+def date_formatter():
+    """
+    DateField().to_representation (ISO dates are a plain isoformat()).
+    """
+    field = serializers.DateField()
+    if (api_settings.DATE_FORMAT or '').lower() != ISO_8601:
+        return field.to_representation
+    return lambda value: value.isoformat() if value else None
+
+
+def datetime_formatter():
+    """
+    DateTimeField().to_representation with the format and timezone looked up once
+    instead of per value (the lookup is most of DRF's per-value cost).
+    """
+    field = serializers.DateTimeField()
+    timezone = field.default_timezone()
+    if (api_settings.DATETIME_FORMAT or '').lower() != ISO_8601 or timezone is None:
+        return field.to_representation
+    # Values come back from the database in UTC, no conversion needed for a UTC current timezone
+    utc_timezone = str(timezone) == 'UTC'
+
+    def to_iso(value):
+        if not value:
+            return None
+        if value.tzinfo is None:
+            return field.to_representation(value)
+        if not (utc_timezone and value.tzinfo is dt_timezone.utc):
+            value = value.astimezone(timezone)
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return to_iso
+
+
+def fast_serializers_enabled():
+    return getattr(settings, 'FAST_LIST_SERIALIZERS', False)
+
+
+class ValuesSerializer:
+    """
+    Subclasses list `fields` in output order, as (key, lookup) or (key, lookup, formatter):
+    `lookup` is the values() lookup the key is read from (None for a computed key,
+    served by a `get_<key>(row)` method) and `formatter` is called once per serializer
+    to build the function converting the raw value.
+    Used like a DRF serializer: `Serializer(rows, many=True).data`.
+    """
+    fields = ()
+
+    def __init__(self, instance=None, many=False, context=None):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+        self._getters = [(field[0], self._compile(*field)) for field in self.fields]
+
+    @classmethod
+    def lookups(cls):
+        return [field[1] for field in cls.fields if field[1] is not None]
+
+    @classmethod
+    def keys(cls):
+        return [field[0] for field in cls.fields]
+
+    @classmethod
+    def project(cls, queryset):
+        """
+        The values() projection to feed this serializer (ordering/filters are kept).
+        """
+        return queryset.values(*cls.lookups())
+
+    def _compile(self, key, lookup, formatter=None):
+        if lookup is None:
+            return getattr(self, f'get_{key}')
+        if formatter is None:
+            return itemgetter(lookup)
+        convert = formatter()
+        return lambda row: convert(row[lookup])
+
+    def to_representation(self, row):
+        return {key: get(row) for key, get in self._getters}
+
+    @property
+    def data(self):
+        if self.many:
+            return [self.to_representation(row) for row in self.instance]
+        return self.to_representation(self.instance)
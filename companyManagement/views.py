@@ -0,0 +1,16 @@
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from accounts.api.permissions import IsAdmin
+from companyManagement.metrics import registry, render
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def metrics(request):
+    """
+    Request, cache and review metrics of the whole server in the Prometheus text format.
+    Scrapers authenticate with an admin access token (`Authorization: Bearer ...`).
+    """
+    return HttpResponse(render(registry.collect()), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,40 @@
+from accounts.api.permissions import IsAdmin, IsHR, IsManager
+from companyManagement.async_api import async_api_view
+from companyManagement.fieldsets import requested_fields, sparse_queryset
+from companyManagement.pagination import apaginated_data
+from companyManagement.query_budget import query_budget
+from companyManagement.timing import serializer_data
+from rest_framework import status
+from rest_framework.response import Response
+from reviews.models import PerformanceReview
+from .serializers import PerformanceReviewReadSerializer
+from .views import REVIEW_ORDERING, filter_reviews, review_list_source
+
+
+#ASYNC READ ENDPOINTS
+#Same payloads as list_reviews/review_by_id, served without a thread per request under ASGI
+@query_budget(1)
+@async_api_view([IsAdmin | IsHR | IsManager])
+async def alist_reviews(request):
+    fields = requested_fields(request, PerformanceReviewReadSerializer)
+    reviews, serializer_class = review_list_source(
+        filter_reviews(request, PerformanceReview.objects.with_user_emails()), fields
+    )
+    data = await apaginated_data(request, reviews, serializer_class, ordering=REVIEW_ORDERING,
+                                 context={"fields": fields})
+    return Response(data)
+
+
+@query_budget(1)
+@async_api_view([IsAdmin | IsHR | IsManager])
+async def areview_by_id(request, pk: int):
+    fields = requested_fields(request, PerformanceReviewReadSerializer)
+    reviews = PerformanceReview.objects.with_user_emails()
+    if fields is not None:
+        reviews = sparse_queryset(reviews, PerformanceReviewReadSerializer, fields)
+    try:
+        review = await reviews.aget(pk=pk)
+    except PerformanceReview.DoesNotExist:
+        return Response({"detail": "No PerformanceReview matches the given query."},
+                             status=status.HTTP_404_NOT_FOUND)
+    return Response(serializer_data(request, PerformanceReviewReadSerializer(review, context={"fields": fields})))
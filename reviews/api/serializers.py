@@ -1,11 +1,24 @@
 from rest_framework import serializers
+from companyManagement.fieldsets import SparseFieldsMixin
+from companyManagement.values_serializers import ValuesSerializer, datetime_formatter
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from company.models import Employee
 from reviews.models import PerformanceReview
+from reviews.signals import invalidate_dashboard
 
 User = get_user_model()
 
 
-class PerformanceReviewReadSerializer(serializers.ModelSerializer):
+def assign_batch_size():
+    """
+    Reviews per INSERT statement of a bulk assignment.
+    """
+    return getattr(settings, "REVIEW_ASSIGN_BATCH_SIZE", 500)
+
+
+class PerformanceReviewReadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     # Convenience read-only fields
     employee_email = serializers.ReadOnlyField(source="employee.email")
     assigner_email = serializers.ReadOnlyField(source="assigner.email")
@@ -27,6 +40,35 @@ class PerformanceReviewReadSerializer(serializers.ModelSerializer):
         read_only_fields = fields  # fully read-only serializer for responses
 
 
+class PerformanceReviewValuesSerializer(ValuesSerializer):
+    """
+    PerformanceReviewReadSerializer output built from values() rows (list fast path).
+    """
+    fields = (
+        ("id", "id"),
+        ("employee", "employee_id"),
+        ("employee_email", "employee__email"),
+        ("assigner", "assigner_id"),
+        ("assigner_email", "assigner__email"),
+        ("approved_by", "approved_by_id"),
+        ("approved_by_email", "approved_by__email"),
+        ("scheduled_at", "scheduled_at", datetime_formatter),
+        ("feedback", "feedback"),
+        ("status", "status"),
+        ("created_at", "created_at", datetime_formatter),
+        ("updated_at", "updated_at", datetime_formatter),
+    )
+
+    def to_representation(self, row):
+        data = super().to_representation(row)
+        # ReadOnlyField(source="assigner.email") is skipped, not null, when there is no assigner
+        if row["assigner_id"] is None:
+            del data["assigner_email"]
+        if row["approved_by_id"] is None:
+            del data["approved_by_email"]
+        return data
+
+
 class AssignReviewSerializer(serializers.ModelSerializer):
     """
     Used by HR to create a new review.
@@ -44,19 +86,79 @@ class AssignReviewSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         # server owns assigner; never trust client for this
         request = self.context["request"]
-        validated_data["assigner"] = request.user
+        validated_data["assigner_id"] = request.user.id
         # status stays default = PENDING
         return PerformanceReview.objects.create(**validated_data)
 
 
+class BulkAssignReviewSerializer(serializers.Serializer):
+    """
+    Used by HR to open a review cycle: assign a PENDING review to many users at once.
+    Target either explicit user ids (`employees`) or a filter (`role`, `company`).
+    `company` matches users whose email belongs to an Employee of that company
+    (accounts and company employees are only linked by email).
+    Users that already have an open review are skipped.
+    """
+    employees = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    role = serializers.ChoiceField(choices=User.Roles.choices, required=False)
+    company = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        has_ids = "employees" in attrs
+        has_filter = "role" in attrs or "company" in attrs
+        if has_ids == has_filter:
+            raise serializers.ValidationError("Provide either `employees` or a `role`/`company` filter.")
+        if attrs.get("role", User.Roles.EMPLOYEE) != User.Roles.EMPLOYEE:
+            raise serializers.ValidationError({"role": "Only users with role EMPLOYEE can be reviewed."})
+        return attrs
+
+    def create(self, validated_data):
+        summary = {"created": 0, "skipped_open_review": [], "invalid_role": [], "not_found": []}
+
+        # Roles of every targeted user in one query
+        if "employees" in validated_data:
+            requested = list(dict.fromkeys(validated_data["employees"]))
+            roles = dict(User.objects.filter(id__in=requested).values_list("id", "role"))
+            summary["not_found"] = [pk for pk in requested if pk not in roles]
+            summary["invalid_role"] = [pk for pk in requested if pk in roles and roles[pk] != User.Roles.EMPLOYEE]
+            candidates = [pk for pk in requested if roles.get(pk) == User.Roles.EMPLOYEE]
+        else:
+            users = User.objects.filter(role=User.Roles.EMPLOYEE)
+            if "company" in validated_data:
+                users = users.filter(email__in=Employee.objects.filter(company_id=validated_data["company"]).values("email"))
+            candidates = list(users.order_by("id").values_list("id", flat=True))
+
+        open_reviews = set(
+            PerformanceReview.objects
+            .filter(employee_id__in=candidates)
+            .exclude(status__in=PerformanceReview.CLOSED_STATUSES)
+            .values_list("employee_id", flat=True)
+        )
+        summary["skipped_open_review"] = [pk for pk in candidates if pk in open_reviews]
+
+        # server owns assigner; never trust client for this
+        assigner_id = self.context["request"].user.id
+        reviews = [
+            PerformanceReview(employee_id=pk, assigner_id=assigner_id)
+            for pk in candidates if pk not in open_reviews
+        ]
+        with transaction.atomic():
+            PerformanceReview.objects.bulk_create(reviews, batch_size=assign_batch_size())
+        if reviews:
+            invalidate_dashboard()  # bulk_create sends no post_save
+        summary["created"] = len(reviews)
+        return summary
+
+
+class ReviewIdsSerializer(serializers.Serializer):
+    """
+    Body of the batch transition endpoints.
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=10000)
+
+
 class FeedbackSerializer(serializers.Serializer):
     """
     Used by HR to submit/update feedback text.
     """
     feedback = serializers.CharField(allow_blank=False, trim_whitespace=True)
-
-    def update(self, instance, validated_data):
-        instance.feedback = validated_data["feedback"]
-        instance.status = PerformanceReview.Status.FEEDBACK_PROVIDED
-        instance.save(update_fields=["feedback", "status", "updated_at"])
-        return instance
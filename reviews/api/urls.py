@@ -3,24 +3,43 @@ from .views import (
     list_reviews,
     review_by_id,
     assign_review,
+    bulk_assign_reviews,
     confirm_review,
     provide_feedback,
     push_for_approval,
     approve_review,
     reject_review,
-    emp_reviews
+    emp_reviews,
+    dashboard,
+    bulk_confirm_reviews,
+    bulk_push_for_approval,
+    bulk_approve_reviews,
+    bulk_reject_reviews
 )
+from .async_views import alist_reviews, areview_by_id
 
 urlpatterns = [
     path("", list_reviews, name="review-list"),              
     path("<int:pk>/", review_by_id, name="review-detail"),  
     path("emp-reviews/", emp_reviews, name="emp-reviews"), 
+    path("dashboard/", dashboard, name="review-dashboard"),
+
+    # Async-native read variants (ASGI)
+    path("async/", alist_reviews, name="review-list-async"),
+    path("async/<int:pk>/", areview_by_id, name="review-detail-async"),
 
     # Workflow/action endpoints
     path("assign/", assign_review, name="review-assign"),                
+    path("assign/bulk/", bulk_assign_reviews, name="review-assign-bulk"),
     path("<int:pk>/confirm/", confirm_review, name="review-confirm"),      
     path("<int:pk>/feedback/", provide_feedback, name="review-feedback"),  
     path("<int:pk>/push/", push_for_approval, name="review-push"),         
     path("<int:pk>/approve/", approve_review, name="review-approve"),      
     path("<int:pk>/reject/", reject_review, name="review-reject"),         
+
+    # Batch workflow endpoints, body: {"ids": [...]}
+    path("bulk/confirm/", bulk_confirm_reviews, name="review-bulk-confirm"),
+    path("bulk/push/", bulk_push_for_approval, name="review-bulk-push"),
+    path("bulk/approve/", bulk_approve_reviews, name="review-bulk-approve"),
+    path("bulk/reject/", bulk_reject_reviews, name="review-bulk-reject"),
 ]
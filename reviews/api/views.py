@@ -1,14 +1,27 @@
+from math import ceil
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
 from reviews.models import PerformanceReview
+from companyManagement.conditional import make_etag, not_modified
+from companyManagement.fieldsets import requested_fields, sparse_queryset
+from companyManagement.pagination import paginated_response
+from companyManagement.query_budget import query_budget
+from companyManagement.timing import serializer_data
+from companyManagement.values_serializers import fast_serializers_enabled
 from .serializers import (
     AssignReviewSerializer,
+    BulkAssignReviewSerializer,
+    assign_batch_size,
     FeedbackSerializer,
     PerformanceReviewReadSerializer,
+    PerformanceReviewValuesSerializer,
+    ReviewIdsSerializer,
 )
+from reviews.dashboard import review_dashboard
+from reviews.transitions import TRANSITIONS, bulk_transition, transition
 from accounts.api.permissions import (
     IsAdmin,
     IsHR,
@@ -18,12 +31,10 @@ from accounts.api.permissions import (
 
 User = get_user_model()
 
-@api_view(["GET"])
-@permission_classes([IsAdmin | IsHR | IsManager])
-def list_reviews(request):
-    reviews = PerformanceReview.objects.all()
-
-    # Optional filters
+def filter_reviews(request, reviews):
+    """
+    Optional ?employee= and ?status= filters of the review list endpoints.
+    """
     employee_id = request.query_params.get("employee")
     if employee_id:
         reviews = reviews.filter(employee_id=employee_id)
@@ -32,110 +43,213 @@ def list_reviews(request):
     if status_filter:
         reviews = reviews.filter(status=status_filter)
 
-    serializer = PerformanceReviewReadSerializer(reviews, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return reviews
 
+REVIEW_ORDERING = ('-created_at', '-id')
+
+def review_list_source(reviews, fields=None):
+    """
+    Queryset and serializer of a review list page: only the requested columns for
+    ?fields=, values() rows and the values serializer when FAST_LIST_SERIALIZERS is on,
+    model instances otherwise.
+    """
+    if fields is not None:
+        reviews = sparse_queryset(reviews, PerformanceReviewReadSerializer, fields, REVIEW_ORDERING)
+        return reviews, PerformanceReviewReadSerializer
+    if fast_serializers_enabled():
+        return PerformanceReviewValuesSerializer.project(reviews), PerformanceReviewValuesSerializer
+    return reviews, PerformanceReviewReadSerializer
+
+@query_budget(1)
+@api_view(["GET"])
+@permission_classes([IsAdmin | IsHR | IsManager])
+def list_reviews(request):
+    fields = requested_fields(request, PerformanceReviewReadSerializer)
+    reviews, serializer_class = review_list_source(
+        filter_reviews(request, PerformanceReview.objects.with_user_emails()), fields
+    )
+    return paginated_response(request, reviews, serializer_class, ordering=REVIEW_ORDERING,
+                              context={"fields": fields})
+
+def review_etag(pk, updated_at, fields=None):
+    # updated_at moves on every save and every transition UPDATE
+    return make_etag("review", pk, updated_at.timestamp(), *(fields or ()))
+
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([IsAdmin | IsHR | IsManager])
 def review_by_id(request, pk: int):
-    review = get_object_or_404(PerformanceReview, pk=pk)
-    serializer = PerformanceReviewReadSerializer(review)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    fields = requested_fields(request, PerformanceReviewReadSerializer)
+    if request.headers.get("If-None-Match"):
+        # Revalidation: compare against updated_at alone, before joining/serializing
+        updated_at = PerformanceReview.objects.filter(pk=pk).values_list("updated_at", flat=True).first()
+        if updated_at is not None:
+            response = not_modified(request, review_etag(pk, updated_at, fields))
+            if response:
+                return response
+
+    reviews = PerformanceReview.objects.with_user_emails()
+    if fields is not None:
+        # The ETag reads updated_at
+        reviews = sparse_queryset(reviews, PerformanceReviewReadSerializer, fields, ("updated_at",))
+    review = get_object_or_404(reviews, pk=pk)
+    serializer = PerformanceReviewReadSerializer(review, context={"fields": fields})
+    return Response(serializer_data(request, serializer), status=status.HTTP_200_OK,
+                    headers={"ETag": review_etag(review.pk, review.updated_at, fields)})
+
+@query_budget(2)
+@api_view(["GET"])
+@permission_classes([IsAdmin | IsHR | IsManager])
+def dashboard(request):
+    """
+    Review counts per status, assigner and week, from one cached GROUP BY.
+    """
+    return Response(review_dashboard(), status=status.HTTP_200_OK)
 
+@query_budget(1)
 @api_view(["GET"])
 @permission_classes([IsEmployee])
 def emp_reviews(request):
-    reviews = PerformanceReview.objects.filter(employee=request.user)
-    serializer = PerformanceReviewReadSerializer(reviews, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    fields = requested_fields(request, PerformanceReviewReadSerializer)
+    reviews, serializer_class = review_list_source(
+        PerformanceReview.objects.with_user_emails().filter(employee_id=request.user.id), fields
+    )
+    return paginated_response(request, reviews, serializer_class, ordering=REVIEW_ORDERING,
+                              context={"fields": fields})
 
 
 
 
 #INTERACTION ENDPOPINTS
 #More thought out permissions
+@query_budget(3)
 @api_view(["POST"])
 @permission_classes([IsHR])
 def assign_review(request):
     serializer = AssignReviewSerializer(data=request.data, context={"request": request})
     serializer.is_valid(raise_exception=True)
     review = serializer.save()
-    return Response(PerformanceReviewReadSerializer(review).data, status=status.HTTP_201_CREATED)
+    return Response(serializer_data(request, PerformanceReviewReadSerializer(review)), status=status.HTTP_201_CREATED)
+
+
+def assign_query_budget(created):
+    """
+    Target and open review lookups, the transaction and an INSERT per batch.
+    """
+    return 4 + ceil(created / assign_batch_size())
+
 
+@query_budget(assign_query_budget)
+@api_view(["POST"])
+@permission_classes([IsHR])
+def bulk_assign_reviews(request):
+    serializer = BulkAssignReviewSerializer(data=request.data, context={"request": request})
+    serializer.is_valid(raise_exception=True)
+    summary = serializer.save()
+    return Response(summary, status=status.HTTP_201_CREATED)
+
+
+def transition_response(request, pk, name, **values):
+    """
+    Run transition `name` on review `pk` as one conditional UPDATE, then return the
+    updated review. Nothing is read before the write, so two concurrent requests
+    can't both pass the status check; the loser gets the 400.
+    """
+    if not transition(pk, name, **values):
+        # Missing review → 404, otherwise it was in the wrong state
+        get_object_or_404(PerformanceReview.objects.only("id"), pk=pk)
+        return Response({"detail": TRANSITIONS[name].error},
+                        status=status.HTTP_400_BAD_REQUEST)
 
+    review = get_object_or_404(PerformanceReview.objects.with_user_emails(), pk=pk)
+    return Response(serializer_data(request, PerformanceReviewReadSerializer(review)), status=status.HTTP_200_OK)
+
+
+@query_budget(2)
 @api_view(["PATCH"])
 @permission_classes([IsEmployee])
 def confirm_review(request, pk: int):
-    review = get_object_or_404(PerformanceReview, pk=pk)
-
     # Only PENDING → SCHEDULED
-    if review.status != PerformanceReview.Status.PENDING:
-        return Response({"detail": "Only PENDING reviews can be confirmed."},
-                        status=status.HTTP_400_BAD_REQUEST)
-
-    review.status = PerformanceReview.Status.SCHEDULED
-    review.save(update_fields=["status", "updated_at"])
-    return Response(PerformanceReviewReadSerializer(review).data, status=status.HTTP_200_OK)
+    return transition_response(request, pk, "confirm")
 
 
+@query_budget(2)
 @api_view(["PATCH"])
 @permission_classes([IsHR])
 def provide_feedback(request, pk: int):
-    review = get_object_or_404(PerformanceReview, pk=pk)
+    serializer = FeedbackSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
 
     # Only SCHEDULED or REJECTED → FEEDBACK_PROVIDED
-    if review.status not in [PerformanceReview.Status.SCHEDULED, PerformanceReview.Status.REJECTED]:
-        return Response({"detail": "Feedback allowed only when status is SCHEDULED or REJECTED."},
-                        status=status.HTTP_400_BAD_REQUEST)
-
-    serializer = FeedbackSerializer(instance=review, data=request.data)
-    serializer.is_valid(raise_exception=True)
-    review = serializer.save()
-    return Response(PerformanceReviewReadSerializer(review).data, status=status.HTTP_200_OK)
+    return transition_response(request, pk, "feedback", feedback=serializer.validated_data["feedback"])
 
 
+@query_budget(2)
 @api_view(["PATCH"])
 @permission_classes([IsHR])
 def push_for_approval(request, pk: int):
-    review = get_object_or_404(PerformanceReview, pk=pk)
-
     # Only FEEDBACK_PROVIDED → UNDER_APPROVAL
-    if review.status != PerformanceReview.Status.FEEDBACK_PROVIDED:
-        return Response({"detail": "Only FEEDBACK_PROVIDED reviews can be pushed for approval."},
-                        status=status.HTTP_400_BAD_REQUEST)
-
-    review.status = PerformanceReview.Status.UNDER_APPROVAL
-    review.save(update_fields=["status", "updated_at"])
-    return Response(PerformanceReviewReadSerializer(review).data, status=status.HTTP_200_OK)
+    return transition_response(request, pk, "push")
 
 
+@query_budget(2)
 @api_view(["PATCH"])
 @permission_classes([IsManager])
 def approve_review(request, pk: int):
-    review = get_object_or_404(PerformanceReview, pk=pk)
-
     # Only UNDER_APPROVAL → APPROVED
-    if review.status != PerformanceReview.Status.UNDER_APPROVAL:
-        return Response({"detail": "Only UNDER_APPROVAL reviews can be approved."},
-                        status=status.HTTP_400_BAD_REQUEST)
-
-    review.status = PerformanceReview.Status.APPROVED
-    review.approved_by = request.user  # server owns approver
-    review.save(update_fields=["status", "approved_by", "updated_at"])
-    return Response(PerformanceReviewReadSerializer(review).data, status=status.HTTP_200_OK)
+    return transition_response(request, pk, "approve", approved_by_id=request.user.id)  # server owns approver
 
 
+@query_budget(2)
 @api_view(["PATCH"])
 @permission_classes([IsManager])
 def reject_review(request, pk: int):
-    review = get_object_or_404(PerformanceReview, pk=pk)
-
     # Only UNDER_APPROVAL → REJECTED
-    if review.status != PerformanceReview.Status.UNDER_APPROVAL:
-        return Response({"detail": "Only UNDER_APPROVAL reviews can be rejected."},
-                        status=status.HTTP_400_BAD_REQUEST)
+    return transition_response(request, pk, "reject")
+
+
+#BATCH TRANSITIONS
+#One conditional UPDATE per call, reviews in the wrong state are reported, not touched
+#(no batch feedback: its text is written per review)
+@query_budget(3)
+@api_view(["PATCH"])
+@permission_classes([IsEmployee])
+def bulk_confirm_reviews(request):
+    serializer = ReviewIdsSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    summary = bulk_transition(serializer.validated_data["ids"], "confirm")
+    return Response(summary, status=status.HTTP_200_OK)
+
 
-    review.status = PerformanceReview.Status.REJECTED
-    # (optionally clear approved_by if previously set; not needed here)
-    review.save(update_fields=["status", "updated_at"])
-    return Response(PerformanceReviewReadSerializer(review).data, status=status.HTTP_200_OK)
+@query_budget(3)
+@api_view(["PATCH"])
+@permission_classes([IsHR])
+def bulk_push_for_approval(request):
+    serializer = ReviewIdsSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    summary = bulk_transition(serializer.validated_data["ids"], "push")
+    return Response(summary, status=status.HTTP_200_OK)
+
+
+@query_budget(3)
+@api_view(["PATCH"])
+@permission_classes([IsManager])
+def bulk_approve_reviews(request):
+    serializer = ReviewIdsSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    summary = bulk_transition(
+        serializer.validated_data["ids"],
+        "approve",
+        approved_by_id=request.user.id,  # server owns approver
+    )
+    return Response(summary, status=status.HTTP_200_OK)
+
+
+@query_budget(3)
+@api_view(["PATCH"])
+@permission_classes([IsManager])
+def bulk_reject_reviews(request):
+    serializer = ReviewIdsSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    summary = bulk_transition(serializer.validated_data["ids"], "reject")
+    return Response(summary, status=status.HTTP_200_OK)
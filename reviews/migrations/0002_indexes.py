@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='performancereview',
+            index=models.Index(fields=['employee', 'status'], name='review_employee_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='performancereview',
+            index=models.Index(fields=['status', 'created_at'], name='review_status_created_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-17 23:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='performancereview',
+            index=models.Index(fields=['status', 'assigner', 'created_at'], name='review_status_assigner_idx'),
+        ),
+    ]
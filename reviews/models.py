@@ -1,6 +1,20 @@
 from django.db import models
 from django.conf import settings
 
+class PerformanceReviewQuerySet(models.QuerySet):
+    def with_user_emails(self):
+        """
+        Join employee/assigner/approved_by in the same query, loading only the
+        email column of each user (what PerformanceReviewReadSerializer shows).
+        """
+        review_fields = [field.name for field in self.model._meta.concrete_fields]
+        return self.select_related("employee", "assigner", "approved_by").only(
+            *review_fields,
+            "employee__email",
+            "assigner__email",
+            "approved_by__email",
+        )
+
 class PerformanceReview(models.Model):
     class Status(models.TextChoices):
         PENDING = "PENDING", "Pending"
@@ -10,6 +24,9 @@ class PerformanceReview(models.Model):
         APPROVED = "APPROVED", "Approved"
         REJECTED = "REJECTED", "Rejected"
 
+    # A review is "open" until approved (rejected reviews go back to feedback)
+    CLOSED_STATUSES = [Status.APPROVED]
+
     employee = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -44,5 +61,16 @@ class PerformanceReview(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PerformanceReviewQuerySet.as_manager()
+
+    class Meta:
+        # list_reviews/emp_reviews filter by employee and/or status, newest first.
+        # The dashboard GROUP BY (status, assigner, week) reads only the covering index.
+        indexes = [
+            models.Index(fields=['employee', 'status'], name='review_employee_status_idx'),
+            models.Index(fields=['status', 'created_at'], name='review_status_created_idx'),
+            models.Index(fields=['status', 'assigner', 'created_at'], name='review_status_assigner_idx'),
+        ]
+
     def __str__(self):
         return f"Review for {self.employee.email} - {self.status}"
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from reviews.dashboard import DASHBOARD_CACHE_ID, DASHBOARD_CACHE_KIND, dashboard_cache
+from reviews.models import PerformanceReview
+
+
+def invalidate_dashboard():
+    """
+    Drop the cached review dashboard. Called from the review signals and by the
+    write paths that skip them (queryset.update(), bulk_create()).
+    """
+    dashboard_cache.bump(DASHBOARD_CACHE_KIND, DASHBOARD_CACHE_ID)
+
+
+@receiver(post_save, sender=PerformanceReview)
+@receiver(post_delete, sender=PerformanceReview)
+def review_changed(sender, instance, **kwargs):
+    invalidate_dashboard()
@@ -1,14 +1,27 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest.mock import patch
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from reviews.api.serializers import PerformanceReviewReadSerializer, PerformanceReviewValuesSerializer
 from reviews.models import PerformanceReview
+from reviews.dashboard import dashboard_cache
+from reviews.transitions import NEXT_STATUSES
+from company.cache import response_cache
+from company.models import Company, Employee
+from companyManagement.metrics import registry
+from companyManagement.query_budget import QueryBudgetTestMixin
 
 User = get_user_model()
 
 
-class ReviewPermissionTests(TestCase):
+class ReviewPermissionTests(QueryBudgetTestMixin, TestCase):
     def setUp(self):
         self.client = APIClient()
 
@@ -59,8 +72,8 @@ class ReviewPermissionTests(TestCase):
         self.client.force_authenticate(user=self.employee)
         response = self.client.get(reverse("emp-reviews"))  # if Option 2
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)  # the review we created
-        self.assertEqual(response.data[0]["employee"], self.employee.id)
+        self.assertEqual(len(response.data['results']), 1)  # the review we created
+        self.assertEqual(response.data['results'][0]["employee"], self.employee.id)
 
     def test_assign_review_hr_only(self):
         url = reverse("review-assign")
@@ -149,6 +162,22 @@ class ReviewPermissionTests(TestCase):
         res = self.client.patch(url)
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_review_transitions_counted_per_status(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+        self.review.status = PerformanceReview.Status.UNDER_APPROVAL
+        self.review.save()
+        self.client.force_authenticate(self.manager)
+        self.client.patch(reverse("review-approve", args=[self.review.id]))
+        # no longer UNDER_APPROVAL: nothing moves, nothing is counted
+        self.client.patch(reverse("review-reject", args=[self.review.id]))
+
+        counters = {
+            labels["status"]: value for name, labels, value in registry.snapshot()["counters"]
+            if name == "review_transitions_total"
+        }
+        self.assertEqual(counters, {PerformanceReview.Status.APPROVED: 1})
+
     def test_reject_review_manager_only(self):
         self.review.status = PerformanceReview.Status.UNDER_APPROVAL
         self.review.save()
@@ -165,3 +194,411 @@ class ReviewPermissionTests(TestCase):
         self.client.force_authenticate(self.employee)
         res = self.client.patch(url)
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_list_reviews_query_count_is_constant(self):
+        self.client.force_authenticate(self.manager)
+
+        def grow():
+            for i in range(10):
+                PerformanceReview.objects.create(
+                    employee=self.employee,
+                    assigner=self.hr,
+                    approved_by=self.manager,
+                    status=PerformanceReview.Status.APPROVED,
+                )
+
+        res = self.assertQueriesConstant(lambda: self.client.get(reverse("review-list")), grow)
+        self.assertEqual(len(res.data["results"]), 11)
+        self.assertEqual(res.data["results"][0]["assigner_email"], "hr@test.com")
+        self.assertEqual(res.data["results"][0]["approved_by_email"], "manager@test.com")
+
+    def test_confirm_review_is_one_conditional_update(self):
+        url = reverse("review-confirm", args=[self.review.id])
+        self.client.force_authenticate(self.employee)
+
+        # the UPDATE ... WHERE status = PENDING, then one SELECT (review + users) for the response
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.patch(url, {}, format="json")
+
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(queries[0]["sql"].startswith("UPDATE"))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["employee_email"], "employee@test.com")
+
+    def test_second_decision_on_a_review_loses(self):
+        self.review.status = PerformanceReview.Status.UNDER_APPROVAL
+        self.review.save()
+        self.client.force_authenticate(self.manager)
+
+        res = self.client.patch(reverse("review-approve", args=[self.review.id]))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        # a reject racing the approve finds the status already changed
+        res = self.client.patch(reverse("review-reject", args=[self.review.id]))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["detail"], "Only UNDER_APPROVAL reviews can be rejected.")
+        self.review.refresh_from_db()
+        self.assertEqual(self.review.status, PerformanceReview.Status.APPROVED)
+
+        res = self.client.patch(reverse("review-approve", args=[self.review.id + 100]))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_transition_table_covers_every_status(self):
+        self.assertEqual(set(NEXT_STATUSES), set(PerformanceReview.Status))
+        self.assertEqual(NEXT_STATUSES[PerformanceReview.Status.APPROVED], set())
+        self.assertEqual(
+            NEXT_STATUSES[PerformanceReview.Status.UNDER_APPROVAL],
+            {PerformanceReview.Status.APPROVED, PerformanceReview.Status.REJECTED},
+        )
+
+    def test_bulk_assign_reviews_by_ids(self):
+        url = reverse("review-assign-bulk")
+        second = User.objects.create_user(
+            username="employee2", email="employee2@test.com", password="pass", role=User.Roles.EMPLOYEE
+        )
+        data = {"employees": [self.employee.id, second.id, self.manager.id, 9999]}
+
+        self.client.force_authenticate(self.hr)
+        res = self.client.post(url, data, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["created"], 1)
+        self.assertEqual(res.data["skipped_open_review"], [self.employee.id])  # already has a PENDING review
+        self.assertEqual(res.data["invalid_role"], [self.manager.id])
+        self.assertEqual(res.data["not_found"], [9999])
+        review = PerformanceReview.objects.get(employee=second)
+        self.assertEqual(review.assigner, self.hr)
+        self.assertEqual(review.status, PerformanceReview.Status.PENDING)
+
+    def test_bulk_assign_reviews_by_company_filter(self):
+        company = Company.objects.create(name="Tech Corp")
+        other = Company.objects.create(name="Other Corp")
+        self.review.status = PerformanceReview.Status.APPROVED
+        self.review.save()
+        in_company = User.objects.create_user(
+            username="employee2", email="employee2@test.com", password="pass", role=User.Roles.EMPLOYEE
+        )
+        User.objects.create_user(
+            username="employee3", email="employee3@test.com", password="pass", role=User.Roles.EMPLOYEE
+        )
+        Employee.objects.create(company=company, name="Employee", email="employee@test.com")
+        Employee.objects.create(company=company, name="Employee 2", email="employee2@test.com")
+        Employee.objects.create(company=other, name="Employee 3", email="employee3@test.com")
+
+        self.client.force_authenticate(self.hr)
+        res = self.client.post(reverse("review-assign-bulk"), {"company": company.id}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["created"], 2)  # approved review doesn't block a new cycle
+        self.assertEqual(
+            set(PerformanceReview.objects.filter(status=PerformanceReview.Status.PENDING).values_list("employee_id", flat=True)),
+            {self.employee.id, in_company.id},
+        )
+
+    def test_bulk_assign_reviews_validation_and_permissions(self):
+        url = reverse("review-assign-bulk")
+
+        self.client.force_authenticate(self.manager)
+        res = self.client.post(url, {"employees": [self.employee.id]}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(self.hr)
+        res = self.client.post(url, {}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.post(url, {"role": User.Roles.MANAGER}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_assign_reviews_query_count_is_constant(self):
+        url = reverse("review-assign-bulk")
+        users = [
+            User(username=f"bulk{i}", email=f"bulk{i}@test.com", role=User.Roles.EMPLOYEE)
+            for i in range(30)
+        ]
+        User.objects.bulk_create(users)
+        ids = list(User.objects.filter(username__startswith="bulk").values_list("id", flat=True))
+
+        self.client.force_authenticate(self.hr)
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(url, {"employees": ids[:2]}, format="json")
+        with CaptureQueriesContext(connection) as large:
+            res = self.client.post(url, {"employees": ids[2:]}, format="json")
+
+        self.assertEqual(res.data["created"], 28)
+        self.assertEqual(len(large), len(small))
+
+    def test_bulk_approve_reviews_single_statement(self):
+        under_approval = [
+            PerformanceReview.objects.create(employee=self.employee, status=PerformanceReview.Status.UNDER_APPROVAL)
+            for _ in range(3)
+        ]
+        ids = [review.id for review in under_approval]
+        url = reverse("review-bulk-approve")
+
+        self.client.force_authenticate(self.manager)
+        with self.assertNumQueries(1):
+            res = self.client.patch(url, {"ids": ids}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["transitioned"], sorted(ids))
+        self.assertEqual(res.data["wrong_state"], [])
+        for review in under_approval:
+            review.refresh_from_db()
+            self.assertEqual(review.status, PerformanceReview.Status.APPROVED)
+            self.assertEqual(review.approved_by, self.manager)
+
+    def test_bulk_reject_reviews_reports_wrong_state(self):
+        under_approval = PerformanceReview.objects.create(
+            employee=self.employee, status=PerformanceReview.Status.UNDER_APPROVAL
+        )
+        url = reverse("review-bulk-reject")
+
+        self.client.force_authenticate(self.manager)
+        res = self.client.patch(url, {"ids": [under_approval.id, self.review.id, 9999]}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["transitioned"], [under_approval.id])
+        self.assertEqual(res.data["wrong_state"], [self.review.id])
+        self.assertEqual(res.data["not_found"], [9999])
+        self.review.refresh_from_db()
+        self.assertEqual(self.review.status, PerformanceReview.Status.PENDING)
+
+    def test_bulk_push_for_approval_hr_only(self):
+        self.review.status = PerformanceReview.Status.FEEDBACK_PROVIDED
+        self.review.save()
+        url = reverse("review-bulk-push")
+
+        self.client.force_authenticate(self.manager)
+        res = self.client.patch(url, {"ids": [self.review.id]}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(self.hr)
+        res = self.client.patch(url, {"ids": [self.review.id]}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["transitioned"], [self.review.id])
+        self.review.refresh_from_db()
+        self.assertEqual(self.review.status, PerformanceReview.Status.UNDER_APPROVAL)
+
+    def test_bulk_transition_without_returning_support(self):
+        under_approval = PerformanceReview.objects.create(
+            employee=self.employee, status=PerformanceReview.Status.UNDER_APPROVAL
+        )
+        url = reverse("review-bulk-approve")
+
+        self.client.force_authenticate(self.manager)
+        with patch("reviews.transitions.RETURNING_VENDORS", ()):
+            res = self.client.patch(url, {"ids": [under_approval.id, self.review.id]}, format="json")
+
+        self.assertEqual(res.data["transitioned"], [under_approval.id])
+        self.assertEqual(res.data["wrong_state"], [self.review.id])
+
+    def test_bulk_transition_on_sqlite_without_update_returning(self):
+        pending = PerformanceReview.objects.create(employee=self.employee, status=PerformanceReview.Status.PENDING)
+        url = reverse("review-bulk-confirm")
+
+        self.client.force_authenticate(self.employee)
+        with patch.object(connection.Database, "sqlite_version_info", (3, 34, 1)):
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.patch(url, {"ids": [self.review.id, pending.id]}, format="json")
+
+        self.assertEqual(res.data["transitioned"], sorted([self.review.id, pending.id]))
+        self.assertFalse(any("RETURNING" in query["sql"] for query in queries))
+        self.assertEqual(
+            set(PerformanceReview.objects.values_list("status", flat=True)), {PerformanceReview.Status.SCHEDULED}
+        )
+
+    def test_bulk_confirm_reviews_employee_only(self):
+        url = reverse("review-bulk-confirm")
+
+        self.client.force_authenticate(self.hr)
+        res = self.client.patch(url, {"ids": [self.review.id]}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(self.employee)
+        with self.assertNumQueries(1):
+            res = self.client.patch(url, {"ids": [self.review.id]}, format="json")
+        self.assertEqual(res.data["transitioned"], [self.review.id])
+        self.review.refresh_from_db()
+        self.assertEqual(self.review.status, PerformanceReview.Status.SCHEDULED)
+
+        res = self.client.patch(url, {"ids": [self.review.id]}, format="json")
+        self.assertEqual(res.data["wrong_state"], [self.review.id])
+
+    def test_dashboard_counts_with_one_query(self):
+        PerformanceReview.objects.create(
+            employee=self.employee, assigner=self.hr, status=PerformanceReview.Status.APPROVED
+        )
+        PerformanceReview.objects.create(
+            employee=self.employee, assigner=self.hr, status=PerformanceReview.Status.APPROVED
+        )
+        url = reverse("review-dashboard")
+        dashboard_cache.reset_stats()
+        response_cache.reset_stats()
+
+        self.client.force_authenticate(self.employee)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(self.manager)
+        # the GROUP BY, then the assigner emails by primary key
+        with self.assertNumQueries(2):
+            res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["total"], 3)
+        self.assertEqual(res.data["by_status"][PerformanceReview.Status.APPROVED], 2)
+        self.assertEqual(res.data["by_status"][PerformanceReview.Status.PENDING], 1)
+        self.assertEqual(res.data["by_status"][PerformanceReview.Status.REJECTED], 0)
+        self.assertEqual(res.data["by_assigner"][0], {"assigner_id": self.hr.id, "assigner_email": "hr@test.com", "total": 2})
+        monday = (self.review.created_at - timedelta(days=self.review.created_at.weekday())).date()
+        self.assertEqual(res.data["by_week"], [{"week": monday.isoformat(), "total": 3}])
+
+        # served from the cache until a review changes
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        self.assertEqual(dashboard_cache.stats()["hits"], 1)
+        # counted apart from the company detail cache
+        self.assertEqual(response_cache.stats()["hits"] + response_cache.stats()["misses"], 0)
+
+    def test_dashboard_invalidated_by_transitions(self):
+        url = reverse("review-dashboard")
+        self.client.force_authenticate(self.manager)
+        self.client.get(url)
+
+        self.client.force_authenticate(self.employee)
+        self.client.patch(reverse("review-confirm", args=[self.review.id]), {}, format="json")
+
+        self.client.force_authenticate(self.manager)
+        res = self.client.get(url)
+        self.assertEqual(res.data["by_status"][PerformanceReview.Status.PENDING], 0)
+        self.assertEqual(res.data["by_status"][PerformanceReview.Status.SCHEDULED], 1)
+
+    def test_review_detail_conditional_get(self):
+        url = reverse("review-detail", args=[self.review.id])
+        self.client.force_authenticate(self.manager)
+        etag = self.client.get(url)["ETag"]
+
+        # updated_at only, no join or serialization
+        with self.assertNumQueries(1):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.force_authenticate(self.employee)
+        self.client.patch(reverse("review-confirm", args=[self.review.id]), {}, format="json")
+
+        self.client.force_authenticate(self.manager)
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["status"], PerformanceReview.Status.SCHEDULED)
+
+    def test_async_review_endpoints(self):
+        self.client.force_authenticate(self.manager)
+        res = self.client.get(reverse("review-list-async"), {"status": PerformanceReview.Status.PENDING})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([review["id"] for review in res.json()["results"]], [self.review.id])
+
+        res = self.client.get(reverse("review-detail-async", args=[self.review.id]))
+        self.assertEqual(res.json()["employee_email"], "employee@test.com")
+
+        self.client.force_authenticate(self.employee)
+        res = self.client.get(reverse("review-detail-async", args=[self.review.id]))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_review_values_serializer_parity(self):
+        PerformanceReview.objects.create(
+            employee=self.employee,
+            assigner=self.hr,
+            approved_by=self.manager,
+            scheduled_at=timezone.now(),
+            feedback="Solid quarter",
+            status=PerformanceReview.Status.APPROVED,
+        )
+        reviews = PerformanceReview.objects.with_user_emails().order_by("id")
+
+        expected = JSONRenderer().render(PerformanceReviewReadSerializer(reviews, many=True).data)
+        actual = JSONRenderer().render(
+            PerformanceReviewValuesSerializer(PerformanceReviewValuesSerializer.project(reviews), many=True).data
+        )
+        self.assertEqual(actual, expected)
+
+        self.client.force_authenticate(self.manager)
+        regular = self.client.get(reverse("review-list"))
+        with override_settings(FAST_LIST_SERIALIZERS=True):
+            with self.assertNumQueries(1):
+                fast = self.client.get(reverse("review-list"))
+        self.assertEqual(fast.content, regular.content)
+
+    def test_review_sparse_fields(self):
+        self.client.force_authenticate(self.manager)
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(reverse("review-list"), {"fields": "id,employee_email,status"})
+        self.assertEqual(res.data["results"], [
+            {"id": self.review.id, "employee_email": "employee@test.com", "status": PerformanceReview.Status.PENDING},
+        ])
+        # only the employee is joined, the fast path doesn't apply either
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(queries[0]["sql"].count("JOIN"), 1)
+        self.assertNotIn('"feedback"', queries[0]["sql"])
+
+        url = reverse("review-detail", args=[self.review.id])
+        res = self.client.get(url, {"fields": "status"})
+        self.assertEqual(res.data, {"status": PerformanceReview.Status.PENDING})
+        with self.assertNumQueries(1):
+            res = self.client.get(url, {"fields": "status"}, HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        res = self.client.get(reverse("review-detail-async", args=[self.review.id]), {"fields": "assigner,employee"})
+        self.assertEqual(res.json(), {"assigner": None, "employee": self.employee.id})
+        res = self.client.get(reverse("review-list"), {"fields": "score"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class WriteQueryBudgetTests(TransactionTestCase):
+    """
+    Write budgets measured under autocommit, as in production (see company.tests.WriteQueryBudgetTests).
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.hr = User.objects.create_user(username="hr", email="hr@test.com", password="pass", role=User.Roles.HR)
+        self.manager = User.objects.create_user(
+            username="manager", email="manager@test.com", password="pass", role=User.Roles.MANAGER
+        )
+        self.employees = [
+            User.objects.create_user(username=f"emp{i}", email=f"emp{i}@test.com", password="pass", role=User.Roles.EMPLOYEE)
+            for i in range(3)
+        ]
+
+    def assertWithinBudget(self, user, send):
+        self.client.force_authenticate(user)
+        with self.assertNoLogs("companyManagement.query_budget", "WARNING"):
+            res = send()
+        self.assertLess(res.status_code, 400, res.content)
+        return res
+
+    def test_review_writes_within_budget(self):
+        first, *others = self.employees
+        review = self.assertWithinBudget(
+            self.hr, lambda: self.client.post(reverse("review-assign"), {"employee": first.id}, format="json")
+        ).data["id"]
+        self.assertWithinBudget(self.hr, lambda: self.client.post(
+            reverse("review-assign-bulk"), {"employees": [employee.id for employee in others]}, format="json"
+        ))
+        self.assertWithinBudget(first, lambda: self.client.patch(reverse("review-confirm", args=[review]), {}, format="json"))
+        self.assertWithinBudget(self.hr, lambda: self.client.patch(
+            reverse("review-feedback", args=[review]), {"feedback": "Solid quarter"}, format="json"
+        ))
+        self.assertWithinBudget(self.hr, lambda: self.client.patch(reverse("review-push", args=[review]), {}, format="json"))
+        self.assertWithinBudget(self.manager, lambda: self.client.patch(reverse("review-reject", args=[review]), {}, format="json"))
+
+        self.assertWithinBudget(others[0], lambda: self.client.patch(
+            reverse("review-bulk-confirm"),
+            {"ids": list(PerformanceReview.objects.filter(employee__in=others).values_list("id", flat=True))},
+            format="json",
+        ))
+
+        PerformanceReview.objects.filter(pk=review).update(status=PerformanceReview.Status.FEEDBACK_PROVIDED)
+        self.assertWithinBudget(self.hr, lambda: self.client.patch(
+            reverse("review-bulk-push"), {"ids": [review, 9999]}, format="json"
+        ))
+        self.assertWithinBudget(self.manager, lambda: self.client.patch(
+            reverse("review-bulk-approve"), {"ids": [review]}, format="json"
+        ))
+        self.assertEqual(PerformanceReview.objects.get(pk=review).status, PerformanceReview.Status.APPROVED)
@@ -0,0 +1,131 @@
+from typing import NamedTuple
+from django.db import connections
+from django.db.models.sql import UpdateQuery
+from django.utils import timezone
+from companyManagement.metrics import registry
+from reviews.models import PerformanceReview
+from reviews.signals import invalidate_dashboard
+
+# Backends that accept `UPDATE ... RETURNING` (SQLite from 3.35; MySQL/MariaDB only on INSERT/DELETE)
+RETURNING_VENDORS = ("sqlite", "postgresql")
+SQLITE_RETURNING_VERSION = (3, 35)
+
+Status = PerformanceReview.Status
+
+
+class Transition(NamedTuple):
+    sources: tuple
+    target: str
+    error: str
+
+
+# The review workflow, every status change goes through one of these
+TRANSITIONS = {
+    "confirm": Transition(
+        (Status.PENDING,), Status.SCHEDULED,
+        "Only PENDING reviews can be confirmed.",
+    ),
+    "feedback": Transition(
+        (Status.SCHEDULED, Status.REJECTED), Status.FEEDBACK_PROVIDED,
+        "Feedback allowed only when status is SCHEDULED or REJECTED.",
+    ),
+    "push": Transition(
+        (Status.FEEDBACK_PROVIDED,), Status.UNDER_APPROVAL,
+        "Only FEEDBACK_PROVIDED reviews can be pushed for approval.",
+    ),
+    "approve": Transition(
+        (Status.UNDER_APPROVAL,), Status.APPROVED,
+        "Only UNDER_APPROVAL reviews can be approved.",
+    ),
+    "reject": Transition(
+        (Status.UNDER_APPROVAL,), Status.REJECTED,
+        "Only UNDER_APPROVAL reviews can be rejected.",
+    ),
+}
+
+# Statuses reachable from each status (APPROVED is terminal)
+NEXT_STATUSES = {
+    status: {t.target for t in TRANSITIONS.values() if status in t.sources}
+    for status in Status
+}
+
+
+def transition(pk, name, **values):
+    """
+    Compare-and-swap one review: `UPDATE ... WHERE id = pk AND status IN (sources)`.
+    Returns the number of rows changed, 0 when the review is missing or was not in
+    a source state (possibly because a concurrent request moved it first).
+    """
+    step = TRANSITIONS[name]
+    updated = PerformanceReview.objects.filter(pk=pk, status__in=step.sources).update(
+        status=step.target,
+        updated_at=timezone.now(),
+        **values,
+    )
+    if updated:
+        invalidate_dashboard()
+        registry.inc("review_transitions_total", updated, status=step.target)
+    return updated
+
+
+def update_returning_supported(connection):
+    if connection.vendor not in RETURNING_VENDORS:
+        return False
+    if connection.vendor == "sqlite":
+        return connection.Database.sqlite_version_info >= SQLITE_RETURNING_VERSION
+    return True
+
+
+def update_returning_ids(queryset, **values):
+    """
+    Run `queryset.update(**values)` as one statement and return the ids of the updated rows.
+    Uses `UPDATE ... RETURNING id` where the backend supports it; elsewhere falls back to
+    selecting the matching ids first and updating exactly those (two statements).
+    """
+    connection = connections[queryset.db]
+    if update_returning_supported(connection):
+        # The ORM has no UPDATE ... RETURNING, so the queryset's UPDATE is compiled the way
+        # QuerySet.update() does it (private UpdateQuery API) to keep its WHERE and values
+        # exactly as the ORM writes them; only the RETURNING clause is appended here.
+        query = queryset.query.chain(UpdateQuery)
+        query.add_update_values(values)
+        query.annotations = {}
+        sql, params = query.get_compiler(queryset.db).as_sql()
+        pk_column = connection.ops.quote_name(queryset.model._meta.pk.column)
+        with connection.cursor() as cursor:
+            cursor.execute(f"{sql} RETURNING {pk_column}", params)
+            return [row[0] for row in cursor.fetchall()]
+
+    ids = list(queryset.values_list("pk", flat=True))
+    if ids:
+        queryset.filter(pk__in=ids).update(**values)
+    return ids
+
+
+def bulk_transition(ids, name, **values):
+    """
+    Apply transition `name` to every review in `ids` that is in one of its source
+    states with a single conditional UPDATE (`WHERE id IN (...) AND status IN (...)`).
+    Reviews in another state are left untouched and reported, as are unknown ids.
+    """
+    step = TRANSITIONS[name]
+    ids = list(dict.fromkeys(ids))
+    transitioned = update_returning_ids(
+        PerformanceReview.objects.filter(id__in=ids, status__in=step.sources),
+        status=step.target,
+        updated_at=timezone.now(),
+        **values,
+    )
+
+    if transitioned:
+        invalidate_dashboard()
+        registry.inc("review_transitions_total", len(transitioned), status=step.target)
+
+    summary = {"transitioned": sorted(transitioned), "wrong_state": [], "not_found": []}
+    remaining = set(ids) - set(transitioned)
+    if remaining:
+        # Only on partial success: tell apart reviews in the wrong state from missing ones
+        existing = set(PerformanceReview.objects.filter(id__in=remaining).values_list("id", flat=True))
+        summary["wrong_state"] = sorted(existing)
+        summary["not_found"] = sorted(remaining - existing)
+    return summary